@@ -12,51 +12,83 @@ from voice_agent_orchestraction.llm.llm_service import get_llm
 from voice_agent_orchestraction.tts.tts_service import get_tts
 from livekit.plugins.turn_detector.multilingual import MultilingualModel
 from livekit.plugins import silero, noise_cancellation
-from voice_agent_orchestraction.rag.retrival import initialize, get_tools, get_prompt_file_path
+from voice_agent_orchestraction.rag.retrival import (
+    RAG_MODE,
+    RAG_MODE_TOOL,
+    get_additional_instructions,
+    get_prompt_file_path,
+    get_tools,
+    initialize,
+    inject_rag_context,
+    load_rag_assets,
+)
 from voice_agent_orchestraction.utils.transcription_logger import TranscriptionLogger, setup_transcription_logging
 
 load_dotenv()
 
 INITIAL_GREETING_ENABLED = os.getenv("INITIAL_GREETING_ENABLED", "true").lower() == "true"
+VAD_ENABLED = os.getenv("VAD_ENABLED", "false").lower() == "true"
+TURN_DETECTOR_ENABLED = os.getenv("TURN_DETECTOR_ENABLED", "false").lower() == "true"
+
+
+def prewarm(proc: agents.JobProcess):
+    """
+    Load static assets once per worker process, before any job is assigned.
+    Jobs pick them up from proc.userdata so call pickup does no disk or model loading.
+    """
+    prewarm_start = time.time()
+    proc.userdata["rag_assets"] = load_rag_assets()
+    if VAD_ENABLED:
+        proc.userdata["vad"] = silero.VAD.load()
+    logger.info(f"Worker process prewarmed in {time.time() - prewarm_start:.3f}s")
 
 
 async def entrypoint(ctx: agents.JobContext):
-    await initialize()
-    tools = get_tools()
+    await initialize(ctx.proc.userdata.get("rag_assets"))
     
     prompt_file_path = get_prompt_file_path()
     with open(prompt_file_path, "r", encoding="utf-8") as f:
         instructions = f.read().strip()
     
-    instructions += (
-        "\n\n⚠️ CRITICAL RAG POLICY - MANDATORY TOOL USAGE: "
-        "Before answering ANY question about HDFC ERGO, you MUST first call the RAG_RETRIEVER tool. "
-        "This includes but is not limited to:\n"
-        "- Contact information (addresses, phone numbers, email addresses, office locations, branch addresses)\n"
-        "- Policy details, procedures, requirements, or operations\n"
-        "- Specific policy terms, coverage details, claim procedures\n"
-        "- Network hospitals, exclusions, optional covers\n"
-        "- ANY factual information about HDFC ERGO that requires verification\n\n"
-        "This is MANDATORY for every substantive question. "
-        "Do NOT rely on your training data or previous responses. "
-        "Do NOT assume you know the answer. "
-        "ALWAYS call RAG first, then paraphrase the response naturally. "
-        "The only exceptions are: simple greetings, acknowledgments, and off-topic questions. "
-        "When in doubt whether to call RAG, ALWAYS call it. "
-        "NEVER mention RAG to customers - call it silently and respond as if you naturally know the information."
-    )
+    if RAG_MODE == RAG_MODE_TOOL:
+        instructions += (
+            "\n\n⚠️ CRITICAL RAG POLICY - MANDATORY TOOL USAGE: "
+            "Before answering ANY question about HDFC ERGO, you MUST first call the RAG_RETRIEVER tool. "
+            "This includes but is not limited to:\n"
+            "- Contact information (addresses, phone numbers, email addresses, office locations, branch addresses)\n"
+            "- Policy details, procedures, requirements, or operations\n"
+            "- Specific policy terms, coverage details, claim procedures\n"
+            "- Network hospitals, exclusions, optional covers\n"
+            "- ANY factual information about HDFC ERGO that requires verification\n\n"
+            "This is MANDATORY for every substantive question. "
+            "Do NOT rely on your training data or previous responses. "
+            "Do NOT assume you know the answer. "
+            "ALWAYS call RAG first, then paraphrase the response naturally. "
+            "The only exceptions are: simple greetings, acknowledgments, and off-topic questions. "
+            "When in doubt whether to call RAG, ALWAYS call it. "
+            "NEVER mention RAG to customers - call it silently and respond as if you naturally know the information."
+        )
+    # RAG_MODE=inject: context is added before the LLM runs, no mandatory tool call
+    instructions += get_additional_instructions()
     
     class Assistant(Agent):
         def __init__(self, tools=None) -> None:
             # Pass tools to Agent constructor (like ref.py line 844)
             super().__init__(instructions=instructions, tools=tools)
+        
+        async def on_user_turn_completed(self, turn_ctx, new_message) -> None:
+            # RAG_MODE=inject: retrieve on the final transcript and add the context before the LLM call
+            await inject_rag_context(turn_ctx, new_message, session_ref=self.session)
     
     session = AgentSession(
         stt=get_stt(),
         llm=get_llm(),  # Remove tools from here - tools go to Agent
         tts=get_tts(),
-        # vad=silero.VAD.load(),
+        vad=ctx.proc.userdata.get("vad") or agents.NOT_GIVEN,  # Loaded once in prewarm
+        turn_detection=MultilingualModel() if TURN_DETECTOR_ENABLED else agents.NOT_GIVEN,
     )
+    # Routes the call to an index from the job metadata; the session's transcripts drive retrieval prefetch
+    tools = get_tools(session_ref=session, ctx_ref=ctx)
 
     await session.start(
         room=ctx.room,
@@ -107,5 +139,6 @@ if __name__ == "__main__":
     agents.cli.run_app(agents.WorkerOptions(
         agent_name="HDFC-Insurance-Agent",
         entrypoint_fnc=entrypoint,
+        prewarm_fnc=prewarm,
         )
     )
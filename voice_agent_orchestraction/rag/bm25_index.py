@@ -0,0 +1,310 @@
+"""
+Sparse BM25 Index
+
+Okapi BM25 over a precomputed term-major CSR matrix. Each stored value is
+the full BM25 contribution of one term to one document (IDF, term
+frequency saturation and length normalisation already applied), so
+scoring a query is a handful of vectorised NumPy adds, one per query term,
+followed by an argpartition top-k.
+
+Scores match rank_bm25.BM25Okapi (same IDF floor and parameters).
+
+The index is built once at ingestion time and saved next to the FAISS
+index. At runtime every array, including the sorted vocabulary, is
+memory-mapped, so loading costs no tokenisation and no per-term objects.
+"""
+
+import json
+import logging
+import re
+from bisect import bisect_left
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from voice_agent_orchestraction.rag.vector_store import ChunkTextStore
+
+logger = logging.getLogger(__name__)
+
+BM25_PARAMS_FILENAME = "bm25_params.json"
+BM25_TERMS_FILENAME = "bm25_terms.bin"
+BM25_TERM_OFFSETS_FILENAME = "bm25_term_offsets.npy"
+BM25_INDPTR_FILENAME = "bm25_indptr.npy"
+BM25_DOC_IDS_FILENAME = "bm25_doc_ids.npy"
+BM25_WEIGHTS_FILENAME = "bm25_weights.npy"
+
+BM25_FILENAMES = [
+    BM25_PARAMS_FILENAME,
+    BM25_TERMS_FILENAME,
+    BM25_TERM_OFFSETS_FILENAME,
+    BM25_INDPTR_FILENAME,
+    BM25_DOC_IDS_FILENAME,
+    BM25_WEIGHTS_FILENAME,
+]
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Tokenize text for BM25 - handles Hindi, English, and Hinglish.
+    Simple tokenization that works for multilingual content.
+    """
+    # Convert to lowercase and split on whitespace and punctuation
+    text = text.lower()
+    # Split on whitespace and common punctuation, but keep alphanumeric sequences
+    tokens = re.findall(r'\b\w+\b', text)
+    # Filter out very short tokens (less than 2 chars) except for common words
+    tokens = [t for t in tokens if len(t) >= 2 or t in ['a', 'i', 'o']]
+    return tokens
+
+
+class SparseBM25Index:
+    """BM25 index stored as a term-major CSR matrix of precomputed term weights"""
+
+    def __init__(
+        self,
+        terms: Sequence[str],
+        indptr: np.ndarray,
+        doc_ids: np.ndarray,
+        weights: np.ndarray,
+        n_docs: int,
+        params: dict,
+    ):
+        self.terms = terms  # Sorted vocabulary; term id = position
+        self.indptr = indptr  # Postings of term t are [indptr[t], indptr[t + 1])
+        self.doc_ids = doc_ids  # Sorted ascending within each term's postings
+        self.weights = weights
+        self.n_docs = n_docs
+        self.params = params
+
+    # ------------------------------------------------------------------
+    # Build / persist
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def build(
+        cls,
+        texts: Iterable[str],
+        k1: float = 1.5,
+        b: float = 0.75,
+        epsilon: float = 0.25,
+    ) -> "SparseBM25Index":
+        """
+        Tokenize a corpus and precompute BM25 weights.
+
+        Args:
+            texts: Chunk texts in FAISS id order
+            k1, b, epsilon: BM25Okapi parameters (rank_bm25 defaults)
+
+        Returns:
+            SparseBM25Index
+        """
+        doc_term_freqs = [Counter(tokenize(text)) for text in texts]
+        n_docs = len(doc_term_freqs)
+        doc_lens = np.array([sum(tf.values()) for tf in doc_term_freqs], dtype=np.float64)
+        avgdl = float(doc_lens.mean()) if n_docs and doc_lens.sum() else 1.0
+
+        vocab = sorted({term for tf in doc_term_freqs for term in tf})
+        term_to_id = {term: i for i, term in enumerate(vocab)}
+
+        # COO triplets, then sort term-major (doc ids ascending within a term)
+        rows, cols, freqs = [], [], []
+        for doc_id, tf in enumerate(doc_term_freqs):
+            for term, freq in tf.items():
+                rows.append(term_to_id[term])
+                cols.append(doc_id)
+                freqs.append(freq)
+        rows = np.array(rows, dtype=np.int64)
+        cols = np.array(cols, dtype=np.int32)
+        freqs = np.array(freqs, dtype=np.float64)
+        order = np.lexsort((cols, rows))
+        rows, cols, freqs = rows[order], cols[order], freqs[order]
+
+        # Document frequency and IDF, with rank_bm25's floor for negative IDF
+        doc_freq = np.bincount(rows, minlength=len(vocab)).astype(np.float64)
+        idf = np.log(n_docs - doc_freq + 0.5) - np.log(doc_freq + 0.5)
+        if len(idf):
+            eps = epsilon * (idf.sum() / len(idf))
+            idf = np.where(idf < 0, eps, idf)
+
+        length_norm = k1 * (1 - b + b * doc_lens[cols] / avgdl)
+        weights = (idf[rows] * freqs * (k1 + 1) / (freqs + length_norm)).astype(np.float32)
+
+        indptr = np.zeros(len(vocab) + 1, dtype=np.int64)
+        np.cumsum(doc_freq.astype(np.int64), out=indptr[1:])
+
+        params = {'k1': k1, 'b': b, 'epsilon': epsilon, 'avgdl': avgdl, 'n_docs': n_docs, 'n_terms': len(vocab)}
+        return cls(vocab, indptr, cols, weights, n_docs, params)
+
+    def save(self, index_dir: str) -> List[str]:
+        """
+        Save the index next to the FAISS index.
+
+        Returns:
+            File names written (relative to index_dir)
+        """
+        index_dir = Path(index_dir)
+        ChunkTextStore.write(index_dir, list(self.terms), BM25_TERMS_FILENAME, BM25_TERM_OFFSETS_FILENAME)
+        np.save(index_dir / BM25_INDPTR_FILENAME, np.asarray(self.indptr, dtype=np.int64))
+        np.save(index_dir / BM25_DOC_IDS_FILENAME, np.asarray(self.doc_ids, dtype=np.int32))
+        np.save(index_dir / BM25_WEIGHTS_FILENAME, np.asarray(self.weights, dtype=np.float32))
+        with open(index_dir / BM25_PARAMS_FILENAME, 'w', encoding='utf-8') as f:
+            json.dump(self.params, f, indent=2)
+        return list(BM25_FILENAMES)
+
+    @staticmethod
+    def exists(index_dir: str) -> bool:
+        return all((Path(index_dir) / name).exists() for name in BM25_FILENAMES)
+
+    @classmethod
+    def load(cls, index_dir: str, mmap: bool = True) -> "SparseBM25Index":
+        """Load a saved index; arrays are memory-mapped read-only when mmap=True."""
+        index_dir = Path(index_dir)
+        mmap_mode = 'r' if mmap else None
+        with open(index_dir / BM25_PARAMS_FILENAME, 'r', encoding='utf-8') as f:
+            params = json.load(f)
+        terms = ChunkTextStore.open(index_dir, BM25_TERMS_FILENAME, BM25_TERM_OFFSETS_FILENAME)
+        if not mmap:
+            terms = list(terms)
+        return cls(
+            terms,
+            np.load(index_dir / BM25_INDPTR_FILENAME, mmap_mode=mmap_mode),
+            np.load(index_dir / BM25_DOC_IDS_FILENAME, mmap_mode=mmap_mode),
+            np.load(index_dir / BM25_WEIGHTS_FILENAME, mmap_mode=mmap_mode),
+            params['n_docs'],
+            params,
+        )
+
+    # ------------------------------------------------------------------
+    # Query
+    # ------------------------------------------------------------------
+
+    def term_id(self, term: str) -> Optional[int]:
+        """Binary-search the sorted vocabulary."""
+        pos = bisect_left(self.terms, term, 0, len(self.terms))
+        if pos < len(self.terms) and self.terms[pos] == term:
+            return pos
+        return None
+
+    def get_scores(self, query_tokens: Sequence[str]) -> np.ndarray:
+        """
+        BM25 scores of every document for a tokenized query.
+        Repeated query tokens count repeatedly, as in rank_bm25.
+        """
+        scores = np.zeros(self.n_docs, dtype=np.float32)
+        for term in query_tokens:
+            term_id = self.term_id(term)
+            if term_id is None:
+                continue
+            start, end = self.indptr[term_id], self.indptr[term_id + 1]
+            # Doc ids are unique within one term's postings, so fancy-index add is safe
+            scores[self.doc_ids[start:end]] += self.weights[start:end]
+        return scores
+
+    def get_scores_batch(self, queries_tokens: Sequence[Sequence[str]]) -> np.ndarray:
+        """
+        BM25 scores of every document for several tokenized queries at once.
+
+        Each distinct term's postings are read once and scattered into all
+        queries' rows, weighted by how often each query repeats the term.
+
+        Returns:
+            Scores of shape (n_queries, n_docs)
+        """
+        scores = np.zeros((len(queries_tokens), self.n_docs), dtype=np.float32)
+        term_counts: Dict[int, np.ndarray] = {}
+        for row, query_tokens in enumerate(queries_tokens):
+            for term in query_tokens:
+                term_id = self.term_id(term)
+                if term_id is None:
+                    continue
+                if term_id not in term_counts:
+                    term_counts[term_id] = np.zeros(len(queries_tokens), dtype=np.float32)
+                term_counts[term_id][row] += 1
+        for term_id, counts in term_counts.items():
+            start, end = self.indptr[term_id], self.indptr[term_id + 1]
+            scores[:, self.doc_ids[start:end]] += counts[:, None] * self.weights[start:end][None, :]
+        return scores
+
+    def score_candidates(self, query: str, candidate_ids: np.ndarray) -> np.ndarray:
+        """
+        BM25 scores for a candidate set only (e.g. FAISS hits).
+
+        Each query term's postings are binary-searched for the candidates,
+        so the cost depends on the candidate count and not on corpus size.
+
+        Returns:
+            Scores aligned with candidate_ids
+        """
+        candidate_ids = np.asarray(candidate_ids, dtype=np.int64)
+        scores = np.zeros(len(candidate_ids), dtype=np.float32)
+        if not len(candidate_ids):
+            return scores
+        for term in tokenize(query):
+            term_id = self.term_id(term)
+            if term_id is None:
+                continue
+            start, end = self.indptr[term_id], self.indptr[term_id + 1]
+            postings = self.doc_ids[start:end]
+            pos = np.searchsorted(postings, candidate_ids)
+            hit = pos < len(postings)
+            hit[hit] = postings[pos[hit]] == candidate_ids[hit]
+            scores[hit] += self.weights[start:end][pos[hit]]
+        return scores
+
+    def top_k(self, query: str, k: int, mask: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Top-k documents for a raw query string.
+
+        Args:
+            query: Raw query text
+            k: Number of documents
+            mask: Optional boolean mask of allowed doc ids (metadata filters)
+
+        Returns:
+            (doc_ids, scores) sorted by descending score
+        """
+        query_tokens = tokenize(query)
+        if not query_tokens or self.n_docs == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+
+        scores = self.get_scores(query_tokens)
+        doc_ids = np.arange(self.n_docs) if mask is None else np.flatnonzero(mask[:self.n_docs])
+        scores = scores[doc_ids]
+        k = min(k, len(doc_ids))
+        if k <= 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind='stable')]
+        return doc_ids[top], scores[top]
+
+    def top_k_batch(
+        self,
+        queries: Sequence[str],
+        k: int,
+        mask: Optional[np.ndarray] = None,
+    ) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """
+        Top-k documents for several raw queries in one vectorised pass.
+
+        Returns:
+            (doc_ids, scores) per query, each sorted by descending score
+        """
+        empty = (np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32))
+        queries_tokens = [tokenize(query) for query in queries]
+        doc_ids = np.arange(self.n_docs) if mask is None else np.flatnonzero(mask[:self.n_docs])
+        k = min(k, len(doc_ids))
+        if k <= 0 or not any(queries_tokens):
+            return [empty for _ in queries]
+
+        scores = self.get_scores_batch(queries_tokens)[:, doc_ids]
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        results = []
+        for row, query_tokens in enumerate(queries_tokens):
+            if not query_tokens:
+                results.append(empty)
+                continue
+            row_top = top[row][np.argsort(-scores[row, top[row]], kind='stable')]
+            results.append((doc_ids[row_top], scores[row, row_top]))
+        return results
@@ -0,0 +1,342 @@
+"""
+Chunk Bundle
+
+One versioned binary file (chunks.bundle) holding everything ingestion
+knows about the chunks, in FAISS id order:
+
+- chunk texts:  one contiguous UTF-8 blob + int64 offsets
+- chunk ids:    UTF-8 blob + offsets
+- metadata:     columnar arrays for the fields used at runtime
+                (section / type / content_format as int32 codes into a
+                vocabulary, page as int32, boolean flags as a uint8 bitfield)
+                plus each chunk's full metadata as compact JSON, decoded
+                only when asked for
+- vectors:      the raw embeddings, float32 (n, d)
+
+It replaces chunk_mapping.json, metadata.pkl, embeddings.npy and the
+chunk_texts.bin / offsets pair. The runtime memory-maps the file and
+creates no per-chunk Python objects until results are formatted; nothing
+on the load path is unpickled.
+
+Layout: 8-byte magic, uint64 header length, JSON header (format version,
+counts, vocabularies, section table), then 64-byte aligned sections
+whose offsets in the header are relative to the first section.
+"""
+
+import json
+import shutil
+import struct
+import tempfile
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Mapping, Optional, Sequence
+
+import numpy as np
+
+CHUNK_BUNDLE_FILENAME = "chunks.bundle"
+BUNDLE_MAGIC = b"RAGCHNK\x00"
+BUNDLE_FORMAT_VERSION = 1
+_ALIGNMENT = 64
+
+# Metadata fields stored as columns (int32 codes into a per-field vocabulary)
+CATEGORICAL_COLUMNS = ("section", "type", "content_format")
+# Boolean metadata fields packed into one uint8 per chunk (bit i = FLAG_COLUMNS[i])
+FLAG_COLUMNS = ("has_contact_info",)
+MISSING_CODE = -1  # Code / page of a chunk without the field
+
+
+def _align(n: int) -> int:
+    return (n + _ALIGNMENT - 1) // _ALIGNMENT * _ALIGNMENT
+
+
+class _BlobSequence(Sequence):
+    """Read-only sequence over a blob + offsets; item i is decoded only when accessed."""
+
+    def __init__(self, blob: np.ndarray, offsets: np.ndarray, decode: Callable[[bytes], Any]):
+        self.blob = blob
+        self.offsets = offsets
+        self.decode = decode
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i: int):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        start, end = self.offsets[i], self.offsets[i + 1]
+        return self.decode(self.blob[start:end].tobytes())
+
+    def __iter__(self) -> Iterator:
+        for i in range(len(self)):
+            yield self[i]
+
+
+def _decode_text(raw: bytes) -> str:
+    return raw.decode('utf-8')
+
+
+def _decode_json(raw: bytes) -> Dict:
+    return json.loads(raw) if raw else {}
+
+
+class ChunkBundle:
+    """Memory-mapped view of a chunks.bundle file"""
+
+    def __init__(self, buffer: np.ndarray, header: Dict, data_start: int):
+        self.buffer = buffer  # Whole file as uint8 (memmap or in-memory)
+        self.header = header
+        self.data_start = data_start
+        self.n_chunks = header['n_chunks']
+        self.dimensions = header['dimensions']
+
+    @classmethod
+    def open(cls, path: str, mmap: bool = True) -> "ChunkBundle":
+        """
+        Open a bundle written by ChunkBundleWriter.
+
+        Args:
+            path: Bundle file
+            mmap: Memory-map read-only (shared across processes) instead of reading into memory
+
+        Raises:
+            ValueError: On a file that is not a bundle or has an unsupported format version
+        """
+        buffer = np.memmap(path, dtype=np.uint8, mode='r') if mmap else np.fromfile(path, dtype=np.uint8)
+        if buffer[:len(BUNDLE_MAGIC)].tobytes() != BUNDLE_MAGIC:
+            raise ValueError(f"{path} is not a chunk bundle")
+        (header_length,) = struct.unpack('<Q', buffer[8:16].tobytes())
+        header = json.loads(buffer[16:16 + header_length].tobytes())
+        if header.get('format_version') != BUNDLE_FORMAT_VERSION:
+            raise ValueError(
+                f"Unsupported chunk bundle format {header.get('format_version')} "
+                f"(expected {BUNDLE_FORMAT_VERSION}) - re-run ingestion"
+            )
+        return cls(buffer, header, _align(16 + header_length))
+
+    @staticmethod
+    def exists(index_dir: str) -> bool:
+        return (Path(index_dir) / CHUNK_BUNDLE_FILENAME).exists()
+
+    def __len__(self) -> int:
+        return self.n_chunks
+
+    def _section(self, name: str) -> np.ndarray:
+        spec = self.header['sections'][name]
+        start = self.data_start + spec['offset']
+        raw = self.buffer[start:start + spec['nbytes']]
+        return raw.view(np.dtype(spec['dtype'])).reshape(spec['shape'])
+
+    # ------------------------------------------------------------------
+    # Row data (decoded lazily)
+    # ------------------------------------------------------------------
+
+    @property
+    def texts(self) -> Sequence[str]:
+        """Chunk texts indexed by FAISS id"""
+        return _BlobSequence(self._section('texts'), self._section('text_offsets'), _decode_text)
+
+    @property
+    def chunk_ids(self) -> Sequence[str]:
+        return _BlobSequence(self._section('chunk_ids'), self._section('chunk_id_offsets'), _decode_text)
+
+    @property
+    def metadatas(self) -> Sequence[Dict]:
+        """Full per-chunk metadata, JSON-decoded on access"""
+        return _BlobSequence(self._section('metadata'), self._section('metadata_offsets'), _decode_json)
+
+    @property
+    def vectors(self) -> Optional[np.ndarray]:
+        """Raw embeddings (n, d), or None if the bundle was written without them"""
+        if 'vectors' not in self.header['sections']:
+            return None
+        return self._section('vectors')
+
+    def chunk(self, faiss_id: int) -> Dict:
+        """One chunk as a dict (same shape as the old chunk_mapping.json entries)."""
+        return {
+            'chunk_id': self.chunk_ids[faiss_id],
+            'content': self.texts[faiss_id],
+            'metadata': self.metadatas[faiss_id],
+            'faiss_id': faiss_id,
+        }
+
+    # ------------------------------------------------------------------
+    # Columns
+    # ------------------------------------------------------------------
+
+    def codes(self, column: str) -> np.ndarray:
+        """int32 codes of a categorical column (MISSING_CODE where unset)."""
+        return self._section(f"column_{column}")
+
+    def vocabulary(self, column: str) -> List[str]:
+        return self.header['vocabularies'][column]
+
+    def column_values(self, column: str, faiss_ids: Sequence[int]) -> List[Optional[str]]:
+        """Decoded categorical values for some chunks."""
+        vocabulary = self.vocabulary(column)
+        codes = self.codes(column)
+        return [vocabulary[codes[i]] if codes[i] != MISSING_CODE else None for i in faiss_ids]
+
+    @property
+    def pages(self) -> np.ndarray:
+        """int32 page numbers (MISSING_CODE where unset)."""
+        return self._section('page')
+
+    def flag(self, name: str) -> np.ndarray:
+        """Boolean array of a flag column."""
+        bit = FLAG_COLUMNS.index(name)
+        return ((self._section('flags') >> bit) & 1).astype(bool)
+
+
+class ChunkBundleWriter:
+    """
+    Streams chunks into a bundle file. Texts, ids, metadata and vectors
+    spill to temporary files; only the small per-chunk columns are kept in
+    memory until close() assembles the bundle.
+    """
+
+    def __init__(self, path: str, dimensions: Optional[int] = None):
+        self.path = Path(path)
+        self.dimensions = dimensions
+        self.n_chunks = 0
+        self._blobs = {name: tempfile.TemporaryFile() for name in ('texts', 'chunk_ids', 'metadata', 'vectors')}
+        self._offsets = {name: [0] for name in ('texts', 'chunk_ids', 'metadata')}
+        self._codes = {column: [] for column in CATEGORICAL_COLUMNS}
+        self._vocabularies: Dict[str, Dict[str, int]] = {column: {} for column in CATEGORICAL_COLUMNS}
+        self._pages: List[int] = []
+        self._flags: List[int] = []
+        self._has_vectors: Optional[bool] = None
+
+    def __enter__(self) -> "ChunkBundleWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self._discard()
+
+    def _append_blob(self, name: str, data: bytes):
+        self._blobs[name].write(data)
+        self._offsets[name].append(self._offsets[name][-1] + len(data))
+
+    def add(self, chunk_id: str, text: str, metadata: Mapping, vector: Optional[np.ndarray] = None) -> int:
+        """
+        Append one chunk.
+
+        Returns:
+            Its FAISS id (position in the bundle)
+
+        Raises:
+            ValueError: If vectors are given for some chunks but not others, or their dimension differs
+        """
+        if self._has_vectors is None:
+            self._has_vectors = vector is not None
+        if (vector is not None) != self._has_vectors:
+            raise ValueError("Either every chunk or no chunk must come with a vector")
+
+        self._append_blob('texts', text.encode('utf-8'))
+        self._append_blob('chunk_ids', str(chunk_id).encode('utf-8'))
+        self._append_blob('metadata', json.dumps(metadata, ensure_ascii=False, separators=(',', ':'), default=str).encode('utf-8'))
+
+        for column in CATEGORICAL_COLUMNS:
+            value = metadata.get(column)
+            if value in (None, ""):
+                self._codes[column].append(MISSING_CODE)
+            else:
+                vocabulary = self._vocabularies[column]
+                self._codes[column].append(vocabulary.setdefault(str(value), len(vocabulary)))
+        page = metadata.get('page')
+        self._pages.append(int(page) if isinstance(page, (int, float)) else MISSING_CODE)
+        self._flags.append(sum(1 << bit for bit, name in enumerate(FLAG_COLUMNS) if metadata.get(name)))
+
+        if vector is not None:
+            vector = np.asarray(vector, dtype=np.float32).ravel()
+            if self.dimensions is None:
+                self.dimensions = len(vector)
+            if len(vector) != self.dimensions:
+                raise ValueError(f"Vector has {len(vector)} dimensions, expected {self.dimensions}")
+            self._blobs['vectors'].write(vector.tobytes())
+
+        self.n_chunks += 1
+        return self.n_chunks - 1
+
+    def close(self) -> int:
+        """
+        Write the bundle file.
+
+        Returns:
+            Bytes written
+        """
+        arrays = {
+            'text_offsets': np.asarray(self._offsets['texts'], dtype=np.int64),
+            'chunk_id_offsets': np.asarray(self._offsets['chunk_ids'], dtype=np.int64),
+            'metadata_offsets': np.asarray(self._offsets['metadata'], dtype=np.int64),
+            'page': np.asarray(self._pages, dtype=np.int32),
+            'flags': np.asarray(self._flags, dtype=np.uint8),
+            **{f"column_{column}": np.asarray(codes, dtype=np.int32) for column, codes in self._codes.items()},
+        }
+        blobs = {
+            'texts': ('uint8', self._offsets['texts'][-1]),
+            'chunk_ids': ('uint8', self._offsets['chunk_ids'][-1]),
+            'metadata': ('uint8', self._offsets['metadata'][-1]),
+        }
+        if self._has_vectors:
+            blobs['vectors'] = ('float32', self.n_chunks * self.dimensions * 4)
+
+        # Section table: offsets relative to the first (aligned) section
+        sections, offset = {}, 0
+        for name, (dtype, nbytes) in blobs.items():
+            shape = [self.n_chunks, self.dimensions] if name == 'vectors' else [nbytes]
+            sections[name] = {'offset': offset, 'nbytes': nbytes, 'dtype': dtype, 'shape': shape}
+            offset = _align(offset + nbytes)
+        for name, array in arrays.items():
+            sections[name] = {'offset': offset, 'nbytes': array.nbytes, 'dtype': array.dtype.str, 'shape': list(array.shape)}
+            offset = _align(offset + array.nbytes)
+
+        header = json.dumps({
+            'format_version': BUNDLE_FORMAT_VERSION,
+            'n_chunks': self.n_chunks,
+            'dimensions': self.dimensions if self._has_vectors else 0,
+            'vocabularies': {column: list(vocabulary) for column, vocabulary in self._vocabularies.items()},
+            'flags': list(FLAG_COLUMNS),
+            'sections': sections,
+        }).encode('utf-8')
+
+        with open(self.path, 'wb') as f:
+            f.write(BUNDLE_MAGIC)
+            f.write(struct.pack('<Q', len(header)))
+            f.write(header)
+            data_start = _align(f.tell())
+            for name in list(blobs) + list(arrays):
+                f.write(b'\0' * (data_start + sections[name]['offset'] - f.tell()))
+                if name in blobs:
+                    self._blobs[name].seek(0)
+                    shutil.copyfileobj(self._blobs[name], f)
+                else:
+                    f.write(arrays[name].tobytes())
+            size = f.tell()
+        self._discard()
+        return size
+
+    def _discard(self):
+        for blob in self._blobs.values():
+            blob.close()
+
+
+def write_chunk_bundle(
+    path: str,
+    chunk_ids: Sequence[str],
+    texts: Sequence[str],
+    metadatas: Sequence[Mapping],
+    vectors: Optional[np.ndarray] = None,
+) -> int:
+    """
+    Write a bundle from in-memory chunks (FAISS id order).
+
+    Returns:
+        Bytes written
+    """
+    with ChunkBundleWriter(path, dimensions=None if vectors is None else vectors.shape[1]) as writer:
+        for i, (chunk_id, text, metadata) in enumerate(zip(chunk_ids, texts, metadatas)):
+            writer.add(chunk_id, text, metadata, None if vectors is None else vectors[i])
+    return writer.path.stat().st_size
@@ -0,0 +1,244 @@
+"""
+Near-Duplicate Chunk Elimination
+
+Collapses near-identical chunks before they are embedded: boilerplate
+repeated on every page, definitions restated per section, a table whose
+text was also captured by page.extract_text(). Each group becomes one
+canonical chunk, so the index is smaller, fewer chunks are embedded and
+the top-k context no longer carries the same text twice.
+
+1. Every chunk is reduced to its set of word 3-gram shingles (the BM25
+   tokenizer, so punctuation and table pipes are ignored)
+2. MinHash signatures (num_perm permutations) estimate shingle Jaccard
+   similarity; LSH banding puts chunks that agree on a whole band of the
+   signature in the same bucket
+3. Candidate pairs from shared buckets are verified with the exact
+   Jaccard similarity; pairs at or above the threshold are joined
+   (union-find)
+4. Per group the longest chunk is kept (first in document order on a tie)
+   at the position of the group's first chunk, with merged metadata:
+   `pages` and `sections` of every member, `plans` every member applies
+   to (so plan filters still find a clause merged from per-plan copies),
+   `duplicate_ids` of the dropped chunks, and `has_contact_info` if any
+   member had contact details
+"""
+
+import zlib
+from dataclasses import dataclass
+from typing import Dict, List, Sequence, Set, Tuple
+
+import numpy as np
+
+from voice_agent_orchestraction.rag.context_packer import jaccard, shingles
+from voice_agent_orchestraction.rag.metadata_filters import PLAN_KEYS
+
+MERSENNE_PRIME = (1 << 61) - 1
+MAX_HASH = (1 << 32) - 1
+
+
+class MinHasher:
+    """MinHash signatures over shingle sets (universal hashing, NumPy-vectorized)"""
+
+    def __init__(self, num_perm: int = 128, seed: int = 1):
+        rng = np.random.default_rng(seed)
+        self.num_perm = num_perm
+        self._a = rng.integers(1, MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+
+    def signature(self, shingle_set: Set[Tuple[str, ...]]) -> np.ndarray:
+        """uint64 signature of num_perm minimum hashes (all MAX_HASH for an empty set)."""
+        if not shingle_set:
+            return np.full(self.num_perm, MAX_HASH, dtype=np.uint64)
+        # crc32 is stable across processes (unlike hash()), so builds are reproducible
+        hashes = np.fromiter(
+            (zlib.crc32(" ".join(shingle).encode('utf-8')) for shingle in shingle_set),
+            dtype=np.uint64, count=len(shingle_set),
+        )
+        permuted = (hashes[:, None] * self._a + self._b) % MERSENNE_PRIME & MAX_HASH
+        return permuted.min(axis=0)
+
+
+def lsh_bands(threshold: float, num_perm: int) -> Tuple[int, int]:
+    """
+    LSH (bands, rows) for a similarity threshold: the split whose S-curve
+    midpoint (1/bands)^(1/rows) is highest without exceeding the threshold,
+    so pairs at the threshold are very likely to become candidates.
+    """
+    best = (num_perm, 1)
+    for rows in range(1, num_perm + 1):
+        if num_perm % rows:
+            continue
+        bands = num_perm // rows
+        if (1 / bands) ** (1 / rows) <= threshold:
+            best = (bands, rows)
+    return best
+
+
+class _UnionFind:
+    def __init__(self, n: int):
+        self.parent = list(range(n))
+
+    def find(self, i: int) -> int:
+        while self.parent[i] != i:
+            self.parent[i] = self.parent[self.parent[i]]
+            i = self.parent[i]
+        return i
+
+    def union(self, i: int, j: int):
+        root_i, root_j = self.find(i), self.find(j)
+        if root_i != root_j:
+            self.parent[max(root_i, root_j)] = min(root_i, root_j)
+
+
+@dataclass
+class DedupReport:
+    """What deduplication removed"""
+    chunks_in: int
+    chunks_out: int
+    groups: int  # Canonical chunks that absorbed duplicates
+    candidate_pairs: int  # LSH candidates checked with exact Jaccard
+    chars_removed: int
+
+    @property
+    def removed(self) -> int:
+        return self.chunks_in - self.chunks_out
+
+    def summary(self) -> str:
+        return (
+            f"{self.chunks_in} -> {self.chunks_out} chunks ({self.removed} near-duplicates merged into "
+            f"{self.groups} canonical chunks, {self.chars_removed:,} chars not embedded; "
+            f"{self.candidate_pairs} LSH candidate pairs verified)"
+        )
+
+    def to_dict(self) -> Dict[str, int]:
+        return {
+            'chunks_in': self.chunks_in,
+            'chunks_out': self.chunks_out,
+            'removed': self.removed,
+            'groups': self.groups,
+            'candidate_pairs': self.candidate_pairs,
+            'chars_removed': self.chars_removed,
+        }
+
+
+def find_near_duplicates(
+    texts: Sequence[str],
+    threshold: float = 0.85,
+    num_perm: int = 128,
+    shingle_size: int = 3,
+) -> Tuple[List[List[int]], int]:
+    """
+    Group texts whose shingle Jaccard similarity reaches the threshold.
+
+    Args:
+        texts: Chunk texts
+        threshold: Jaccard similarity at which two texts are duplicates
+        num_perm: MinHash permutations
+        shingle_size: Words per shingle
+
+    Returns:
+        (groups of positions in document order, including single-member groups; candidate pairs checked)
+    """
+    shingle_sets = [shingles(text, size=shingle_size) for text in texts]
+    hasher = MinHasher(num_perm)
+    signatures = [hasher.signature(shingle_set) for shingle_set in shingle_sets]
+    bands, rows = lsh_bands(threshold, num_perm)
+
+    union_find = _UnionFind(len(texts))
+    checked = set()
+    for band in range(bands):
+        buckets: Dict[bytes, List[int]] = {}
+        for i, signature in enumerate(signatures):
+            if shingle_sets[i]:
+                buckets.setdefault(signature[band * rows:(band + 1) * rows].tobytes(), []).append(i)
+        for members in buckets.values():
+            for x, i in enumerate(members):
+                for j in members[x + 1:]:
+                    if (i, j) in checked:
+                        continue
+                    checked.add((i, j))
+                    if jaccard(shingle_sets[i], shingle_sets[j]) >= threshold:
+                        union_find.union(i, j)
+
+    groups: Dict[int, List[int]] = {}
+    for i in range(len(texts)):
+        groups.setdefault(union_find.find(i), []).append(i)
+    return sorted(groups.values(), key=lambda group: group[0]), len(checked)
+
+
+def _plans(metadata: Dict) -> List[str]:
+    """Plans a chunk applies to, from every plan key (as read by the plan filter)."""
+    plans = []
+    for key in PLAN_KEYS:
+        value = metadata.get(key)
+        if isinstance(value, str):
+            plans.append(value)
+        elif isinstance(value, (list, tuple)):
+            plans.extend(value)
+    return plans
+
+
+def merge_duplicates(chunks: Sequence[Dict]) -> Dict:
+    """
+    One canonical chunk for a group of near-duplicates (document order).
+
+    The longest chunk is kept; its metadata gains the pages, sections,
+    plans and ids of the whole group.
+    """
+    canonical = max(chunks, key=lambda chunk: len(chunk['content']))  # First on a tie
+    metadata = dict(canonical['metadata'])
+    pages = sorted({chunk['metadata']['page'] for chunk in chunks if isinstance(chunk['metadata'].get('page'), int)})
+    if pages:
+        metadata['pages'] = pages
+    sections = list(dict.fromkeys(
+        chunk['metadata']['section'] for chunk in chunks if chunk['metadata'].get('section')
+    ))
+    if sections:
+        metadata['sections'] = sections
+    plans = list(dict.fromkeys(plan for chunk in chunks for plan in _plans(chunk['metadata'])))
+    if set(plans) - set(_plans(metadata)):
+        metadata['plans'] = plans
+    metadata['duplicate_ids'] = [chunk['id'] for chunk in chunks if chunk is not canonical]
+    if any(chunk['metadata'].get('has_contact_info') for chunk in chunks):
+        metadata['has_contact_info'] = True
+    return {**canonical, 'metadata': metadata}
+
+
+def deduplicate_chunks(
+    chunks: Sequence[Dict],
+    threshold: float = 0.85,
+    num_perm: int = 128,
+    shingle_size: int = 3,
+) -> Tuple[List[Dict], DedupReport]:
+    """
+    Collapse near-duplicate chunks (id / content / metadata dicts).
+
+    Args:
+        chunks: Chunks in document order
+        threshold: Shingle Jaccard similarity at which chunks are merged
+        num_perm: MinHash permutations (more = closer similarity estimates)
+        shingle_size: Words per shingle
+
+    Returns:
+        (chunks in document order with every group replaced by its canonical chunk, report)
+    """
+    groups, candidate_pairs = find_near_duplicates(
+        [chunk['content'] for chunk in chunks], threshold=threshold, num_perm=num_perm, shingle_size=shingle_size
+    )
+    result = []
+    chars_removed = 0
+    for group in groups:
+        if len(group) == 1:
+            result.append(chunks[group[0]])
+            continue
+        merged = merge_duplicates([chunks[i] for i in group])
+        result.append(merged)
+        chars_removed += sum(len(chunks[i]['content']) for i in group) - len(merged['content'])
+    report = DedupReport(
+        chunks_in=len(chunks),
+        chunks_out=len(result),
+        groups=sum(len(group) > 1 for group in groups),
+        candidate_pairs=candidate_pairs,
+        chars_removed=chars_removed,
+    )
+    return result, report
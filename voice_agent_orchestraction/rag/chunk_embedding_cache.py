@@ -0,0 +1,128 @@
+"""
+Chunk Embedding Cache
+
+Persistent, content-addressed store of chunk embeddings used by ingestion.
+Entries are keyed by (embedding model, dimensions, SHA-256 of the exact
+text that was embedded - the enriched text with its context header), so
+re-ingesting a revised policy only sends new or changed chunks to the
+OpenAI API; every unchanged chunk reuses its stored vector.
+
+The cache is a single SQLite file next to the index (it is not part of
+the published snapshots). Diffing a build against the previous one is by
+chunk id, which the chunker derives from the chunk content.
+"""
+
+import hashlib
+import sqlite3
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+CHUNK_EMBEDDING_CACHE_FILENAME = "chunk_embeddings.sqlite"
+
+
+def text_hash(text: str) -> str:
+    """SHA-256 of a text (hex)."""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+@dataclass
+class ChunkDiff:
+    """Chunk ids of a build compared with the previous build"""
+    added: List[str] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+    unchanged: List[str] = field(default_factory=list)
+
+    def summary(self) -> Dict[str, int]:
+        return {'added': len(self.added), 'removed': len(self.removed), 'unchanged': len(self.unchanged)}
+
+
+def diff_chunk_ids(previous_ids: Sequence[str], current_ids: Sequence[str]) -> ChunkDiff:
+    """
+    Compare two builds' chunk ids. With content-derived ids a changed chunk
+    shows up as one removed and one added id.
+    """
+    previous, current = set(previous_ids), set(current_ids)
+    return ChunkDiff(
+        added=[chunk_id for chunk_id in current_ids if chunk_id not in previous],
+        removed=[chunk_id for chunk_id in previous_ids if chunk_id not in current],
+        unchanged=[chunk_id for chunk_id in current_ids if chunk_id in previous],
+    )
+
+
+class ChunkEmbeddingCache:
+    """SQLite store of chunk embeddings keyed by model, dimensions and text hash"""
+
+    def __init__(self, path: str, model: str, dimensions: int):
+        """
+        Args:
+            path: SQLite file (created if missing)
+            model: Embedding model the vectors come from
+            dimensions: Embedding dimensions
+        """
+        self.path = path
+        self.model = model
+        self.dimensions = dimensions
+        self.hits = 0
+        self.misses = 0
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(path)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS chunk_embeddings ("
+            " key TEXT PRIMARY KEY, model TEXT, dimensions INTEGER,"
+            " text_hash TEXT, vector BLOB, created_at REAL, used_at REAL)"
+        )
+        self._db.commit()
+
+    def key(self, text: str) -> str:
+        """Cache key: model, dimensions and hash of the embedded text."""
+        return text_hash(f"{self.model}|{self.dimensions}|{text_hash(text)}")
+
+    def get_many(self, texts: Sequence[str]) -> List[Optional[np.ndarray]]:
+        """Stored vectors aligned with texts (None where missing); hits are marked as used."""
+        keys = [self.key(text) for text in texts]
+        found: Dict[str, np.ndarray] = {}
+        for start in range(0, len(keys), 500):  # Stay below SQLite's bound-parameter limit
+            batch = keys[start:start + 500]
+            rows = self._db.execute(
+                f"SELECT key, vector FROM chunk_embeddings WHERE key IN ({','.join('?' * len(batch))})", batch
+            ).fetchall()
+            found.update((key, np.frombuffer(vector, dtype=np.float32).copy()) for key, vector in rows)
+        if found:
+            now = time.time()
+            self._db.executemany("UPDATE chunk_embeddings SET used_at = ? WHERE key = ?", [(now, key) for key in found])
+            self._db.commit()
+        vectors = [found.get(key) for key in keys]
+        self.hits += sum(vector is not None for vector in vectors)
+        self.misses += sum(vector is None for vector in vectors)
+        return vectors
+
+    def put_many(self, texts: Sequence[str], vectors: Sequence[Sequence[float]]):
+        """Store embeddings of texts."""
+        now = time.time()
+        rows = [
+            (self.key(text), self.model, self.dimensions, text_hash(text),
+             np.asarray(vector, dtype=np.float32).tobytes(), now, now)
+            for text, vector in zip(texts, vectors)
+        ]
+        self._db.executemany("INSERT OR REPLACE INTO chunk_embeddings VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+        self._db.commit()
+
+    def prune(self, older_than_days: float) -> int:
+        """Delete entries not used for a number of days (chunks of long-replaced policy revisions)."""
+        cursor = self._db.execute(
+            "DELETE FROM chunk_embeddings WHERE used_at < ?", (time.time() - older_than_days * 86400,)
+        )
+        self._db.commit()
+        return cursor.rowcount
+
+    def __len__(self) -> int:
+        return self._db.execute("SELECT COUNT(*) FROM chunk_embeddings").fetchone()[0]
+
+    def close(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
@@ -1193,9 +1193,14 @@ Tables are converted to Markdown format for structure preservation.
 """
 
 import json
+import multiprocessing
 import re
+import time
 import hashlib
-from typing import List, Dict, Any, Optional, Tuple
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import List, Dict, Any, Iterator, Optional, Tuple
 from dataclasses import dataclass, asdict
 from pathlib import Path
 
@@ -1208,6 +1213,10 @@ except ImportError:
     print("Warning: pdfplumber not installed. Install with: pip install pdfplumber")
 
 
+# Page ranges per worker process: more, smaller ranges even out pages heavy with tables
+RANGES_PER_WORKER = 4
+
+
 @dataclass
 class Chunk:
     """Represents a single chunk of the document with metadata."""
@@ -1233,7 +1242,8 @@ class PolicyDocumentChunker:
     def __init__(self, pdf_path: Optional[str] = None):
         self.pdf_path = pdf_path
         self.chunks: List[Chunk] = []
-        self.chunk_counter = 0
+        self._id_counts: Dict[str, int] = {}  # Content-derived ID -> occurrences so far
+        self.extraction_stats: Dict[str, Any] = {}  # Pages, workers and pages/s of the last extract_from_pdf()
         
         # Patterns for detecting section types
         self._compile_section_patterns()
@@ -1320,12 +1330,25 @@ class PolicyDocumentChunker:
             for pattern, section_code, section_name, content_type in self.section_patterns
         ]
     
-    def _generate_id(self, prefix: str) -> str:
-        """Generate unique chunk ID."""
-        self.chunk_counter += 1
+    @staticmethod
+    def _id_prefix(metadata: Dict) -> str:
+        """ID prefix of a chunk: its section, plus _TBL for tables."""
+        if metadata.get("content_format") == "markdown_table":
+            return f"{metadata['section']}_TBL"
+        return metadata["section"]
+    
+    def _generate_id(self, prefix: str, content: str) -> str:
+        """
+        Generate a stable chunk ID from the chunk content.
+        Unchanged chunks keep their ID when other parts of the document change;
+        identical content repeated in the document is numbered in document order.
+        """
         clean_prefix = prefix.replace('.', '_').replace(' ', '_').replace('-', '_')[:25]
-        hash_suffix = hashlib.md5(str(self.chunk_counter).encode()).hexdigest()[:6]
-        return f"{clean_prefix}_{self.chunk_counter:03d}_{hash_suffix}"
+        content_hash = hashlib.sha256(content.encode('utf-8')).hexdigest()[:12]
+        chunk_id = f"{clean_prefix}_{content_hash}"
+        occurrence = self._id_counts.get(chunk_id, 0) + 1
+        self._id_counts[chunk_id] = occurrence
+        return chunk_id if occurrence == 1 else f"{chunk_id}_{occurrence}"
     
     def _detect_section(self, text: str, page_num: int, default_section: str = "MISC") -> Tuple[str, str, str]:
         """
@@ -1507,7 +1530,7 @@ class PolicyDocumentChunker:
             metadata['has_contact_info'] = True
         
         return Chunk(
-            id=self._generate_id(section_code),
+            id=self._generate_id(self._id_prefix(metadata), cleaned_content),
             content=cleaned_content,
             metadata=metadata
         )
@@ -1528,7 +1551,7 @@ class PolicyDocumentChunker:
         })
         
         return Chunk(
-            id=self._generate_id(f"{section_code}_TBL"),
+            id=self._generate_id(self._id_prefix(metadata), markdown_table),
             content=markdown_table,
             metadata=metadata
         )
@@ -1595,69 +1618,154 @@ class PolicyDocumentChunker:
         
         return chunks
     
-    def extract_from_pdf(self) -> List[Dict]:
-        """
-        Main extraction method.
-        Processes PDF page by page, preserving tables and all content.
-        """
+    def _extract_page(self, page, page_num: int, source: str) -> List[Chunk]:
+        """Chunks of one PDF page: tables first, then the text split at semantic boundaries."""
+        page_chunks = []
+        
+        # Extract tables with structure preservation
+        tables = page.extract_tables()
+        
+        for table_idx, table in enumerate(tables):
+            if not table:
+                continue
+            
+            # Convert to markdown
+            markdown_table = self._format_table_to_markdown(table)
+            
+            if markdown_table:
+                # Detect section from table content
+                sample = ' '.join(str(c) for row in table[:2] for c in row if c)
+                section_code, section_name, content_type = self._detect_section(sample, page_num)
+                
+                chunk = self._create_table_chunk(
+                    markdown_table, table, section_code, 
+                    section_name, content_type, page_num
+                )
+                
+                if chunk:
+                    page_chunks.append(chunk)
+        
+        # Extract text (excluding table areas to avoid duplication)
+        text = page.extract_text()
+        
+        if text:
+            # Detect section
+            section_code, section_name, content_type = self._detect_section(text, page_num)
+            
+            # Create semantic chunks
+            page_chunks.extend(self._split_into_semantic_chunks(
+                text, section_code, section_name, content_type, page_num
+            ))
+        
+        # Source document, so chunks of a multi-document index stay attributable
+        for chunk in page_chunks:
+            chunk.metadata["source"] = source
+        
+        return page_chunks
+    
+    def _check_pdf(self, pdf_path: Optional[str]):
         if not PDFPLUMBER_AVAILABLE:
             raise ImportError("pdfplumber required. Install: pip install pdfplumber")
         
-        if not self.pdf_path or not Path(self.pdf_path).exists():
-            raise FileNotFoundError(f"PDF not found: {self.pdf_path}")
+        if not pdf_path or not Path(pdf_path).exists():
+            raise FileNotFoundError(f"PDF not found: {pdf_path}")
+    
+    def _page_count(self, pdf_path: str) -> int:
+        with pdfplumber.open(pdf_path) as pdf:
+            return len(pdf.pages)
+    
+    def _iter_pages_parallel(self, pdf_path: str, total_pages: int, workers: int) -> Iterator[Tuple[int, List[Chunk]]]:
+        """
+        Pages of a PDF extracted by a process pool, yielded in page order.
         
-        print(f"Processing: {self.pdf_path}")
+        The pages are split into contiguous ranges; each worker opens the PDF
+        itself and chunks its range. Ranges are consumed in order (at most
+        2 x workers in flight) and chunk IDs are assigned here, in page order,
+        so the result never depends on which worker finishes first.
         
-        with pdfplumber.open(self.pdf_path) as pdf:
-            total_pages = len(pdf.pages)
-            print(f"Pages: {total_pages}\n")
-            
+        Workers are spawned, not forked: the streaming pipeline extracts from
+        its chunker thread, and forking a multi-threaded process can copy
+        locks held by other threads into the child.
+        """
+        ranges = iter(page_ranges(total_pages, workers * RANGES_PER_WORKER))
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+            pending = deque(
+                pool.submit(_extract_page_range, pdf_path, start, end)
+                for start, end in islice(ranges, 2 * workers)
+            )
+            while pending:
+                pages = pending.popleft().result()
+                following = next(ranges, None)
+                if following is not None:
+                    pending.append(pool.submit(_extract_page_range, pdf_path, *following))
+                for page_num, page_chunks in pages:
+                    for chunk in page_chunks:
+                        chunk.id = self._generate_id(self._id_prefix(chunk.metadata), chunk.content)
+                    yield page_num, page_chunks
+    
+    def iter_page_chunks(self, pdf_path: Optional[str] = None, workers: int = 1) -> Iterator[Tuple[int, List[Chunk]]]:
+        """
+        Stream a PDF page by page without keeping the chunks (see streaming_ingestion.py).
+        
+        Each page's parsed layout objects are released once its chunks are
+        yielded, so memory stays flat however long the document is. Chunk IDs
+        stay unique across every document streamed through the same chunker.
+        
+        Args:
+            pdf_path: PDF to read (default: self.pdf_path)
+            workers: Processes extracting page ranges in parallel (1 = this process)
+        
+        Yields:
+            (page number, chunks of that page)
+        """
+        pdf_path = pdf_path or self.pdf_path
+        self._check_pdf(pdf_path)
+        
+        if workers > 1:
+            total_pages = self._page_count(pdf_path)
+            if total_pages > 1:
+                yield from self._iter_pages_parallel(pdf_path, total_pages, min(workers, total_pages))
+                return
+        
+        source = Path(pdf_path).name
+        with pdfplumber.open(pdf_path) as pdf:
             for page_num, page in enumerate(pdf.pages, 1):
-                print(f"Page {page_num:2d}/{total_pages}: ", end="")
-                page_chunks = 0
-                
-                # Extract tables with structure preservation
-                tables = page.extract_tables()
-                
-                for table_idx, table in enumerate(tables):
-                    if not table:
-                        continue
-                    
-                    # Convert to markdown
-                    markdown_table = self._format_table_to_markdown(table)
-                    
-                    if markdown_table:
-                        # Detect section from table content
-                        sample = ' '.join(str(c) for row in table[:2] for c in row if c)
-                        section_code, section_name, content_type = self._detect_section(sample, page_num)
-                        
-                        chunk = self._create_table_chunk(
-                            markdown_table, table, section_code, 
-                            section_name, content_type, page_num
-                        )
-                        
-                        if chunk:
-                            self.chunks.append(chunk)
-                            page_chunks += 1
-                
-                # Extract text (excluding table areas to avoid duplication)
-                text = page.extract_text()
-                
-                if text:
-                    # Detect section
-                    section_code, section_name, content_type = self._detect_section(text, page_num)
-                    
-                    # Create semantic chunks
-                    text_chunks = self._split_into_semantic_chunks(
-                        text, section_code, section_name, content_type, page_num
-                    )
-                    self.chunks.extend(text_chunks)
-                    page_chunks += len(text_chunks)
-                
-                print(f"{page_chunks} chunks")
+                page_chunks = self._extract_page(page, page_num, source)
+                page.flush_cache()
+                yield page_num, page_chunks
+    
+    def extract_from_pdf(self, workers: int = 1) -> List[Dict]:
+        """
+        Main extraction method.
+        Processes PDF page by page, preserving tables and all content.
+        
+        Args:
+            workers: Processes extracting page ranges in parallel
+                (1 = sequential in this process)
+        """
+        self._check_pdf(self.pdf_path)
+        
+        print(f"Processing: {self.pdf_path}")
+        total_pages = self._page_count(self.pdf_path)
+        workers = max(1, min(workers, total_pages))
+        print(f"Pages: {total_pages} ({workers} worker{'s' if workers > 1 else ''})\n")
+        
+        start = time.perf_counter()
+        for page_num, page_chunks in self.iter_page_chunks(self.pdf_path, workers=workers):
+            self.chunks.extend(page_chunks)
+            print(f"Page {page_num:2d}/{total_pages}: {len(page_chunks)} chunks")
+        elapsed = time.perf_counter() - start
+        self.extraction_stats = {
+            "pages": total_pages,
+            "workers": workers,
+            "seconds": round(elapsed, 3),
+            "pages_per_second": round(total_pages / elapsed, 2) if elapsed else 0.0,
+        }
         
         print(f"\n{'='*50}")
         print(f"Total chunks created: {len(self.chunks)}")
+        print(f"Extracted {total_pages} pages in {elapsed:.2f}s "
+              f"({self.extraction_stats['pages_per_second']:.2f} pages/s, {workers} workers)")
         print(f"{'='*50}")
         
         return [c.to_dict() for c in self.chunks]
@@ -1709,6 +1817,28 @@ class PolicyDocumentChunker:
         return stats
 
 
+def page_ranges(total_pages: int, n_ranges: int) -> List[Tuple[int, int]]:
+    """Split pages 1..total_pages into up to n_ranges contiguous [start, end) ranges."""
+    n_ranges = max(1, min(n_ranges, total_pages))
+    bounds = [1 + total_pages * i // n_ranges for i in range(n_ranges + 1)]
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+def _extract_page_range(pdf_path: str, start: int, end: int) -> List[Tuple[int, List[Chunk]]]:
+    """
+    Process-pool worker: chunks of pages [start, end) of a PDF it opens itself.
+    Chunk IDs are provisional; the parent reassigns them in page order.
+    """
+    chunker = PolicyDocumentChunker()
+    source = Path(pdf_path).name
+    pages = []
+    with pdfplumber.open(pdf_path, pages=list(range(start, end))) as pdf:
+        for page in pdf.pages:
+            pages.append((page.page_number, chunker._extract_page(page, page.page_number, source)))
+            page.flush_cache()
+    return pages
+
+
 def main():
     """Example usage."""
     
@@ -0,0 +1,249 @@
+"""
+Context Packer
+
+Fits retrieved chunks into a token budget before they go into the tool
+output / chat context. Every context token is re-read by the LLM on each
+later turn of the call, so the packer:
+
+- drops near-duplicate chunks (word-shingle Jaccard similarity)
+- splits chunks into sentences, and markdown tables into header + rows
+- keeps the best-matching unit of every chunk while the budget allows
+  (earlier-ranked chunks first), then the remaining units that best match
+  the query (term overlap) until the budget is spent; chunks whose best
+  unit no longer fits are dropped and reported
+- keeps a table's header whenever any of its rows is kept
+- reports tokens before / after packing
+
+Tokens are counted with tiktoken (the LLM's encoding); if the encoding
+cannot be loaded, a ~4 characters per token estimate is used instead.
+"""
+
+import logging
+import re
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Sequence, Set, Tuple
+
+from voice_agent_orchestraction.rag.bm25_index import tokenize
+from voice_agent_orchestraction.rag.prefetch import content_terms
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TOKEN_ENCODING = "o200k_base"  # gpt-4.1 / gpt-4o family
+OMISSION_MARKER = "…"
+
+_SENTENCE_SPLIT = re.compile(r"(?<=[.!?।])\s+|\n+")
+_TABLE_SEPARATOR = re.compile(r"^\|?\s*:?-{2,}")
+
+_token_counters: Dict[str, Callable[[str], int]] = {}
+
+
+def get_token_counter(encoding: str = DEFAULT_TOKEN_ENCODING) -> Callable[[str], int]:
+    """Token counting function for a tiktoken encoding (cached), or the character estimate if unavailable."""
+    if encoding not in _token_counters:
+        try:
+            import tiktoken
+            encoder = tiktoken.get_encoding(encoding)
+            _token_counters[encoding] = lambda text: len(encoder.encode(text, disallowed_special=()))
+        except Exception as exc:
+            logger.warning(f"⚠️ tiktoken encoding '{encoding}' unavailable ({exc}) - estimating tokens from length")
+            _token_counters[encoding] = estimate_tokens
+    return _token_counters[encoding]
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token) when no tokenizer is available."""
+    return (len(text) + 3) // 4
+
+
+def shingles(text: str, size: int = 3) -> Set[Tuple[str, ...]]:
+    """Word n-gram set of a text (the text's words for very short texts)."""
+    words = tokenize(text)
+    if len(words) < size:
+        return {tuple(words)} if words else set()
+    return {tuple(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+
+def jaccard(a: Set, b: Set) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+@dataclass
+class _Unit:
+    """A sentence, table header or table row of one chunk"""
+    chunk: int
+    position: int
+    text: str
+    tokens: int
+    score: float = 0.0
+    is_header: bool = False
+    table: int = -1  # Table number within the chunk (-1 = prose)
+
+
+@dataclass
+class PackResult:
+    """Packed context plus what packing saved"""
+    text: str
+    tokens_before: int
+    tokens_after: int
+    chunks_in: int
+    duplicates_dropped: int = 0
+    chunks_trimmed: int = 0
+    chunks_dropped: int = 0  # Not even their best unit fit the budget
+
+    @property
+    def tokens_saved(self) -> int:
+        return self.tokens_before - self.tokens_after
+
+
+def split_units(text: str, chunk: int, count_tokens: Callable[[str], int]) -> List[_Unit]:
+    """Split a chunk into sentences and markdown table rows (header + separator kept as one unit)."""
+    units: List[_Unit] = []
+    lines = text.split("\n")
+    table, in_table, i = -1, False, 0
+    while i < len(lines):
+        line = lines[i]
+        if line.lstrip().startswith("|"):
+            if not in_table:
+                table += 1
+                in_table = True
+                header = [line]
+                if i + 1 < len(lines) and _TABLE_SEPARATOR.match(lines[i + 1].strip()):
+                    header.append(lines[i + 1])
+                    i += 1
+                header_text = "\n".join(header)
+                units.append(_Unit(chunk, len(units), header_text, count_tokens(header_text), is_header=True, table=table))
+            else:
+                units.append(_Unit(chunk, len(units), line, count_tokens(line), table=table))
+        else:
+            in_table = False
+            for sentence in _SENTENCE_SPLIT.split(line):
+                if sentence.strip():
+                    units.append(_Unit(chunk, len(units), sentence, count_tokens(sentence)))
+        i += 1
+    return units
+
+
+def _join_units(units: List[_Unit], kept: Set[int]) -> str:
+    """Kept units in original order; tables keep line structure, gaps become an omission marker."""
+    parts: List[str] = []
+    previous_kept = True
+    for unit in units:
+        if unit.position not in kept:
+            if previous_kept and parts:
+                parts.append(OMISSION_MARKER)
+            previous_kept = False
+            continue
+        parts.append(unit.text)
+        previous_kept = True
+    if parts and parts[-1] == OMISSION_MARKER:
+        parts.pop()
+    text = ""
+    for part in parts:
+        if not text:
+            text = part
+        elif part.lstrip().startswith("|") or text.endswith("|") or part == OMISSION_MARKER:
+            text += "\n" + part
+        else:
+            text += " " + part
+    return text
+
+
+def pack_context(
+    query: str,
+    chunks: Sequence[str],
+    token_budget: int,
+    count_tokens: Optional[Callable[[str], int]] = None,
+    duplicate_threshold: float = 0.8,
+    separator: str = "\n\n",
+) -> PackResult:
+    """
+    Fit ranked chunks into a token budget.
+
+    Args:
+        query: The query the chunks were retrieved for
+        chunks: Chunk texts, best first
+        token_budget: Maximum tokens of the packed context (<= 0 = only drop duplicates)
+        count_tokens: Token counting function (default: tiktoken DEFAULT_TOKEN_ENCODING)
+        duplicate_threshold: Shingle Jaccard similarity above which a chunk duplicates an earlier one
+        separator: Placed between packed chunks
+
+    Returns:
+        PackResult with the packed text and token counts
+    """
+    count_tokens = count_tokens or get_token_counter()
+    original = separator.join(chunks)
+    tokens_before = count_tokens(original) if original else 0
+
+    # Near-duplicates (e.g. the same clause on two pages) add nothing
+    kept_chunks: List[str] = []
+    kept_shingles: List[Set] = []
+    for chunk in chunks:
+        chunk_shingles = shingles(chunk)
+        if any(jaccard(chunk_shingles, seen) >= duplicate_threshold for seen in kept_shingles):
+            continue
+        kept_chunks.append(chunk)
+        kept_shingles.append(chunk_shingles)
+    duplicates = len(chunks) - len(kept_chunks)
+
+    deduplicated = separator.join(kept_chunks)
+    if token_budget <= 0 or count_tokens(deduplicated) <= token_budget:
+        tokens_after = count_tokens(deduplicated) if deduplicated else 0
+        return PackResult(deduplicated, tokens_before, tokens_after, len(chunks), duplicates)
+
+    query_terms = content_terms(query)
+    units_by_chunk = [split_units(chunk, i, count_tokens) for i, chunk in enumerate(kept_chunks)]
+    for rank, units in enumerate(units_by_chunk):
+        rank_weight = 1.0 / (1.0 + 0.25 * rank)
+        for unit in units:
+            terms = set(tokenize(unit.text))
+            overlap = len(query_terms & terms) / len(query_terms) if query_terms else 0.0
+            unit.score = overlap * rank_weight
+
+    separator_tokens = count_tokens(separator)
+    budget = token_budget - separator_tokens * (len(kept_chunks) - 1)
+    kept: List[Set[int]] = [set() for _ in kept_chunks]
+    spent = 0
+
+    def take(unit: _Unit) -> bool:
+        nonlocal spent
+        if unit.position in kept[unit.chunk]:
+            return True
+        cost = unit.tokens
+        header = None
+        if unit.table >= 0 and not unit.is_header:
+            header = next(u for u in units_by_chunk[unit.chunk] if u.is_header and u.table == unit.table)
+            if header.position not in kept[unit.chunk]:
+                cost += header.tokens
+        if spent + cost > budget:
+            return False
+        kept[unit.chunk].add(unit.position)
+        if header is not None:
+            kept[unit.chunk].add(header.position)
+        spent += cost
+        return True
+
+    # Best unit of every chunk first (each chunk was retrieved for a reason), then by score;
+    # a chunk whose best unit does not fit the remaining budget is dropped
+    for units in units_by_chunk:
+        content_units = [unit for unit in units if not unit.is_header] or units
+        take(max(content_units, key=lambda unit: (unit.score, -unit.position)))
+    ranked = sorted(
+        (unit for units in units_by_chunk for unit in units if not unit.is_header),
+        key=lambda unit: (-unit.score, unit.chunk, unit.position),
+    )
+    for unit in ranked:
+        take(unit)
+
+    packed, trimmed, dropped = [], 0, 0
+    for i, units in enumerate(units_by_chunk):
+        if not kept[i]:
+            dropped += 1
+            continue
+        trimmed += len(kept[i]) < len(units)
+        packed.append(_join_units(units, kept[i]))
+    text = separator.join(packed)
+    return PackResult(
+        text, tokens_before, count_tokens(text) if text else 0, len(chunks), duplicates, trimmed, dropped
+    )
@@ -0,0 +1,113 @@
+"""
+Adaptive Result Cutoff
+
+Chooses how many retrieved chunks to return from the fused score
+distribution instead of a fixed k. A confident single-answer lookup
+("customer care number") has one chunk far ahead of the rest and returns
+just that chunk; an ambiguous query with a flat score curve returns more,
+up to max_k.
+
+Policies, applied to the ranked scores in order:
+- max_k:     never more than max_k chunks (never fewer than min_k)
+- threshold: drop chunks scoring below min_score (absolute) or below
+             min_relative x the top score
+- gap:       cut at the first drop between neighbouring scores larger
+             than max_gap x the top score (the tail after an elbow)
+
+Scores must be higher-is-better; relative policies make the cutoff work
+for every fusion mode (weighted / faiss_candidates in 0-1, RRF, cosine).
+"""
+
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+import numpy as np
+
+CUTOFF_ALL = "all"  # Every candidate kept (up to max_k)
+CUTOFF_MAX_K = "max_k"
+CUTOFF_THRESHOLD = "threshold"
+CUTOFF_GAP = "gap"
+CUTOFF_REASONS = (CUTOFF_ALL, CUTOFF_MAX_K, CUTOFF_THRESHOLD, CUTOFF_GAP)
+
+
+@dataclass
+class CutoffPolicy:
+    """Adaptive cutoff parameters"""
+    max_k: int = 6
+    min_k: int = 1
+    min_score: float = 0.0  # Absolute score floor (0 = off)
+    min_relative: float = 0.3  # Fraction of the top score a chunk needs (0 = off)
+    max_gap: float = 0.25  # Score drop, as a fraction of the top score, that ends the result (0 = off)
+
+
+@dataclass
+class CutoffDecision:
+    """How many chunks a query keeps, and why"""
+    keep: int
+    candidates: int
+    reason: str
+    top_score: float = 0.0
+    cut_score: Optional[float] = None  # Score of the first dropped chunk
+
+
+def adaptive_cutoff(scores: np.ndarray, policy: CutoffPolicy) -> CutoffDecision:
+    """
+    Number of leading results to keep for one query.
+
+    Args:
+        scores: Fused scores, best first
+        policy: Cutoff parameters
+
+    Returns:
+        CutoffDecision (keep <= len(scores))
+    """
+    scores = np.asarray(scores, dtype=np.float32)
+    candidates = len(scores)
+    if not candidates:
+        return CutoffDecision(0, 0, CUTOFF_ALL)
+    top = float(scores[0])
+    limit = min(candidates, max(policy.max_k, 1))
+    min_k = min(max(policy.min_k, 1), limit)
+    keep, reason = limit, CUTOFF_MAX_K if limit < candidates else CUTOFF_ALL
+
+    floor = policy.min_score
+    if policy.min_relative > 0 and top > 0:
+        floor = max(floor, policy.min_relative * top)
+    below = np.flatnonzero(scores[min_k:limit] < floor)
+    if len(below):
+        keep, reason = min_k + int(below[0]), CUTOFF_THRESHOLD
+
+    if policy.max_gap > 0 and top > 0 and keep > min_k:
+        drops = scores[min_k - 1:keep - 1] - scores[min_k:keep]
+        elbow = np.flatnonzero(drops > policy.max_gap * top)
+        if len(elbow):
+            keep, reason = min_k + int(elbow[0]), CUTOFF_GAP
+
+    cut_score = float(scores[keep]) if keep < candidates else None
+    return CutoffDecision(keep, candidates, reason, top, cut_score)
+
+
+class CutoffStats:
+    """Running cutoff statistics for tuning the policy"""
+
+    def __init__(self):
+        self.queries = 0
+        self.kept = 0
+        self.candidates = 0
+        self.histogram: Dict[int, int] = {}  # Chunks kept -> queries
+        self.reasons: Dict[str, int] = {reason: 0 for reason in CUTOFF_REASONS}
+
+    def record(self, decision: CutoffDecision):
+        self.queries += 1
+        self.kept += decision.keep
+        self.candidates += decision.candidates
+        self.histogram[decision.keep] = self.histogram.get(decision.keep, 0) + 1
+        self.reasons[decision.reason] = self.reasons.get(decision.reason, 0) + 1
+
+    def stats(self) -> Dict:
+        return {
+            'queries': self.queries,
+            'mean_kept': self.kept / self.queries if self.queries else 0.0,
+            'histogram': dict(sorted(self.histogram.items())),
+            'reasons': dict(self.reasons),
+        }
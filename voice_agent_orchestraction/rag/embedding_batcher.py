@@ -0,0 +1,134 @@
+"""
+Token-Aware Embedding Batching
+
+Plans ingestion embedding requests with the embedding model's tokenizer
+(tiktoken cl100k_base for text-embedding-3-*):
+
+- every text is truncated to the per-input token limit on a token
+  boundary, and each truncation is reported
+- texts are sorted by token count (longest first) and packed into
+  requests up to the per-request token and input limits, so requests are
+  few and full instead of a fixed number of chunks each
+
+Character counts say little about tokens for Devanagari / mixed text, so
+when the encoding cannot be loaded a deliberately pessimistic byte-based
+estimate is used (requests are then smaller, never rejected).
+"""
+
+import logging
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_TOKEN_ENCODING = "cl100k_base"  # text-embedding-3-small / -large, ada-002
+MAX_INPUT_TOKENS = 8191  # Per input text
+MAX_REQUEST_TOKENS = 300_000  # Summed over the inputs of one request
+MAX_REQUEST_INPUTS = 2048
+
+
+class EmbeddingTokenizer:
+    """Token counting and truncation for embedding inputs"""
+
+    def __init__(self, encoding: str = EMBEDDING_TOKEN_ENCODING):
+        self.encoding = encoding
+        try:
+            import tiktoken
+            self._encoder = tiktoken.get_encoding(encoding)
+        except Exception as exc:
+            logger.warning(f"⚠️ tiktoken encoding '{encoding}' unavailable ({exc}) - using a byte-based token estimate")
+            self._encoder = None
+
+    @property
+    def exact(self) -> bool:
+        return self._encoder is not None
+
+    def count(self, text: str) -> int:
+        if self._encoder is not None:
+            return len(self._encoder.encode(text, disallowed_special=()))
+        # Pessimistic: 2 UTF-8 bytes per token (ASCII averages ~4, Devanagari ~2-3 bytes per token)
+        return (len(text.encode('utf-8')) + 1) // 2
+
+    def truncate(self, text: str, max_tokens: int) -> Tuple[str, int, int]:
+        """
+        Cut a text to at most max_tokens tokens.
+
+        Returns:
+            (text, original tokens, kept tokens)
+        """
+        if self._encoder is not None:
+            tokens = self._encoder.encode(text, disallowed_special=())
+            if len(tokens) <= max_tokens:
+                return text, len(tokens), len(tokens)
+            return self._encoder.decode(tokens[:max_tokens]), len(tokens), max_tokens
+        original = self.count(text)
+        if original <= max_tokens:
+            return text, original, original
+        kept = text.encode('utf-8')[:max_tokens * 2].decode('utf-8', errors='ignore')
+        return kept, original, self.count(kept)
+
+
+@dataclass
+class Truncation:
+    """One input cut to the per-input token limit"""
+    index: int
+    label: str
+    tokens: int
+    kept_tokens: int
+
+
+@dataclass
+class TokenBatch:
+    """Inputs of one embedding request"""
+    indices: List[int]  # Positions in the original text list
+    texts: List[str]
+    tokens: int
+
+
+def plan_batches(
+    texts: Sequence[str],
+    tokenizer: EmbeddingTokenizer,
+    max_input_tokens: int = MAX_INPUT_TOKENS,
+    max_request_tokens: int = MAX_REQUEST_TOKENS,
+    max_request_inputs: int = MAX_REQUEST_INPUTS,
+    labels: Optional[Sequence[str]] = None,
+) -> Tuple[List[TokenBatch], List[Truncation]]:
+    """
+    Truncate texts and pack them into requests.
+
+    Args:
+        texts: Texts to embed
+        tokenizer: Tokenizer of the embedding model
+        max_input_tokens: Per-input token limit (longer texts are truncated)
+        max_request_tokens: Token limit summed over one request
+        max_request_inputs: Inputs per request at most
+        labels: Names for the truncation report (default: positions)
+
+    Returns:
+        (batches, truncations) - batches hold original positions for reassembly
+    """
+    max_input_tokens = min(max_input_tokens, max_request_tokens)
+    prepared = []
+    truncations = []
+    for i, text in enumerate(texts):
+        kept, tokens, kept_tokens = tokenizer.truncate(text, max_input_tokens)
+        if kept_tokens < tokens:
+            truncations.append(Truncation(i, labels[i] if labels is not None else str(i), tokens, kept_tokens))
+        prepared.append((i, kept, kept_tokens))
+
+    # Longest first: big inputs open batches, short ones fill the remaining room
+    prepared.sort(key=lambda item: -item[2])
+    batches: List[TokenBatch] = []
+    for index, text, tokens in prepared:
+        target = None
+        for batch in batches:
+            if batch.tokens + tokens <= max_request_tokens and len(batch.indices) < max_request_inputs:
+                target = batch
+                break
+        if target is None:
+            target = TokenBatch([], [], 0)
+            batches.append(target)
+        target.indices.append(index)
+        target.texts.append(text)
+        target.tokens += tokens
+    return batches, truncations
@@ -0,0 +1,241 @@
+"""
+Query Embedding Cache
+
+Bounded LRU + TTL cache of query embeddings, keyed on the normalised query
+text, embedding model and dimensions. An optional SQLite tier persists
+entries across worker restarts and is pre-seeded at ingestion time with
+the queries the agent asks most often, so those never pay the embedding
+round trip.
+
+The in-memory tier is cheap enough to consult on the event loop; the
+SQLite tier does file I/O and should be read from an executor.
+"""
+
+import hashlib
+import logging
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_CACHE_FILENAME = "query_embeddings.sqlite"
+
+_WHITESPACE_RE = re.compile(r"\s+")
+_TRAILING_PUNCTUATION = " ?.!।"
+
+
+def normalize_query(query: str) -> str:
+    """Case-fold, collapse whitespace and drop trailing punctuation."""
+    return _WHITESPACE_RE.sub(" ", query.casefold()).strip(_TRAILING_PUNCTUATION)
+
+
+class EmbeddingCache:
+    """LRU + TTL query embedding cache with an optional persistent SQLite tier"""
+
+    def __init__(
+        self,
+        model: str,
+        dimensions: int,
+        maxsize: int = 1024,
+        ttl: Optional[float] = 86400.0,
+        persist_path: Optional[str] = None,
+    ):
+        """
+        Args:
+            model: Embedding model the vectors come from
+            dimensions: Embedding dimensions
+            maxsize: Maximum entries kept in memory
+            ttl: Seconds an in-memory entry stays valid (None = no expiry)
+            persist_path: SQLite file for the persistent tier (None = memory only)
+        """
+        self.model = model
+        self.dimensions = dimensions
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.persist_path = persist_path
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (vector, expires_at)
+        self._lock = threading.Lock()
+        self._db = None
+        self.hits = 0
+        self.persistent_hits = 0
+        self.misses = 0
+        if persist_path:
+            self._open_db(persist_path)
+
+    @property
+    def persistent(self) -> bool:
+        return self._db is not None
+
+    def key(self, query: str) -> str:
+        """Cache key: model, dimensions and normalised query text."""
+        raw = f"{self.model}|{self.dimensions}|{normalize_query(query)}"
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    # ------------------------------------------------------------------
+    # In-memory tier
+    # ------------------------------------------------------------------
+
+    def get(self, query: str) -> Optional[np.ndarray]:
+        """
+        Look a query up in memory. A miss is only counted here when there
+        is no persistent tier to fall back to (see get_persistent).
+        """
+        key = self.key(query)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                vector, expires_at = entry
+                if expires_at is None or expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return vector
+                del self._entries[key]
+            if self._db is None:
+                self.misses += 1
+        return None
+
+    def put(self, query: str, vector: Sequence[float]):
+        """Insert into memory, evicting the least recently used entry when full."""
+        self._put_key(self.key(query), np.asarray(vector, dtype=np.float32))
+
+    def _put_key(self, key: str, vector: np.ndarray):
+        expires_at = time.monotonic() + self.ttl if self.ttl else None
+        with self._lock:
+            self._entries[key] = (vector, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    # ------------------------------------------------------------------
+    # Persistent tier
+    # ------------------------------------------------------------------
+
+    def _open_db(self, path: str):
+        try:
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(path, timeout=5.0, check_same_thread=False)
+            # WAL lets several worker processes read while one writes
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS query_embeddings ("
+                " key TEXT PRIMARY KEY, model TEXT, dimensions INTEGER,"
+                " query TEXT, vector BLOB, created_at REAL)"
+            )
+            self._db.commit()
+        except sqlite3.Error as exc:
+            logger.warning(f"⚠️ Persistent embedding cache unavailable at {path}: {exc}")
+            self._db = None
+
+    def get_persistent(self, query: str) -> Optional[np.ndarray]:
+        """Look a query up in SQLite (blocking); hits are promoted to memory."""
+        if self._db is None:
+            return None
+        key = self.key(query)
+        try:
+            with self._lock:
+                row = self._db.execute(
+                    "SELECT vector FROM query_embeddings WHERE key = ?", (key,)
+                ).fetchone()
+        except sqlite3.Error as exc:
+            logger.warning(f"⚠️ Persistent embedding cache read failed: {exc}")
+            row = None
+        if row is None:
+            with self._lock:
+                self.misses += 1
+            return None
+        vector = np.frombuffer(row[0], dtype=np.float32).copy()
+        self._put_key(key, vector)
+        with self._lock:
+            self.persistent_hits += 1
+        return vector
+
+    def put_persistent(self, queries: Sequence[str], vectors: Sequence[Sequence[float]]):
+        """Write entries to SQLite (blocking) and to memory."""
+        rows = []
+        now = time.time()
+        for query, vector in zip(queries, vectors):
+            vector = np.asarray(vector, dtype=np.float32)
+            key = self.key(query)
+            self._put_key(key, vector)
+            rows.append((key, self.model, self.dimensions, normalize_query(query), vector.tobytes(), now))
+        if self._db is None or not rows:
+            return
+        try:
+            with self._lock:
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO query_embeddings VALUES (?, ?, ?, ?, ?, ?)", rows
+                )
+                self._db.commit()
+        except sqlite3.Error as exc:
+            logger.warning(f"⚠️ Persistent embedding cache write failed: {exc}")
+
+    def known_queries(self) -> List[str]:
+        """Normalised queries already stored in the persistent tier for this model/dimensions."""
+        if self._db is None:
+            return []
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT query FROM query_embeddings WHERE model = ? AND dimensions = ?",
+                (self.model, self.dimensions),
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def close(self):
+        if self._db is not None:
+            with self._lock:
+                self._db.close()
+                self._db = None
+
+    # ------------------------------------------------------------------
+    # Metrics
+    # ------------------------------------------------------------------
+
+    def stats(self) -> Dict:
+        """Hit/miss counters and hit rate across both tiers."""
+        with self._lock:
+            lookups = self.hits + self.persistent_hits + self.misses
+            return {
+                'size': len(self._entries),
+                'hits': self.hits,
+                'persistent_hits': self.persistent_hits,
+                'misses': self.misses,
+                'hit_rate': (self.hits + self.persistent_hits) / lookups if lookups else 0.0,
+            }
+
+
+def seed_embedding_cache(
+    cache: EmbeddingCache,
+    queries: Iterable[str],
+    embed_batch,
+    batch_size: int = 100,
+) -> int:
+    """
+    Embed queries not yet in the persistent tier and store them.
+
+    Args:
+        cache: Cache with a persistent tier
+        queries: Candidate queries (duplicates after normalisation are dropped)
+        embed_batch: Callable taking a list of texts and returning their embeddings
+        batch_size: Texts per embedding request
+
+    Returns:
+        Number of newly seeded queries
+    """
+    known = set(cache.known_queries())
+    pending = {}
+    for query in queries:
+        normalized = normalize_query(query)
+        if normalized and normalized not in known:
+            pending.setdefault(normalized, query)
+    new_queries = list(pending.values())
+    for i in range(0, len(new_queries), batch_size):
+        batch = new_queries[i:i + batch_size]
+        cache.put_persistent(batch, embed_batch(batch))
+    return len(new_queries)
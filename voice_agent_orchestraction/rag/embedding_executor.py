@@ -0,0 +1,268 @@
+"""
+Concurrent Embedding Executor
+
+Embeds large batches of texts for ingestion as fast as the OpenAI rate
+limits allow:
+
+- up to `concurrency` embedding requests in flight (async client)
+- token buckets for requests-per-minute and tokens-per-minute; a request
+  only starts once both budgets have room for it
+- 429 / 5xx / connection errors are retried with exponential backoff and
+  full jitter, never sooner than the server's Retry-After header
+- results are written back in input order, whatever order requests finish in
+- a progress line per finished batch and a final throughput report
+  (chunks/s, tokens/s, retries, time spent waiting for budget)
+"""
+
+import asyncio
+import random
+import time
+from dataclasses import dataclass
+from typing import Callable, List, Optional, Sequence
+
+import openai
+from openai import AsyncOpenAI
+
+from voice_agent_orchestraction.rag.context_packer import estimate_tokens
+
+RETRYABLE_STATUS_CODES = frozenset({408, 409, 429, 500, 502, 503, 504})
+
+
+class TokenBucket:
+    """Async token bucket refilled continuously at a per-minute rate"""
+
+    def __init__(self, per_minute: float, capacity: Optional[float] = None):
+        """
+        Args:
+            per_minute: Refill rate (requests or tokens per minute)
+            capacity: Burst size (default: one minute's worth)
+        """
+        self.rate = per_minute / 60.0
+        self.capacity = capacity or per_minute
+        self.available = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.available = min(self.capacity, self.available + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self, amount: float = 1.0) -> float:
+        """
+        Wait until `amount` is available and take it (amounts above the capacity take the full bucket).
+
+        Returns:
+            Seconds spent waiting
+        """
+        amount = min(amount, self.capacity)
+        waited = 0.0
+        async with self._lock:  # FIFO: a large request is not starved by smaller ones
+            self._refill()
+            while self.available < amount:
+                delay = (amount - self.available) / self.rate
+                await asyncio.sleep(delay)
+                waited += delay
+                self._refill()
+            self.available -= amount
+        return waited
+
+    def penalize(self, seconds: float):
+        """Drain the bucket so nothing starts for `seconds` (server-side rate limit hit)."""
+        self._refill()
+        self.available = min(self.available, -seconds * self.rate)
+
+
+@dataclass
+class EmbeddingReport:
+    """Throughput of one executor run"""
+    chunks: int = 0
+    tokens: int = 0
+    requests: int = 0
+    retries: int = 0
+    rate_limited: int = 0  # 429 responses
+    budget_wait_seconds: float = 0.0  # Summed over requests
+    seconds: float = 0.0
+
+    @property
+    def chunks_per_second(self) -> float:
+        return self.chunks / self.seconds if self.seconds else 0.0
+
+    @property
+    def tokens_per_second(self) -> float:
+        return self.tokens / self.seconds if self.seconds else 0.0
+
+    def summary(self) -> str:
+        return (
+            f"{self.chunks} chunks / {self.tokens:,} tokens in {self.seconds:.1f}s "
+            f"({self.chunks_per_second:.1f} chunks/s, {self.tokens_per_second:,.0f} tokens/s) | "
+            f"{self.requests} requests, {self.retries} retries ({self.rate_limited} rate limited), "
+            f"{self.budget_wait_seconds:.1f}s waiting for rate budget"
+        )
+
+
+def retry_after_seconds(exc: Exception) -> Optional[float]:
+    """Server-requested delay from a failed request's Retry-After / retry-after-ms headers."""
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    try:
+        if headers.get("retry-after-ms"):
+            return float(headers["retry-after-ms"]) / 1000
+        if headers.get("retry-after"):
+            return float(headers["retry-after"])
+    except ValueError:
+        return None  # HTTP-date form: fall back to backoff
+    return None
+
+
+def is_retryable(exc: Exception) -> bool:
+    if isinstance(exc, (openai.APIConnectionError, openai.APITimeoutError)):
+        return True
+    return isinstance(exc, openai.APIStatusError) and exc.status_code in RETRYABLE_STATUS_CODES
+
+
+class EmbeddingExecutor:
+    """Concurrent, rate-limited OpenAI embedding requests with in-order results"""
+
+    def __init__(
+        self,
+        api_key: str,
+        model: str,
+        dimensions: int,
+        concurrency: int = 4,
+        requests_per_minute: float = 3000,
+        tokens_per_minute: float = 1_000_000,
+        max_retries: int = 6,
+        retry_base_delay: float = 1.0,
+        retry_max_delay: float = 60.0,
+        count_tokens: Optional[Callable[[str], int]] = None,
+        progress: bool = True,
+    ):
+        """
+        Args:
+            api_key: OpenAI API key
+            model: Embedding model
+            dimensions: Embedding dimensions
+            concurrency: Requests in flight at most
+            requests_per_minute: RPM budget (your OpenAI tier's limit for the model)
+            tokens_per_minute: TPM budget
+            max_retries: Retries per request before giving up
+            retry_base_delay: First backoff ceiling in seconds (doubles per attempt)
+            retry_max_delay: Backoff ceiling
+            count_tokens: Token counter for the TPM budget (default: ~4 characters per token)
+            progress: Print a line per finished batch
+        """
+        self.api_key = api_key
+        self.model = model
+        self.dimensions = dimensions
+        self.concurrency = max(1, concurrency)
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.max_retries = max_retries
+        self.retry_base_delay = retry_base_delay
+        self.retry_max_delay = retry_max_delay
+        self.count_tokens = count_tokens or estimate_tokens
+        self.progress = progress
+        self.report = EmbeddingReport()
+
+    def backoff(self, attempt: int, exc: Exception) -> float:
+        """Full-jitter exponential backoff, at least the server's Retry-After."""
+        ceiling = min(self.retry_max_delay, self.retry_base_delay * 2 ** attempt)
+        delay = random.uniform(0, ceiling)
+        retry_after = retry_after_seconds(exc)
+        return max(delay, retry_after) if retry_after is not None else delay
+
+    async def embed_batches(
+        self,
+        batches: Sequence[Sequence[str]],
+        batch_tokens: Optional[Sequence[int]] = None,
+    ) -> List[List[List[float]]]:
+        """
+        Embed batches of texts concurrently.
+
+        Args:
+            batches: Texts per request
+            batch_tokens: Tokens per request when already counted (default: count_tokens)
+
+        Returns:
+            Embeddings per batch, in the order of `batches`
+        """
+        self.report = report = EmbeddingReport()
+        results: List[Optional[List[List[float]]]] = [None] * len(batches)
+        request_bucket = TokenBucket(self.requests_per_minute)
+        token_bucket = TokenBucket(self.tokens_per_minute)
+        semaphore = asyncio.Semaphore(self.concurrency)
+        total_chunks = sum(len(batch) for batch in batches)
+        done_batches = 0
+        start = time.perf_counter()
+        # Retries are ours (jittered, Retry-After aware); the client must not retry on its own
+        client = AsyncOpenAI(api_key=self.api_key, max_retries=0)
+
+        async def run(index: int, texts: Sequence[str]):
+            nonlocal done_batches
+            if batch_tokens is not None:
+                tokens = batch_tokens[index]
+            else:
+                tokens = sum(self.count_tokens(text) for text in texts)
+            async with semaphore:
+                for attempt in range(self.max_retries + 1):
+                    waited = await request_bucket.acquire(1)
+                    waited += await token_bucket.acquire(tokens)
+                    report.budget_wait_seconds += waited
+                    report.requests += 1
+                    try:
+                        response = await client.embeddings.create(
+                            model=self.model, input=list(texts), dimensions=self.dimensions
+                        )
+                        break
+                    except Exception as exc:
+                        if not is_retryable(exc) or attempt == self.max_retries:
+                            raise
+                        delay = self.backoff(attempt, exc)
+                        report.retries += 1
+                        if getattr(exc, "status_code", None) == 429:
+                            report.rate_limited += 1
+                            # Everyone backs off, not just this request
+                            request_bucket.penalize(delay)
+                        print(f"  Batch {index + 1} attempt {attempt + 1} failed ({exc.__class__.__name__}), retrying in {delay:.1f}s")
+                        await asyncio.sleep(delay)
+            results[index] = [item.embedding for item in sorted(response.data, key=lambda item: item.index)]
+            report.chunks += len(texts)
+            report.tokens += tokens
+            done_batches += 1
+            if self.progress:
+                elapsed = time.perf_counter() - start
+                print(
+                    f"  Batch {done_batches}/{len(batches)} done | {report.chunks}/{total_chunks} chunks | "
+                    f"{report.chunks / elapsed:.1f} chunks/s, {report.tokens / elapsed:,.0f} tokens/s"
+                )
+
+        try:
+            tasks = [asyncio.ensure_future(run(i, batch)) for i, batch in enumerate(batches)]
+            try:
+                await asyncio.gather(*tasks)
+            except BaseException:
+                for task in tasks:
+                    task.cancel()
+                raise
+        finally:
+            await client.close()
+            report.seconds = time.perf_counter() - start
+        return results
+
+    def embed(self, texts: Sequence[str], batch_size: int = 100) -> List[List[float]]:
+        """
+        Embed texts from synchronous code (ingestion), in order.
+
+        Args:
+            texts: Texts to embed
+            batch_size: Texts per request
+
+        Returns:
+            One embedding per text
+        """
+        batches = [texts[i:i + batch_size] for i in range(0, len(texts), batch_size)]
+        results = asyncio.run(self.embed_batches(batches))
+        return [embedding for batch in results for embedding in batch]
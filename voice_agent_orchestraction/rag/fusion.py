@@ -0,0 +1,129 @@
+"""
+Hybrid Score Fusion
+
+Combines FAISS (semantic) and BM25 (keyword) results held as aligned
+arrays of FAISS ids and scores. No per-document dicts or Python loops:
+candidate sets are merged with np.union1d/searchsorted and ranked with
+one argsort.
+
+Modes (HYBRID_FUSION_MODE):
+- weighted:         min-max normalise each leg, then
+                    (1 - weight) * faiss + weight * bm25
+- rrf:              Reciprocal Rank Fusion, sum of 1 / (rrf_k + rank)
+- faiss_candidates: BM25 scores only the FAISS candidate set, then the
+                    weighted combination over those candidates
+"""
+
+from typing import Tuple
+
+import numpy as np
+
+FUSION_WEIGHTED = "weighted"
+FUSION_RRF = "rrf"
+FUSION_FAISS_CANDIDATES = "faiss_candidates"
+FUSION_MODES = (FUSION_WEIGHTED, FUSION_RRF, FUSION_FAISS_CANDIDATES)
+
+DEFAULT_RRF_K = 60
+
+
+def minmax_normalize(scores: np.ndarray) -> np.ndarray:
+    """Scale scores to 0-1; a constant (single-valued) leg maps to 0.5."""
+    scores = np.asarray(scores, dtype=np.float32)
+    if not len(scores):
+        return scores
+    low, high = scores.min(), scores.max()
+    if high - low <= 0:
+        return np.full(len(scores), 0.5, dtype=np.float32)
+    return (scores - low) / (high - low)
+
+
+def _scatter(union_ids: np.ndarray, ids: np.ndarray, values: np.ndarray) -> np.ndarray:
+    """Place values of `ids` at their positions in the sorted union; 0 elsewhere."""
+    out = np.zeros(len(union_ids), dtype=np.float32)
+    if len(ids):
+        out[np.searchsorted(union_ids, ids)] = values
+    return out
+
+
+def _rank(ids: np.ndarray, scores: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Sort (ids, scores) by descending score; ties keep ascending id order."""
+    order = np.argsort(-scores, kind='stable')
+    return ids[order], scores[order]
+
+
+def fuse_weighted(
+    faiss_ids: np.ndarray,
+    faiss_scores: np.ndarray,
+    bm25_ids: np.ndarray,
+    bm25_scores: np.ndarray,
+    weight: float,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Weighted linear fusion of min-max normalised scores.
+    A document missing from one leg scores 0 for that leg.
+
+    Args:
+        faiss_ids, faiss_scores: FAISS hits (cosine similarity, higher is better)
+        bm25_ids, bm25_scores: BM25 hits
+        weight: BM25 weight (0.0 = FAISS only, 1.0 = BM25 only)
+
+    Returns:
+        (ids, scores) sorted by descending fused score
+    """
+    union_ids = np.union1d(faiss_ids, bm25_ids)
+    fused = (
+        (1 - weight) * _scatter(union_ids, faiss_ids, minmax_normalize(faiss_scores))
+        + weight * _scatter(union_ids, bm25_ids, minmax_normalize(bm25_scores))
+    )
+    return _rank(union_ids, fused)
+
+
+def fuse_rrf(
+    faiss_ids: np.ndarray,
+    bm25_ids: np.ndarray,
+    rrf_k: int = DEFAULT_RRF_K,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Reciprocal Rank Fusion. Uses ranks only, so the two legs' score
+    scales never need to be reconciled.
+
+    Args:
+        faiss_ids: FAISS hits, best first
+        bm25_ids: BM25 hits, best first
+        rrf_k: RRF smoothing constant
+
+    Returns:
+        (ids, scores) sorted by descending RRF score
+    """
+    union_ids = np.union1d(faiss_ids, bm25_ids)
+    faiss_rrf = 1.0 / (rrf_k + np.arange(1, len(faiss_ids) + 1, dtype=np.float32))
+    bm25_rrf = 1.0 / (rrf_k + np.arange(1, len(bm25_ids) + 1, dtype=np.float32))
+    fused = _scatter(union_ids, faiss_ids, faiss_rrf) + _scatter(union_ids, bm25_ids, bm25_rrf)
+    return _rank(union_ids, fused)
+
+
+def fuse_candidates(
+    candidate_ids: np.ndarray,
+    faiss_scores: np.ndarray,
+    bm25_scores: np.ndarray,
+    weight: float,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Weighted fusion over one candidate set scored by both legs
+    (BM25 restricted to the FAISS hits).
+
+    Args:
+        candidate_ids: FAISS hits
+        faiss_scores: FAISS scores aligned with candidate_ids
+        bm25_scores: BM25 scores aligned with candidate_ids
+        weight: BM25 weight
+
+    Returns:
+        (ids, scores) sorted by descending fused score
+    """
+    candidate_ids = np.asarray(candidate_ids)
+    fused = (1 - weight) * minmax_normalize(faiss_scores)
+    if len(bm25_scores) and np.any(bm25_scores > 0):
+        # Skip BM25 when no candidate contains a query term (all-zero leg would add a flat 0.5)
+        fused = fused + weight * minmax_normalize(bm25_scores)
+    return _rank(candidate_ids, fused)
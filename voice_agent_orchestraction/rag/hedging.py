@@ -0,0 +1,109 @@
+"""
+Hedged Requests
+
+Tail-latency guard for the query embedding call. Latencies of completed
+requests are tracked over a sliding window; when a request has not
+returned after the tracked percentile (p95 by default), an identical
+duplicate is sent and whichever answers first wins. The loser is
+cancelled. With too few samples no hedge is sent.
+
+At p95 roughly one request in twenty is duplicated, in exchange for
+cutting the slowest 5% of requests down to about p95 + a normal request.
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Awaitable, Callable, Dict, Optional, TypeVar
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class HedgedRequester:
+    """Sends a duplicate request when the first one is slower than the tracked percentile"""
+
+    def __init__(self, percentile: float = 95.0, min_samples: int = 20, window: int = 200, enabled: bool = True):
+        """
+        Args:
+            percentile: Latency percentile after which the duplicate request is sent
+            min_samples: Completed requests needed before hedging starts
+            window: Latest request latencies tracked
+            enabled: False = only track latencies, never hedge
+        """
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.enabled = enabled
+        self._latencies = deque(maxlen=window)
+        self.requests = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+
+    def record(self, seconds: float):
+        self._latencies.append(seconds)
+
+    def hedge_delay(self) -> Optional[float]:
+        """Seconds to wait before hedging, or None when hedging is off / there are too few samples."""
+        if not self.enabled or len(self._latencies) < self.min_samples:
+            return None
+        return float(np.percentile(np.fromiter(self._latencies, dtype=np.float64), self.percentile))
+
+    async def call(self, request: Callable[[], Awaitable[T]]) -> T:
+        """
+        Run a request, hedging it once if it is slower than the tracked percentile.
+
+        Args:
+            request: Creates a new, independent request each time it is called
+
+        Returns:
+            Result of the first request to succeed (raises if every attempt fails)
+        """
+        self.requests += 1
+        start = time.perf_counter()
+        delay = self.hedge_delay()
+        first = asyncio.ensure_future(request())
+        if delay is None:
+            result = await first
+            self.record(time.perf_counter() - start)
+            return result
+
+        done, _ = await asyncio.wait({first}, timeout=delay)
+        if done:
+            result = first.result()
+            self.record(time.perf_counter() - start)
+            return result
+
+        self.hedges += 1
+        logger.info(f"🏁 Request slower than p{self.percentile:.0f} ({delay * 1000:.0f}ms) - sending hedge")
+        attempts = [first, asyncio.ensure_future(request())]
+        try:
+            pending, error = set(attempts), None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for attempt in attempts:
+                    if attempt not in done:
+                        continue
+                    if attempt.exception() is None:
+                        if attempt is not first:
+                            self.hedge_wins += 1
+                        self.record(time.perf_counter() - start)
+                        return attempt.result()
+                    error = error or attempt.exception()
+            raise error
+        finally:
+            for attempt in attempts:
+                if not attempt.done():
+                    attempt.cancel()
+
+    def stats(self) -> Dict:
+        delay = self.hedge_delay()
+        return {
+            'requests': self.requests,
+            'hedges': self.hedges,
+            'hedge_wins': self.hedge_wins,
+            'hedge_after_ms': round(delay * 1000, 1) if delay is not None else None,
+        }
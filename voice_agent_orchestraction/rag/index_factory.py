@@ -0,0 +1,215 @@
+"""
+FAISS Index Factory and Benchmark
+
+Builds the index type selected by IngestionConfig.faiss_index_type, all
+over inner product on L2-normalised vectors (cosine similarity):
+
+- IndexFlatIP: exact search (baseline)
+- IVFFlat:     inverted lists, exact vectors; tune with nprobe
+- IVFPQ:       inverted lists, product-quantised codes (smallest memory)
+- HNSW:        graph search over exact vectors; tune with efSearch
+- SQ8:         exact scan over 8-bit scalar-quantised vectors (4x smaller)
+
+benchmark_index compares an index against the flat baseline on the same
+corpus: recall@k, p50/p99 single-query latency and serialized size.
+"""
+
+import logging
+import math
+import time
+from typing import Dict, Optional
+
+import faiss
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+INDEX_FLAT = "IndexFlatIP"
+INDEX_IVF_FLAT = "IVFFlat"
+INDEX_IVF_PQ = "IVFPQ"
+INDEX_HNSW = "HNSW"
+INDEX_SQ8 = "SQ8"
+INDEX_TYPES = (INDEX_FLAT, INDEX_IVF_FLAT, INDEX_IVF_PQ, INDEX_HNSW, INDEX_SQ8)
+TRAINED_INDEX_TYPES = (INDEX_IVF_FLAT, INDEX_IVF_PQ, INDEX_SQ8)  # Need corpus vectors before the first add
+
+DEFAULT_NPROBE = 16
+DEFAULT_EF_SEARCH = 64
+
+
+def default_nlist(n_vectors: int) -> int:
+    """~4*sqrt(n) inverted lists, capped so every list gets >= 39 training points."""
+    return max(1, min(int(4 * math.sqrt(n_vectors)), n_vectors // 39))
+
+
+def needs_training(index_type: str) -> bool:
+    """Whether an index type must be trained on corpus vectors before vectors can be added."""
+    return index_type in TRAINED_INDEX_TYPES
+
+
+def factory_string(
+    index_type: str,
+    dimension: int,
+    n_vectors: int,
+    nlist: Optional[int] = None,
+    pq_m: int = 64,
+    pq_nbits: int = 8,
+    hnsw_m: int = 32,
+) -> str:
+    """
+    faiss.index_factory description for an index type, adapted to corpus size.
+
+    Raises:
+        ValueError: On an unknown index type
+    """
+    if index_type == INDEX_FLAT:
+        return "Flat"
+    if index_type == INDEX_SQ8:
+        return "SQ8"
+    if index_type == INDEX_HNSW:
+        return f"HNSW{hnsw_m},Flat"
+    if index_type in (INDEX_IVF_FLAT, INDEX_IVF_PQ):
+        nlist = min(nlist or default_nlist(n_vectors), max(1, n_vectors))
+        if index_type == INDEX_IVF_FLAT:
+            return f"IVF{nlist},Flat"
+        # PQ sub-quantizers must divide the dimension; k-means needs >= 2**nbits points
+        while dimension % pq_m:
+            pq_m -= 1
+        nbits = min(pq_nbits, max(1, int(math.log2(max(2, n_vectors)))))
+        if nbits != pq_nbits:
+            logger.warning(f"⚠️ Only {n_vectors} training vectors - using {nbits}-bit PQ codes instead of {pq_nbits}")
+        return f"IVF{nlist},PQ{pq_m}x{nbits}"
+    raise ValueError(f"Unknown FAISS index type '{index_type}'. Supported: {', '.join(INDEX_TYPES)}")
+
+
+def create_index(
+    index_type: str,
+    dimension: int,
+    training_vectors: Optional[np.ndarray] = None,
+    **factory_params,
+) -> faiss.Index:
+    """
+    Create an empty index, trained on the corpus when the type requires it.
+
+    Args:
+        index_type: One of INDEX_TYPES
+        dimension: Vector dimension
+        training_vectors: L2-normalised corpus vectors (required for IVF, PQ and SQ types)
+        **factory_params: nlist, pq_m, pq_nbits, hnsw_m (see factory_string)
+
+    Returns:
+        Empty, trained faiss.Index
+
+    Raises:
+        ValueError: If the index needs training and no vectors were given
+    """
+    n_vectors = len(training_vectors) if training_vectors is not None else 0
+    description = factory_string(index_type, dimension, n_vectors, **factory_params)
+    index = faiss.index_factory(dimension, description, faiss.METRIC_INNER_PRODUCT)
+    if not index.is_trained:
+        if training_vectors is None:
+            raise ValueError(f"{index_type} ({description}) must be trained - pass the corpus vectors")
+        train_start = time.perf_counter()
+        index.train(np.ascontiguousarray(training_vectors, dtype=np.float32))
+        logger.info(f"Trained {description} on {n_vectors} vectors in {time.perf_counter() - train_start:.2f}s")
+    return index
+
+
+def build_index(index_type: str, vectors: np.ndarray, **factory_params) -> faiss.Index:
+    """Create, train (if required) and fill an index with L2-normalised vectors."""
+    vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+    index = create_index(index_type, vectors.shape[1], vectors, **factory_params)
+    index.add(vectors)
+    return index
+
+
+def configure_search(index: faiss.Index, nprobe: Optional[int] = None, ef_search: Optional[int] = None):
+    """Set query-time knobs on an IVF (nprobe) or HNSW (efSearch) index; no-op for other types."""
+    ivf = faiss.try_extract_index_ivf(index)
+    if ivf is not None and nprobe:
+        ivf.nprobe = min(nprobe, ivf.nlist)
+    hnsw = _hnsw_of(index)
+    if hnsw is not None and ef_search:
+        hnsw.hnsw.efSearch = ef_search
+
+
+def _hnsw_of(index: faiss.Index):
+    downcast = faiss.downcast_index(index)
+    return downcast if isinstance(downcast, faiss.IndexHNSW) else None
+
+
+def search_parameters(index: faiss.Index, selector=None) -> faiss.SearchParameters:
+    """
+    SearchParameters for a filtered search that keep the index's own
+    nprobe/efSearch (a plain SearchParameters would reset them to defaults).
+    """
+    ivf = faiss.try_extract_index_ivf(index)
+    if ivf is not None:
+        return faiss.SearchParametersIVF(sel=selector, nprobe=ivf.nprobe)
+    hnsw = _hnsw_of(index)
+    if hnsw is not None:
+        return faiss.SearchParametersHNSW(sel=selector, efSearch=hnsw.hnsw.efSearch)
+    return faiss.SearchParameters(sel=selector)
+
+
+def index_memory_bytes(index: faiss.Index) -> int:
+    """Serialized size of an index, a close proxy for its resident memory."""
+    return int(faiss.serialize_index(index).nbytes)
+
+
+def benchmark_index(
+    index: faiss.Index,
+    baseline: faiss.Index,
+    queries: np.ndarray,
+    k: int = 10,
+) -> Dict:
+    """
+    Compare an index against the exact baseline.
+
+    Args:
+        index: Index under test (search knobs already configured)
+        baseline: Exact IndexFlatIP over the same vectors
+        queries: L2-normalised query vectors, shape (q, d)
+        k: Neighbours per query for recall@k
+
+    Returns:
+        Dict with recall_at_k, latency p50/p99 (ms) and memory (bytes)
+    """
+    queries = np.ascontiguousarray(queries, dtype=np.float32)
+    k = min(k, baseline.ntotal)
+    _, truth = baseline.search(queries, k)
+    _, found = index.search(queries, k)
+    recall = np.mean([
+        len(set(f[f != -1]) & set(t[t != -1])) / max(1, (t != -1).sum())
+        for f, t in zip(found, truth)
+    ])
+
+    # Single-query latency, as the voice agent issues one query at a time
+    latencies = []
+    for query in queries:
+        start = time.perf_counter()
+        index.search(query[None, :], k)
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    return {
+        'recall_at_k': round(float(recall), 4),
+        'k': k,
+        'latency_p50_ms': round(float(np.percentile(latencies, 50)), 4),
+        'latency_p99_ms': round(float(np.percentile(latencies, 99)), 4),
+        'memory_bytes': index_memory_bytes(index),
+        'n_queries': len(queries),
+    }
+
+
+def sample_benchmark_queries(vectors: np.ndarray, n_queries: int = 200, noise: float = 0.3, seed: int = 0) -> np.ndarray:
+    """
+    Benchmark queries: sampled corpus vectors plus Gaussian noise of norm ~`noise`,
+    re-normalised, so each query is near (but not exactly on) a stored chunk.
+    """
+    rng = np.random.default_rng(seed)
+    picks = rng.choice(len(vectors), size=min(n_queries, len(vectors)), replace=False)
+    dimension = vectors.shape[1]
+    perturbation = rng.standard_normal((len(picks), dimension)).astype(np.float32) * (noise / math.sqrt(dimension))
+    queries = vectors[picks] + perturbation
+    queries = np.ascontiguousarray(queries, dtype=np.float32)
+    faiss.normalize_L2(queries)
+    return queries
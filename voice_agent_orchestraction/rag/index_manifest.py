@@ -0,0 +1,186 @@
+"""
+FAISS Index Manifest
+
+Written by the ingestion pipeline next to the index files and validated by
+the runtime at load time. Everything the runtime needs to trust an index
+(embedding model, dimensions, vector count, metric, file checksums) is
+recorded here, so startup needs no embedding call to OpenAI.
+"""
+
+import hashlib
+import json
+import logging
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILENAME = "manifest.json"
+MANIFEST_FORMAT_VERSION = 1
+
+
+class IndexManifestError(ValueError):
+    """Raised when an index does not match its manifest or the runtime configuration"""
+
+
+def file_sha256(path: Path, block_size: int = 1 << 20) -> str:
+    """Stream a file through SHA-256."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def build_manifest(
+    index_dir: str,
+    files: Iterable[str],
+    model: str,
+    dimensions: int,
+    vector_count: int,
+    chunk_count: int,
+    metric: str = "inner_product",
+    normalized: bool = True,
+    index_type: str = "IndexFlatIP",
+    embedded_text: str = "content",
+) -> Dict:
+    """
+    Build a manifest dict for the files of an index directory.
+
+    Args:
+        index_dir: Directory containing the index files
+        files: File names (relative to index_dir) to checksum
+        model: Embedding model used to build the vectors
+        dimensions: Embedding dimensions
+        vector_count: Number of vectors in the FAISS index
+        chunk_count: Number of chunks in the chunk store
+        metric: FAISS metric ("inner_product" or "l2")
+        normalized: Whether vectors were L2-normalised before indexing
+        index_type: FAISS index type
+        embedded_text: What was embedded per chunk ("enriched" text with context header, or raw "content")
+
+    Returns:
+        Manifest dict
+    """
+    checksums = {
+        name: file_sha256(Path(index_dir) / name)
+        for name in files
+    }
+    return {
+        'format_version': MANIFEST_FORMAT_VERSION,
+        'model': model,
+        'dimensions': dimensions,
+        'vector_count': vector_count,
+        'chunk_count': chunk_count,
+        'metric': metric,
+        'normalized': normalized,
+        'index_type': index_type,
+        'embedded_text': embedded_text,
+        'created_at': datetime.now().isoformat(),
+        'checksums': checksums,
+    }
+
+
+def write_manifest(index_dir: str, manifest: Dict) -> Path:
+    """Write the manifest to index_dir/manifest.json."""
+    path = Path(index_dir) / MANIFEST_FILENAME
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    return path
+
+
+def load_manifest(index_dir: str) -> Optional[Dict]:
+    """Load index_dir/manifest.json, or None if the index predates manifests."""
+    path = Path(index_dir) / MANIFEST_FILENAME
+    if not path.exists():
+        return None
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def manifest_fingerprint(manifest: Optional[Dict]) -> Optional[str]:
+    """Short digest identifying one build of an index (changes whenever any indexed file changes)."""
+    if manifest is None:
+        return None
+    payload = json.dumps(
+        {key: manifest.get(key) for key in ('model', 'dimensions', 'vector_count', 'created_at', 'checksums')},
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]
+
+
+def verify_checksums(index_dir: str, manifest: Dict):
+    """Check every file listed in the manifest against its recorded SHA-256."""
+    for name, expected in manifest.get('checksums', {}).items():
+        path = Path(index_dir) / name
+        if not path.exists():
+            raise IndexManifestError(f"File listed in manifest is missing: {path}")
+        actual = file_sha256(path)
+        if actual != expected:
+            raise IndexManifestError(
+                f"Checksum mismatch for {name}: manifest {expected[:12]}…, on disk {actual[:12]}…. "
+                f"The index directory was modified after ingestion; please rebuild the FAISS index."
+            )
+
+
+def validate_index(
+    manifest: Optional[Dict],
+    index_dimensions: int,
+    vector_count: int,
+    chunk_count: int,
+    expected_model: str,
+    expected_dimensions: int,
+):
+    """
+    Validate a loaded index against its manifest and the runtime configuration.
+    Purely offline: no embedding call is made.
+
+    Raises:
+        IndexManifestError: On any mismatch
+    """
+    if index_dimensions != expected_dimensions:
+        raise IndexManifestError(
+            f"Embedding dimension mismatch. "
+            f"Index has {index_dimensions} dimensions, but runtime is configured for {expected_dimensions}. "
+            f"Please rebuild the FAISS index."
+        )
+
+    if manifest is None:
+        logger.warning(
+            f"⚠️ No {MANIFEST_FILENAME} found - skipping model/metric validation. "
+            f"Re-run ingestion to generate one."
+        )
+        return
+
+    if manifest.get('format_version', 0) > MANIFEST_FORMAT_VERSION:
+        raise IndexManifestError(
+            f"Manifest format {manifest.get('format_version')} is newer than supported ({MANIFEST_FORMAT_VERSION})"
+        )
+
+    if manifest.get('model') != expected_model:
+        raise IndexManifestError(
+            f"Embedding model mismatch. Index was built with {manifest.get('model')}, "
+            f"but runtime embeds queries with {expected_model}."
+        )
+
+    if manifest.get('dimensions') != index_dimensions:
+        raise IndexManifestError(
+            f"Manifest records {manifest.get('dimensions')} dimensions, but index has {index_dimensions}"
+        )
+
+    if manifest.get('vector_count') != vector_count:
+        raise IndexManifestError(
+            f"Manifest records {manifest.get('vector_count')} vectors, but index has {vector_count}"
+        )
+
+    if manifest.get('chunk_count') != chunk_count:
+        raise IndexManifestError(
+            f"Manifest records {manifest.get('chunk_count')} chunks, but chunk store has {chunk_count}"
+        )
+
+    if manifest.get('metric') != "inner_product" or not manifest.get('normalized', False):
+        raise IndexManifestError(
+            f"Unsupported index metric {manifest.get('metric')} (normalized={manifest.get('normalized')}); "
+            f"runtime expects inner product over L2-normalised vectors"
+        )
@@ -0,0 +1,315 @@
+"""
+Index Registry
+
+Holds several named corpora (e.g. one index per policy product or
+language), each an index directory written by ingestion.py, and routes a
+call to one of them from the LiveKit job metadata.
+
+Indexes are loaded lazily on first use and kept in LRU order. When the
+footprint of the loaded indexes exceeds the memory budget, the least
+recently used unpinned indexes are dropped; their memory-mapped pages are
+released once no in-flight retrieval still references them.
+
+Registry file (JSON), directories relative to the file:
+
+    {
+      "default": "optima_secure",
+      "indexes": {
+        "optima_secure": {"dir": "faiss_index", "products": ["optima secure"], "pinned": true},
+        "optima_lite": {"dir": "faiss_index_optima_lite", "products": ["optima lite"]},
+        "optima_secure_hi": {"dir": "faiss_index_hi", "products": ["optima secure"], "languages": ["hi"]}
+      }
+    }
+"""
+
+import json
+import logging
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INDEX_FILE_NAME = "hdfc_ergo_policy"
+
+# Job metadata keys, in routing priority order
+INDEX_METADATA_KEYS = ("rag_index", "index")
+PRODUCT_METADATA_KEYS = ("product", "plan", "policy")
+LANGUAGE_METADATA_KEYS = ("language", "lang")
+
+# Files the runtime maps into memory (embeddings.npy is a by-product of older ingestion runs)
+_RUNTIME_SUFFIXES = (".index", ".bundle", ".bin", ".npy")
+_NON_RUNTIME_FILES = ("embeddings.npy",)
+
+
+def _normalize(value) -> str:
+    return str(value).strip().lower()
+
+
+@dataclass
+class IndexSpec:
+    """One named corpus: an index directory plus its routing keys"""
+    name: str
+    index_dir: str
+    index_name: str = DEFAULT_INDEX_FILE_NAME  # Index file name without extension
+    products: Tuple[str, ...] = ()
+    languages: Tuple[str, ...] = ()
+    pinned: bool = False  # Never evicted
+
+    def __post_init__(self):
+        self.products = tuple(_normalize(product) for product in self.products)
+        self.languages = tuple(_normalize(language) for language in self.languages)
+
+
+def load_registry_config(path: str) -> Tuple[Dict[str, IndexSpec], Optional[str]]:
+    """
+    Read a registry JSON file.
+
+    Args:
+        path: Registry file; index directories are resolved relative to it
+
+    Returns:
+        (specs by name, default index name or None)
+    """
+    path = Path(path)
+    with open(path, 'r', encoding='utf-8') as f:
+        config = json.load(f)
+
+    specs = {}
+    for name, entry in config.get('indexes', {}).items():
+        index_dir = Path(entry['dir'])
+        if not index_dir.is_absolute():
+            index_dir = path.parent / index_dir
+        specs[name] = IndexSpec(
+            name=name,
+            index_dir=str(index_dir),
+            index_name=entry.get('index_name', DEFAULT_INDEX_FILE_NAME),
+            products=tuple(entry.get('products', ())),
+            languages=tuple(entry.get('languages', ())),
+            pinned=bool(entry.get('pinned', False)),
+        )
+    return specs, config.get('default')
+
+
+def index_footprint_bytes(index_dir: str) -> int:
+    """Size of the files the runtime maps for an index (FAISS index, chunk bundle, BM25, bitmaps)."""
+    return sum(
+        path.stat().st_size
+        for path in Path(index_dir).iterdir()
+        if path.suffix in _RUNTIME_SUFFIXES and path.name not in _NON_RUNTIME_FILES
+    )
+
+
+def parse_job_metadata(metadata) -> Dict[str, Any]:
+    """
+    Job metadata as a dict. LiveKit passes dispatch metadata as a string:
+    JSON objects are parsed, any other non-empty string is taken as an index name.
+    """
+    if isinstance(metadata, Mapping):
+        return dict(metadata)
+    if not metadata:
+        return {}
+    try:
+        parsed = json.loads(metadata)
+    except (TypeError, ValueError):
+        return {INDEX_METADATA_KEYS[0]: str(metadata).strip()}
+    return parsed if isinstance(parsed, dict) else {}
+
+
+def _first(metadata: Mapping, keys: Iterable[str]) -> Optional[str]:
+    for key in keys:
+        if metadata.get(key) not in (None, ""):
+            return _normalize(metadata[key])
+    return None
+
+
+class IndexRegistry:
+    """Named indexes, loaded lazily and evicted LRU under a memory budget (the default is never evicted)"""
+
+    def __init__(
+        self,
+        specs: Mapping[str, IndexSpec],
+        default: str,
+        loader: Callable[[IndexSpec], Any],
+        memory_budget_bytes: int = 0,
+    ):
+        """
+        Args:
+            specs: Index specs by name
+            default: Index used when a call names or routes to none
+            loader: Loads one index (blocking) and returns its assets
+            memory_budget_bytes: Footprint allowed for loaded indexes; 0 = never evict
+        """
+        if default not in specs:
+            raise ValueError(f"Default index '{default}' is not registered. Known: {', '.join(specs)}")
+        self.specs = dict(specs)
+        self.default = default
+        self.loader = loader
+        self.memory_budget_bytes = memory_budget_bytes
+        self._loaded: "OrderedDict[str, Tuple[Any, int]]" = OrderedDict()  # name -> (assets, footprint)
+        self._lock = threading.Lock()
+        self._load_locks = {name: threading.Lock() for name in self.specs}
+        self.loads = 0
+        self.evictions = 0
+
+    @property
+    def names(self) -> List[str]:
+        return list(self.specs)
+
+    def resolve_name(self, name: Optional[str] = None) -> str:
+        """
+        Registered index name for a requested one (None = default).
+
+        Raises:
+            ValueError: On an unknown index name
+        """
+        if name is None:
+            return self.default
+        if name not in self.specs:
+            raise ValueError(f"Unknown index '{name}'. Known: {', '.join(self.specs)}")
+        return name
+
+    def spec(self, name: Optional[str] = None) -> IndexSpec:
+        return self.specs[self.resolve_name(name)]
+
+    def loaded(self, name: Optional[str] = None) -> Optional[Any]:
+        """Assets of an index if already loaded (no disk access), marking it recently used."""
+        name = self.resolve_name(name)
+        with self._lock:
+            entry = self._loaded.get(name)
+            if entry is None:
+                return None
+            self._loaded.move_to_end(name)
+            return entry[0]
+
+    def get(self, name: Optional[str] = None) -> Any:
+        """
+        Assets of an index, loading it on first use (blocking - call off the event loop).
+        Concurrent first uses of the same index share one load.
+        """
+        name = self.resolve_name(name)
+        assets = self.loaded(name)
+        if assets is not None:
+            return assets
+        with self._load_locks[name]:
+            assets = self.loaded(name)
+            if assets is not None:
+                return assets
+            assets = self.loader(self.specs[name])
+            self.loads += 1
+            self.put(name, assets)
+        return assets
+
+    def loaded_items(self) -> List[Tuple[str, Any]]:
+        """(name, assets) of every loaded index, without touching LRU order."""
+        with self._lock:
+            return [(name, assets) for name, (assets, _) in self._loaded.items()]
+
+    def _footprint_of(self, name: str, assets: Any) -> int:
+        # Snapshot-aware loaders report the directory they actually read
+        return index_footprint_bytes(getattr(assets, 'index_dir', None) or self.specs[name].index_dir)
+
+    def put(self, name: str, assets: Any):
+        """Install loaded (e.g. prewarmed) assets for an index, then enforce the memory budget."""
+        name = self.resolve_name(name)
+        footprint = self._footprint_of(name, assets)
+        with self._lock:
+            self._loaded[name] = (assets, footprint)
+            self._loaded.move_to_end(name)
+            self._enforce_budget(keep=name)
+
+    def swap(self, name: str, old: Any, new: Any) -> bool:
+        """
+        Replace an index's assets in place (read-copy-update): new lookups get
+        `new`, retrievals already holding `old` finish on it. Keeps LRU order.
+
+        Returns:
+            False if the index was evicted or swapped by someone else meanwhile
+        """
+        footprint = self._footprint_of(name, new)
+        with self._lock:
+            entry = self._loaded.get(name)
+            if entry is None or entry[0] is not old:
+                return False
+            self._loaded[name] = (new, footprint)
+            self._enforce_budget(keep=name)
+        return True
+
+    def evict(self, name: str) -> bool:
+        """Drop a loaded index. Returns False if it was not loaded."""
+        with self._lock:
+            if self._loaded.pop(self.resolve_name(name), None) is None:
+                return False
+            self.evictions += 1
+        logger.info(f"♻️ Evicted index '{name}'")
+        return True
+
+    def _enforce_budget(self, keep: str):
+        """Evict least recently used unpinned indexes until under budget (caller holds the lock)."""
+        if not self.memory_budget_bytes:
+            return
+        for name in list(self._loaded):
+            if self._footprint() <= self.memory_budget_bytes:
+                return
+            if name == keep or name == self.default or self.specs[name].pinned:
+                continue
+            _, footprint = self._loaded.pop(name)
+            self.evictions += 1
+            logger.info(f"♻️ Evicted index '{name}' ({footprint / 1e6:.1f}MB) to stay within the memory budget")
+        if self._footprint() > self.memory_budget_bytes:
+            logger.warning(
+                f"⚠️ Loaded indexes use {self._footprint() / 1e6:.1f}MB, over the "
+                f"{self.memory_budget_bytes / 1e6:.1f}MB budget, but only pinned indexes and the one just loaded remain"
+            )
+
+    def _footprint(self) -> int:
+        return sum(footprint for _, footprint in self._loaded.values())
+
+    def route(self, metadata) -> str:
+        """
+        Pick the index for a job from its metadata.
+
+        An explicit index name ("rag_index"/"index") wins; otherwise the
+        product ("product"/"plan"/"policy") selects among indexes, narrowed
+        by "language"/"lang" when several match. Falls back to the default.
+
+        Args:
+            metadata: Job metadata (JSON string, plain index name or dict)
+
+        Returns:
+            Registered index name
+        """
+        metadata = parse_job_metadata(metadata)
+        explicit = metadata.get(INDEX_METADATA_KEYS[0]) or metadata.get(INDEX_METADATA_KEYS[1])
+        if explicit:
+            if explicit in self.specs:
+                return explicit
+            logger.warning(f"⚠️ Job requested unknown index '{explicit}' - using '{self.default}'")
+            return self.default
+
+        product = _first(metadata, PRODUCT_METADATA_KEYS)
+        language = _first(metadata, LANGUAGE_METADATA_KEYS)
+        candidates = list(self.specs.values())
+        if product is not None:
+            candidates = [spec for spec in candidates if product in spec.products]
+        if language is not None:
+            by_language = [spec for spec in candidates if language in spec.languages]
+            # Language narrows the choice but never rules out the product's only index
+            candidates = by_language or [spec for spec in candidates if not spec.languages] or candidates
+        if (product is not None or language is not None) and candidates:
+            default_spec = self.specs[self.default]
+            return default_spec.name if default_spec in candidates else candidates[0].name
+        return self.default
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                'registered': len(self.specs),
+                'loaded': list(self._loaded),
+                'footprint_bytes': self._footprint(),
+                'memory_budget_bytes': self.memory_budget_bytes,
+                'loads': self.loads,
+                'evictions': self.evictions,
+            }
@@ -4,11 +4,13 @@ Vector DB: FAISS
 Embeddings: OpenAI (text-embedding-3-large, 1024 dimensions)
 """
 
+import asyncio
 import json
 import os
-import pickle
+import sys
 import time
-from typing import List, Dict, Any, Optional, Tuple
+from pathlib import Path
+from typing import List, Dict, Any, Iterable, Optional, Tuple
 from dataclasses import dataclass
 from datetime import datetime
 
@@ -16,6 +18,49 @@ import faiss
 import numpy as np
 from openai import OpenAI
 
+# Allow running as a script (python ingestion.py) as well as a module
+if __package__ in (None, ""):
+    sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from voice_agent_orchestraction.rag.bm25_index import BM25_FILENAMES, SparseBM25Index
+from voice_agent_orchestraction.rag.chunk_bundle import CHUNK_BUNDLE_FILENAME, ChunkBundle, ChunkBundleWriter
+from voice_agent_orchestraction.rag.chunk_dedup import deduplicate_chunks
+from voice_agent_orchestraction.rag.chunk_embedding_cache import (
+    CHUNK_EMBEDDING_CACHE_FILENAME,
+    ChunkEmbeddingCache,
+    diff_chunk_ids,
+)
+from voice_agent_orchestraction.rag.embedding_batcher import (
+    EMBEDDING_TOKEN_ENCODING,
+    MAX_REQUEST_INPUTS,
+    MAX_REQUEST_TOKENS,
+    EmbeddingTokenizer,
+    plan_batches,
+)
+from voice_agent_orchestraction.rag.embedding_cache import EmbeddingCache, seed_embedding_cache
+from voice_agent_orchestraction.rag.embedding_executor import EmbeddingExecutor
+from voice_agent_orchestraction.rag.index_factory import (
+    INDEX_FLAT,
+    INDEX_TYPES,
+    benchmark_index,
+    build_index,
+    configure_search,
+    create_index as create_faiss_index,
+    factory_string,
+    sample_benchmark_queries,
+    search_parameters,
+)
+from voice_agent_orchestraction.rag.index_manifest import build_manifest, load_manifest, write_manifest
+from voice_agent_orchestraction.rag.metadata_filters import FILTER_FILENAMES, MetadataBitmaps
+from voice_agent_orchestraction.rag.seed_queries import INGESTION_TEST_QUERIES, collect_seed_queries
+from voice_agent_orchestraction.rag.snapshots import (
+    begin_snapshot,
+    new_snapshot_version,
+    prune_snapshots,
+    publish_snapshot,
+    resolve_snapshot_dir,
+)
+
 
 # =============================================================================
 # CONFIGURATION
@@ -31,21 +76,72 @@ class IngestionConfig:
     embedding_dimensions: int = 1024
     
     # FAISS Settings
-    faiss_index_type: str = "IndexFlatIP"  # Inner Product (cosine similarity for normalized vectors)
+    faiss_index_type: str = "IndexFlatIP"  # IndexFlatIP (exact) | IVFFlat | IVFPQ | HNSW | SQ8, all inner product on normalized vectors
     faiss_index_path: str = "faiss_index/hdfc_ergo_policy.index"
-    metadata_path: str = "faiss_index/metadata.pkl"
-    chunk_mapping_path: str = "faiss_index/chunk_mapping.json"
+    # Chunk texts, ids, metadata and vectors in one memory-mapped file (see chunk_bundle.py)
+    chunk_bundle_path: str = f"faiss_index/{CHUNK_BUNDLE_FILENAME}"
+    
+    # Versioned snapshots: each build goes to faiss_index/versions/<version> and the
+    # CURRENT pointer is switched atomically, so running workers hot-swap to it
+    publish_snapshots: bool = True
+    snapshots_to_keep: int = 3  # Older snapshots are deleted after a publish
+    
+    # ANN index parameters (see index_factory.py); nprobe/ef_search are saved with
+    # the index and can be overridden at runtime with FAISS_NPROBE / FAISS_EF_SEARCH
+    ivf_nlist: Optional[int] = None  # None = ~4*sqrt(n), bounded by the training set size
+    pq_m: int = 64  # PQ sub-quantizers (reduced until it divides the dimension)
+    pq_nbits: int = 8  # Bits per PQ code (reduced for very small corpora)
+    hnsw_m: int = 32  # HNSW graph degree
+    nprobe: int = 16
+    ef_search: int = 64
+    
+    # Index benchmark: recall@k against the flat baseline, p50/p99 latency, memory
+    run_index_benchmark: bool = True
+    benchmark_k: int = 10
+    benchmark_queries: int = 200
+    benchmark_index_types: Tuple[str, ...] = ()  # Extra index types to compare in the same report
+    benchmark_report_path: str = "faiss_index/index_benchmark.json"
+    
+    # Query embedding cache shared with the runtime (pre-seeded with frequent queries)
+    query_cache_path: str = "faiss_index/query_embeddings.sqlite"
+    seed_query_cache: bool = True
+    
+    # Chunk embedding cache: only new or changed chunks (by enriched-text hash) are sent to OpenAI
+    chunk_embedding_cache_path: str = f"faiss_index/{CHUNK_EMBEDDING_CACHE_FILENAME}"
+    use_chunk_embedding_cache: bool = True
+    chunk_embedding_cache_max_age_days: float = 365.0  # Entries unused this long are pruned; 0 = keep all
+    
+    # Near-duplicate chunks (MinHash/LSH over word shingles, see chunk_dedup.py) are merged before embedding
+    deduplicate_chunks: bool = True
+    dedup_threshold: float = 0.85  # Shingle Jaccard similarity at which chunks are merged
+    dedup_num_perm: int = 128  # MinHash permutations
     
-    # Batch Processing
-    embedding_batch_size: int = 100  # OpenAI rate limit friendly
-    max_retries: int = 3
-    retry_delay: float = 1.0
+    # Batch Processing: chunks are packed into requests by real token count (longest first)
+    # and requests run concurrently within the account's OpenAI rate limits
+    embedding_batch_size: int = MAX_REQUEST_INPUTS  # Inputs per request at most
+    embedding_request_max_tokens: int = MAX_REQUEST_TOKENS  # Tokens per request at most (OpenAI: 300k)
+    embedding_concurrency: int = 4  # Requests in flight
+    embedding_requests_per_minute: int = int(os.getenv("OPENAI_EMBEDDING_RPM", "3000"))  # Your tier's limits
+    embedding_tokens_per_minute: int = int(os.getenv("OPENAI_EMBEDDING_TPM", "1000000"))
+    max_retries: int = 6
+    retry_delay: float = 1.0  # First backoff ceiling (doubles per attempt, full jitter, >= Retry-After)
+    retry_max_delay: float = 60.0
+    
+    # Streaming ingestion (streaming_ingestion.py): PDFs -> chunks -> embeddings -> index through bounded queues
+    stream_window_chunks: int = 256  # Chunks embedded together (one round of concurrent requests)
+    stream_queue_size: int = 4  # Pages / windows buffered between stages
+    stream_train_size: int = 20_000  # Vectors buffered to train IVF/PQ/SQ indexes before streaming into them
+    stream_pdf_workers: int = 1  # Processes extracting page ranges of each PDF (1 = in the chunker thread)
     
     # Text Processing
-    max_tokens_per_chunk: int = 8000  # Leave buffer for OpenAI token limit
+    embedding_token_encoding: str = EMBEDDING_TOKEN_ENCODING  # tiktoken encoding of the embedding model
+    max_tokens_per_chunk: int = 8000  # Per-input token limit, truncated on a token boundary (model limit: 8191)
     
     def __post_init__(self):
         os.makedirs(os.path.dirname(self.faiss_index_path), exist_ok=True)
+        for index_type in (self.faiss_index_type, *self.benchmark_index_types):
+            if index_type not in INDEX_TYPES:
+                raise ValueError(f"Unknown FAISS index type '{index_type}'. Supported: {', '.join(INDEX_TYPES)}")
 
 
 # =============================================================================
@@ -59,6 +155,20 @@ class OpenAIEmbedder:
         self.config = config
         self.client = OpenAI(api_key=config.openai_api_key)
         self.dimensions = config.embedding_dimensions
+        self.tokenizer = EmbeddingTokenizer(config.embedding_token_encoding)
+        self.truncations = []  # Inputs cut to max_tokens_per_chunk by the last embed_chunks_batched
+        self.executor = EmbeddingExecutor(
+            api_key=config.openai_api_key,
+            model=config.embedding_model,
+            dimensions=config.embedding_dimensions,
+            concurrency=config.embedding_concurrency,
+            requests_per_minute=config.embedding_requests_per_minute,
+            tokens_per_minute=config.embedding_tokens_per_minute,
+            max_retries=config.max_retries,
+            retry_base_delay=config.retry_delay,
+            retry_max_delay=config.retry_max_delay,
+            count_tokens=self.tokenizer.count,
+        )
         
     def embed_text(self, text: str) -> List[float]:
         """Generate embedding for single text"""
@@ -70,56 +180,57 @@ class OpenAIEmbedder:
         return response.data[0].embedding
     
     def embed_batch(self, texts: List[str]) -> List[List[float]]:
-        """Generate embeddings for batch of texts with retry logic"""
-        embeddings = []
-        
-        for attempt in range(self.config.max_retries):
-            try:
-                response = self.client.embeddings.create(
-                    model=self.config.embedding_model,
-                    input=texts,
-                    dimensions=self.dimensions
-                )
-                embeddings = [item.embedding for item in response.data]
-                break
-                
-            except Exception as e:
-                print(f"Attempt {attempt + 1} failed: {e}")
-                if attempt < self.config.max_retries - 1:
-                    time.sleep(self.config.retry_delay * (attempt + 1))
-                else:
-                    raise
-        
-        return embeddings
+        """Generate embeddings for batch of texts with retry logic (one request, see EmbeddingExecutor)"""
+        return self.executor.embed(texts, batch_size=max(len(texts), 1))
     
     def embed_chunks_batched(
         self, 
         chunks: List[Dict], 
-        batch_size: Optional[int] = None
+        batch_size: Optional[int] = None,
+        texts: Optional[List[str]] = None
     ) -> np.ndarray:
-        """Embed all chunks in batches with progress tracking"""
+        """
+        Embed all chunks (or the given texts prepared for them) in token-packed batches
+        
+        Texts are truncated to max_tokens_per_chunk tokens of the embedding model's
+        tokenizer (each truncation is printed and kept in self.truncations), sorted by
+        token count and packed into requests up to embedding_request_max_tokens and
+        batch_size inputs. Requests run concurrently within the configured RPM/TPM
+        budgets; the throughput report is kept in self.executor.report.
+        """
         batch_size = batch_size or self.config.embedding_batch_size
-        total_chunks = len(chunks)
-        all_embeddings = []
+        texts = texts if texts is not None else [c['content'] for c in chunks]
         
-        print(f"Embedding {total_chunks} chunks in batches of {batch_size}...")
+        batches, self.truncations = plan_batches(
+            texts,
+            self.tokenizer,
+            max_input_tokens=self.config.max_tokens_per_chunk,
+            max_request_tokens=self.config.embedding_request_max_tokens,
+            max_request_inputs=batch_size,
+            labels=[c['id'] for c in chunks],
+        )
+        for truncation in self.truncations:
+            print(f"  Truncated chunk {truncation.label}: {truncation.tokens:,} -> {truncation.kept_tokens:,} tokens")
         
-        for i in range(0, total_chunks, batch_size):
-            batch = chunks[i:i + batch_size]
-            texts = [c['content'] for c in batch]
-            
-            # Truncate if needed
-            texts = [t[:self.config.max_tokens_per_chunk * 4] for t in texts]  # Rough char limit
-            
-            print(f"  Processing batch {i//batch_size + 1}/{(total_chunks-1)//batch_size + 1}...")
-            batch_embeddings = self.embed_batch(texts)
-            all_embeddings.extend(batch_embeddings)
-            
-            # Rate limit protection
-            if i + batch_size < total_chunks:
-                time.sleep(0.5)
+        total_tokens = sum(batch.tokens for batch in batches)
+        print(
+            f"Embedding {len(texts)} chunks ({total_tokens:,} tokens{'' if self.tokenizer.exact else ', estimated'}) "
+            f"in {len(batches)} requests ({self.config.embedding_concurrency} concurrent, "
+            f"{self.config.embedding_requests_per_minute} RPM / {self.config.embedding_tokens_per_minute:,} TPM), "
+            f"{len(self.truncations)} truncated..."
+        )
+        results = asyncio.run(self.executor.embed_batches(
+            [batch.texts for batch in batches],
+            batch_tokens=[batch.tokens for batch in batches],
+        ))
+        print(f"Embedding throughput: {self.executor.report.summary()}")
+        
+        all_embeddings = [None] * len(texts)
+        for batch, embeddings in zip(batches, results):
+            for index, embedding in zip(batch.indices, embeddings):
+                all_embeddings[index] = embedding
         
-        return np.array(all_embeddings, dtype=np.float32)
+        return np.array(all_embeddings, dtype=np.float32).reshape(-1, self.dimensions)
 
 
 # =============================================================================
@@ -134,12 +245,36 @@ class FAISSIndexManager:
         self.dimension = config.embedding_dimensions
         self.index = None
         self.chunk_mapping = {}
+        self.vectors = []  # Normalized vectors added so far, written to the chunk bundle
+        self.bundle = None  # ChunkBundle opened by load()
+        self.build_seconds = 0.0  # Training + adding, reported by the benchmark
+        self.loaded_dir = None  # Directory read by load()
+        self.embedded_text = "content"  # "enriched" when vectors embed the context-header text (recorded in the manifest)
         
-    def create_index(self) -> faiss.Index:
-        """Create new FAISS index"""
-        # Using IndexFlatIP for cosine similarity (with normalized vectors)
-        # Alternative: IndexFlatL2 for Euclidean distance
-        self.index = faiss.IndexFlatIP(self.dimension)
+    def factory_params(self) -> Dict[str, Any]:
+        """Index factory parameters from the config"""
+        return {
+            'nlist': self.config.ivf_nlist,
+            'pq_m': self.config.pq_m,
+            'pq_nbits': self.config.pq_nbits,
+            'hnsw_m': self.config.hnsw_m,
+        }
+    
+    def create_index(self, training_vectors: Optional[np.ndarray] = None) -> faiss.Index:
+        """
+        Create new FAISS index of config.faiss_index_type
+        
+        IVF, PQ and SQ indexes are trained on training_vectors (the embedded
+        corpus, normalized here); flat and HNSW indexes need no training.
+        """
+        if training_vectors is not None:
+            training_vectors = self.normalize_vectors(np.array(training_vectors, dtype=np.float32))
+        start = time.time()
+        self.index = create_faiss_index(
+            self.config.faiss_index_type, self.dimension, training_vectors, **self.factory_params()
+        )
+        configure_search(self.index, nprobe=self.config.nprobe, ef_search=self.config.ef_search)
+        self.build_seconds = time.time() - start
         print(f"Created FAISS index: {self.config.faiss_index_type}, dim={self.dimension}")
         return self.index
     
@@ -156,14 +291,17 @@ class FAISSIndexManager:
     ):
         """Add vectors to index with metadata tracking"""
         if self.index is None:
-            self.create_index()
+            self.create_index(vectors)
         
         # Normalize for cosine similarity
         if normalize:
             vectors = self.normalize_vectors(vectors.copy())
         
         # Add to FAISS
+        start = time.time()
         self.index.add(vectors)
+        self.build_seconds += time.time() - start
+        self.vectors.append(np.asarray(vectors, dtype=np.float32))
         
         # Store metadata mapping
         start_idx = len(self.chunk_mapping)
@@ -178,53 +316,241 @@ class FAISSIndexManager:
         
         print(f"Added {len(chunks)} vectors to index. Total: {self.index.ntotal}")
     
-    def save(self):
-        """Save index and metadata to disk"""
+    @property
+    def index_root(self) -> str:
+        """Index directory from the config (holds CURRENT and versions/ when snapshots are used)"""
+        return os.path.dirname(self.config.faiss_index_path)
+    
+    def path_in(self, index_dir: str, config_path: str) -> str:
+        """Location of a configured index file inside a (snapshot) directory"""
+        return os.path.join(index_dir, os.path.basename(config_path))
+    
+    def save(self, include_vectors: bool = True) -> str:
+        """
+        Save index, chunk bundle and manifest to disk
+        
+        With publish_snapshots, everything is written to a staging directory,
+        fsynced and published as a new versioned snapshot by atomically
+        replacing the CURRENT pointer. Workers pick it up without a restart.
+        
+        Args:
+            include_vectors: Store the normalized vectors in the chunk bundle
+                (lets the index be rebuilt with another type without re-embedding)
+        
+        Returns:
+            Directory the index files were written to
+        """
+        index_dir, version = self.begin_save()
+        
         # Save FAISS index
-        faiss.write_index(self.index, self.config.faiss_index_path)
-        
-        # Save metadata
-        with open(self.config.metadata_path, 'wb') as f:
-            pickle.dump({
-                'chunk_mapping': self.chunk_mapping,
-                'config': {
-                    'model': self.config.embedding_model,
-                    'dimensions': self.config.embedding_dimensions,
-                    'created_at': datetime.now().isoformat()
-                }
-            }, f)
-        
-        # Save human-readable chunk mapping
-        with open(self.config.chunk_mapping_path, 'w') as f:
-            json.dump(self.chunk_mapping, f, indent=2, default=str)
-        
-        print(f"Saved index to: {self.config.faiss_index_path}")
-        print(f"Saved metadata to: {self.config.metadata_path}")
-        print(f"Saved mapping to: {self.config.chunk_mapping_path}")
-    
-    def load(self) -> Tuple[faiss.Index, Dict]:
-        """Load index and metadata from disk"""
-        self.index = faiss.read_index(self.config.faiss_index_path)
-        
-        with open(self.config.metadata_path, 'rb') as f:
-            data = pickle.load(f)
-            self.chunk_mapping = data['chunk_mapping']
-        
-        print(f"Loaded index with {self.index.ntotal} vectors")
-        return self.index, self.chunk_mapping
+        faiss.write_index(self.index, self.path_in(index_dir, self.config.faiss_index_path))
+        
+        # Save chunk texts, ids, metadata and vectors as one bundle (memory-mapped by the runtime)
+        bundle_size = self.save_chunk_bundle(index_dir, include_vectors=include_vectors)
+        
+        # Save BM25 index so workers never re-tokenize the corpus
+        self.save_bm25_index(index_dir)
+        
+        # Save per-value id bitmaps for structured filters (applied inside FAISS via IDSelector)
+        self.save_filter_bitmaps(index_dir)
+        
+        # Manifest last: it checksums the files written above
+        manifest_path = self.write_manifest(index_dir)
+        
+        print(f"Saved index to: {self.path_in(index_dir, self.config.faiss_index_path)}")
+        print(f"Saved chunk bundle to: {self.path_in(index_dir, self.config.chunk_bundle_path)} ({bundle_size / 1e6:.2f}MB)")
+        print(f"Saved manifest to: {manifest_path}")
+        
+        return self.finish_save(index_dir, version)
+    
+    def begin_save(self) -> Tuple[str, Optional[str]]:
+        """
+        Directory to write a build into: a new snapshot's staging directory
+        with publish_snapshots, otherwise the index directory itself
+        
+        Returns:
+            (index_dir, snapshot version or None)
+        """
+        if not self.config.publish_snapshots:
+            return self.index_root, None
+        version = new_snapshot_version()
+        return begin_snapshot(self.index_root, version), version
+    
+    def finish_save(self, index_dir: str, version: Optional[str]) -> str:
+        """
+        Publish a build written by begin_save() and prune old snapshots
+        
+        Returns:
+            Directory holding the build
+        """
+        if version is None:
+            return index_dir
+        # Only a complete, fsynced snapshot becomes visible to workers
+        index_dir = publish_snapshot(self.index_root, index_dir, version)
+        print(f"Published snapshot {version}: {index_dir}")
+        pruned = prune_snapshots(self.index_root, keep=self.config.snapshots_to_keep)
+        if pruned:
+            print(f"Removed old snapshots: {', '.join(pruned)}")
+        return index_dir
+    
+    def save_chunk_bundle(self, index_dir: Optional[str] = None, include_vectors: bool = True) -> int:
+        """
+        Write chunks in FAISS id order as the chunk bundle
+        
+        Returns:
+            Bundle size in bytes
+        """
+        index_dir = index_dir or self.index_root
+        vectors = np.concatenate(self.vectors) if include_vectors and self.vectors else None
+        with ChunkBundleWriter(self.path_in(index_dir, self.config.chunk_bundle_path)) as writer:
+            for faiss_id in sorted(self.chunk_mapping):
+                chunk_data = self.chunk_mapping[faiss_id]
+                writer.add(
+                    chunk_data['chunk_id'],
+                    chunk_data['content'],
+                    chunk_data['metadata'],
+                    None if vectors is None else vectors[faiss_id],
+                )
+        return os.path.getsize(self.path_in(index_dir, self.config.chunk_bundle_path))
+    
+    def save_bm25_index(self, index_dir: Optional[str] = None, texts: Optional[Iterable[str]] = None):
+        """Build the sparse BM25 index over chunk contents (default: chunk_mapping) and save it next to the FAISS index"""
+        index_dir = index_dir or self.index_root
+        if texts is None:
+            texts = [self.chunk_mapping[faiss_id]['content'] for faiss_id in sorted(self.chunk_mapping)]
+        bm25 = SparseBM25Index.build(texts)
+        bm25.save(index_dir)
+        print(f"Saved BM25 index: {bm25.params['n_terms']} terms, {len(bm25.weights)} postings")
+    
+    def save_filter_bitmaps(self, index_dir: Optional[str] = None, metadatas: Optional[Iterable[Dict]] = None):
+        """Build plan/section/type/contact/format id bitmaps from chunk metadata (default: chunk_mapping) and save them"""
+        index_dir = index_dir or self.index_root
+        if metadatas is None:
+            metadatas = (self.chunk_mapping[faiss_id]['metadata'] for faiss_id in sorted(self.chunk_mapping))
+        bitmaps = MetadataBitmaps.build(metadatas)
+        bitmaps.save(index_dir)
+        print(f"Saved filter bitmaps: {len(bitmaps.bitmaps)} values across {len(bitmaps.values)} fields")
+    
+    def benchmark(self, vectors: np.ndarray) -> Dict[str, Any]:
+        """
+        Benchmark the built index (plus config.benchmark_index_types) against an
+        exact IndexFlatIP baseline and write the report as JSON.
+        
+        Queries are perturbed corpus vectors (see sample_benchmark_queries), so
+        no embedding calls are needed.
+        
+        Returns:
+            Report dict: recall@k, p50/p99 latency (ms), memory and build time per index type
+        """
+        vectors = self.normalize_vectors(np.array(vectors, dtype=np.float32))
+        k = self.config.benchmark_k
+        queries = sample_benchmark_queries(vectors, n_queries=self.config.benchmark_queries)
+        
+        start = time.time()
+        baseline = build_index(INDEX_FLAT, vectors)
+        baseline_seconds = time.time() - start
+        
+        report = {
+            'created_at': datetime.now().isoformat(),
+            'vector_count': len(vectors),
+            'dimensions': vectors.shape[1],
+            'k': k,
+            'n_queries': len(queries),
+            'built_index_type': self.config.faiss_index_type,
+            'nprobe': self.config.nprobe,
+            'ef_search': self.config.ef_search,
+            'indexes': {},
+        }
+        
+        index_types = dict.fromkeys((INDEX_FLAT, self.config.faiss_index_type, *self.config.benchmark_index_types))
+        for index_type in index_types:
+            if index_type == self.config.faiss_index_type:
+                index, build_seconds = self.index, self.build_seconds
+            elif index_type == INDEX_FLAT:
+                index, build_seconds = baseline, baseline_seconds
+            else:
+                start = time.time()
+                index = build_index(index_type, vectors, **self.factory_params())
+                configure_search(index, nprobe=self.config.nprobe, ef_search=self.config.ef_search)
+                build_seconds = time.time() - start
+            
+            result = benchmark_index(index, baseline, queries, k=k)
+            result['factory'] = factory_string(index_type, vectors.shape[1], len(vectors), **self.factory_params())
+            result['build_seconds'] = round(build_seconds, 3)
+            report['indexes'][index_type] = result
+            print(
+                f"  {index_type:<12} recall@{result['k']}={result['recall_at_k']:.3f}  "
+                f"p50={result['latency_p50_ms']:.3f}ms  p99={result['latency_p99_ms']:.3f}ms  "
+                f"memory={result['memory_bytes'] / 1e6:.2f}MB  build={result['build_seconds']:.2f}s"
+            )
+        
+        with open(self.config.benchmark_report_path, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Saved benchmark report to: {self.config.benchmark_report_path}")
+        return report
+    
+    def write_manifest(self, index_dir: Optional[str] = None, chunk_count: Optional[int] = None) -> Path:
+        """
+        Write manifest.json describing the saved index.
+        The runtime validates against it offline instead of embedding a test string.
+        """
+        index_dir = index_dir or self.index_root
+        manifest = build_manifest(
+            index_dir,
+            files=[
+                os.path.basename(self.config.faiss_index_path),
+                os.path.basename(self.config.chunk_bundle_path),
+                *BM25_FILENAMES,
+                *FILTER_FILENAMES,
+            ],
+            model=self.config.embedding_model,
+            dimensions=self.index.d,
+            vector_count=self.index.ntotal,
+            chunk_count=len(self.chunk_mapping) if chunk_count is None else chunk_count,
+            metric="inner_product",
+            normalized=True,
+            index_type=self.config.faiss_index_type,
+            embedded_text=self.embedded_text,
+        )
+        return write_manifest(index_dir, manifest)
+    
+    def load(self) -> Tuple[faiss.Index, ChunkBundle]:
+        """Load index and chunk bundle from disk (the live snapshot, or the flat index directory)"""
+        self.loaded_dir, version = resolve_snapshot_dir(self.index_root)
+        self.index = faiss.read_index(self.path_in(self.loaded_dir, self.config.faiss_index_path))
+        configure_search(self.index, nprobe=self.config.nprobe, ef_search=self.config.ef_search)
+        
+        self.bundle = ChunkBundle.open(self.path_in(self.loaded_dir, self.config.chunk_bundle_path))
+        
+        print(f"Loaded index with {self.index.ntotal} vectors" + (f" (snapshot {version})" if version else ""))
+        return self.index, self.bundle
+    
+    def chunk(self, faiss_id: int) -> Optional[Dict]:
+        """Chunk data (chunk_id, content, metadata) by FAISS id, from memory or the loaded bundle"""
+        if faiss_id in self.chunk_mapping:
+            return self.chunk_mapping[faiss_id]
+        if self.bundle is not None and 0 <= faiss_id < len(self.bundle):
+            return self.bundle.chunk(faiss_id)
+        return None
     
     def search(
         self, 
         query_vector: np.ndarray, 
         k: int = 5,
-        normalize: bool = True
+        normalize: bool = True,
+        id_bitmap: Optional[np.ndarray] = None
     ) -> Tuple[List[int], List[float]]:
-        """Search index for k nearest neighbors"""
+        """Search index for k nearest neighbors, optionally restricted to a packed id bitmap"""
         if normalize:
             query_vector = query_vector.copy()
             faiss.normalize_L2(query_vector.reshape(1, -1))
         
-        distances, indices = self.index.search(query_vector.reshape(1, -1), k)
+        params = None
+        if id_bitmap is not None:
+            id_bitmap = np.ascontiguousarray(id_bitmap, dtype=np.uint8)
+            selector = faiss.IDSelectorBitmap(self.index.ntotal, faiss.swig_ptr(id_bitmap))
+            params = search_parameters(self.index, selector)
+        distances, indices = self.index.search(query_vector.reshape(1, -1), k, params=params)
         return indices[0].tolist(), distances[0].tolist()
 
 
@@ -239,6 +565,8 @@ class PolicyIngestionPipeline:
         self.config = config or IngestionConfig()
         self.embedder = OpenAIEmbedder(self.config)
         self.index_manager = FAISSIndexManager(self.config)
+        self.embedding_stats = {}  # Reuse / API counts of the last embed_chunks() call
+        self.dedup_stats = {}  # Report of the last deduplicate() call
         
     def load_chunks(self, chunks_path: str) -> List[Dict]:
         """Load chunks from JSON file"""
@@ -262,6 +590,22 @@ class PolicyIngestionPipeline:
         print(f"Validated {len(chunks)} chunks")
         return True
     
+    def deduplicate(self, chunks: List[Dict]) -> List[Dict]:
+        """
+        Merge near-duplicate chunks into canonical chunks (see chunk_dedup.py)
+        
+        Returns:
+            Chunks in document order, one per group of near-duplicates
+        """
+        if not self.config.deduplicate_chunks:
+            return chunks
+        chunks, report = deduplicate_chunks(
+            chunks, threshold=self.config.dedup_threshold, num_perm=self.config.dedup_num_perm
+        )
+        self.dedup_stats = report.to_dict()
+        print(f"Deduplicated: {report.summary()}")
+        return chunks
+    
     def create_enriched_text(self, chunk: Dict) -> str:
         """
         Create enriched text for embedding by adding context headers.
@@ -308,6 +652,97 @@ class PolicyIngestionPipeline:
         
         return chunk['content']
     
+    def previous_build(self) -> Tuple[Optional[ChunkBundle], Optional[Dict]]:
+        """Chunk bundle and manifest of the live index build, if there is one"""
+        index_dir, _ = resolve_snapshot_dir(self.index_manager.index_root)
+        if not ChunkBundle.exists(index_dir):
+            return None, None
+        try:
+            bundle = ChunkBundle.open(self.index_manager.path_in(index_dir, self.config.chunk_bundle_path))
+        except (OSError, ValueError) as e:
+            print(f"Previous chunk bundle unreadable, ignoring it: {e}")
+            return None, None
+        return bundle, load_manifest(index_dir)
+    
+    def embed_chunks(self, chunks: List[Dict], texts: List[str], use_enriched_text: bool = True) -> np.ndarray:
+        """
+        Embed chunk texts, reusing every vector already computed for the same text
+        
+        Vectors are looked up in the chunk embedding cache by (model, dimensions,
+        text hash), then in the previous build's chunk bundle; only the remaining
+        chunks are sent to OpenAI. Prints the diff against the previous build.
+        
+        Args:
+            chunks: Chunks in index order
+            texts: Text to embed per chunk (enriched or raw content)
+            use_enriched_text: How texts were prepared (to match previous-build chunks)
+        
+        Returns:
+            Embeddings aligned with chunks
+        """
+        previous, previous_manifest = self.previous_build()
+        if previous is not None:
+            diff = diff_chunk_ids(list(previous.chunk_ids), [c['id'] for c in chunks])
+            print(f"Changes since the live build: {diff.summary()}")
+        
+        if not self.config.use_chunk_embedding_cache:
+            self.embedding_stats = {'embedded': len(texts), 'cached': 0, 'reused_from_bundle': 0}
+            return self.embedder.embed_chunks_batched(chunks, texts=texts)
+        
+        cache = ChunkEmbeddingCache(
+            self.config.chunk_embedding_cache_path,
+            self.config.embedding_model,
+            self.config.embedding_dimensions,
+        )
+        try:
+            vectors = cache.get_many(texts)
+            cached = sum(vector is not None for vector in vectors)
+            
+            # Indexes built before the cache existed: reuse the vectors stored in the live bundle
+            # when they embed the same kind of text with the same model (indexes without the
+            # manifest field embedded the raw content)
+            reused = 0
+            embedded_text = "enriched" if use_enriched_text else "content"
+            compatible = previous_manifest is not None and (
+                previous_manifest.get('model') == self.config.embedding_model
+                and previous_manifest.get('dimensions') == self.config.embedding_dimensions
+                and previous_manifest.get('embedded_text', 'content') == embedded_text
+            )
+            if cached < len(texts) and compatible and previous.vectors is not None:
+                previous_vectors = {}
+                for i, (content, metadata) in enumerate(zip(previous.texts, previous.metadatas)):
+                    old_chunk = {'content': content, 'metadata': metadata}
+                    old_text = self.create_enriched_text(old_chunk) if use_enriched_text else content
+                    previous_vectors[old_text] = i
+                found = [(i, previous_vectors[text]) for i, text in enumerate(texts)
+                         if vectors[i] is None and text in previous_vectors]
+                for i, old_id in found:
+                    vectors[i] = np.array(previous.vectors[old_id], dtype=np.float32)
+                if found:
+                    cache.put_many([texts[i] for i, _ in found], [vectors[i] for i, _ in found])
+                reused = len(found)
+            
+            missing = [i for i, vector in enumerate(vectors) if vector is None]
+            if missing:
+                embedded = self.embedder.embed_chunks_batched(
+                    [chunks[i] for i in missing], texts=[texts[i] for i in missing]
+                )
+                cache.put_many([texts[i] for i in missing], embedded)
+                for i, vector in zip(missing, embedded):
+                    vectors[i] = vector
+            
+            pruned = 0
+            if self.config.chunk_embedding_cache_max_age_days > 0:
+                pruned = cache.prune(self.config.chunk_embedding_cache_max_age_days)
+            self.embedding_stats = {'embedded': len(missing), 'cached': cached, 'reused_from_bundle': reused}
+            print(
+                f"Embeddings: {len(missing)} new/changed chunks sent to OpenAI, {cached} from the chunk cache, "
+                f"{reused} from the previous build ({len(cache)} cached, {pruned} stale entries pruned)"
+            )
+        finally:
+            cache.close()
+        return np.vstack(vectors).astype(np.float32) if vectors else np.zeros((0, self.config.embedding_dimensions), dtype=np.float32)
+    
     def run(
         self, 
         chunks_path: str,
@@ -320,7 +755,7 @@ class PolicyIngestionPipeline:
         Args:
             chunks_path: Path to chunks JSON file
             use_enriched_text: Whether to add context headers for better embedding
-            save_intermediate: Save embeddings array to disk
+            save_intermediate: Store the embeddings in the chunk bundle
         
         Returns:
             Statistics about ingestion
@@ -329,10 +764,11 @@ class PolicyIngestionPipeline:
         
         # Step 1: Load and validate
         print("=" * 60)
-        print("STEP 1: Load and Validate Chunks")
+        print("STEP 1: Load, Validate and Deduplicate Chunks")
         print("=" * 60)
         chunks = self.load_chunks(chunks_path)
         self.validate_chunks(chunks)
+        chunks = self.deduplicate(chunks)
         
         # Step 2: Prepare texts for embedding
         print("\n" + "=" * 60)
@@ -355,20 +791,16 @@ class PolicyIngestionPipeline:
         print(f"Dimensions: {self.config.embedding_dimensions}")
         print("=" * 60)
         
-        embeddings = self.embedder.embed_chunks_batched(chunks)
-        
-        # Save intermediate if requested
-        if save_intermediate:
-            embeddings_path = "faiss_index/embeddings.npy"
-            np.save(embeddings_path, embeddings)
-            print(f"Saved embeddings to: {embeddings_path}")
+        embeddings = self.embed_chunks(chunks, texts, use_enriched_text=use_enriched_text)
+        self.index_manager.embedded_text = "enriched" if use_enriched_text else "content"
         
         # Step 4: Create FAISS index
         print("\n" + "=" * 60)
         print("STEP 4: Build FAISS Index")
         print("=" * 60)
         
-        self.index_manager.create_index()
+        # IVF/PQ/SQ indexes are trained on the embedded corpus itself
+        self.index_manager.create_index(embeddings)
         self.index_manager.add_vectors(embeddings, chunks, normalize=True)
         
         # Step 5: Save index
@@ -376,7 +808,23 @@ class PolicyIngestionPipeline:
         print("STEP 5: Save Index and Metadata")
         print("=" * 60)
         
-        self.index_manager.save()
+        index_dir = self.index_manager.save(include_vectors=save_intermediate)
+        
+        # Step 6: Benchmark against the exact baseline
+        benchmark = None
+        if self.config.run_index_benchmark:
+            print("\n" + "=" * 60)
+            print("STEP 6: Benchmark Index (recall / latency / memory)")
+            print("=" * 60)
+            benchmark = self.index_manager.benchmark(embeddings)
+        
+        # Step 7: Pre-seed query embedding cache
+        seeded = 0
+        if self.config.seed_query_cache:
+            print("\n" + "=" * 60)
+            print("STEP 7: Seed Query Embedding Cache")
+            print("=" * 60)
+            seeded = self.seed_query_cache()
         
         # Statistics
         elapsed = time.time() - start_time
@@ -386,8 +834,19 @@ class PolicyIngestionPipeline:
             'index_size': self.index_manager.index.ntotal,
             'elapsed_seconds': elapsed,
             'chunks_per_second': len(chunks) / elapsed,
-            'index_path': self.config.faiss_index_path,
-            'metadata_path': self.config.metadata_path
+            'index_path': self.index_manager.path_in(index_dir, self.config.faiss_index_path),
+            'chunk_bundle_path': self.index_manager.path_in(index_dir, self.config.chunk_bundle_path),
+            'index_type': self.config.faiss_index_type,
+            'benchmark': benchmark['indexes'] if benchmark else None,
+            'seeded_queries': seeded,
+            'deduplication': self.dedup_stats,
+            'embedding_reuse': self.embedding_stats,
+            'embedding_throughput': {
+                'chunks_per_second': self.embedder.executor.report.chunks_per_second,
+                'tokens_per_second': self.embedder.executor.report.tokens_per_second,
+                'retries': self.embedder.executor.report.retries,
+                'truncated_chunks': len(self.embedder.truncations),
+            },
         }
         
         print("\n" + "=" * 60)
@@ -399,6 +858,31 @@ class PolicyIngestionPipeline:
         print(f"Speed: {stats['chunks_per_second']:.2f} chunks/second")
         
         return stats
+    
+    def seed_query_cache(self) -> int:
+        """
+        Embed known frequent queries (tool description examples, test queries,
+        fine-tuning prompts) into the persistent query embedding cache, so the
+        runtime never pays the embedding round trip for them.
+        
+        Returns:
+            Number of newly seeded queries
+        """
+        cache = EmbeddingCache(
+            model=self.config.embedding_model,
+            dimensions=self.config.embedding_dimensions,
+            persist_path=self.config.query_cache_path,
+        )
+        try:
+            queries = collect_seed_queries()
+            seeded = seed_embedding_cache(
+                cache, queries, self.embedder.embed_batch,
+                batch_size=self.config.embedding_batch_size,
+            )
+        finally:
+            cache.close()
+        print(f"Seeded {seeded} new queries ({len(queries)} candidates) into {self.config.query_cache_path}")
+        return seeded
 
 
 # =============================================================================
@@ -415,8 +899,13 @@ class PolicyRetriever:
         self._load_index()
         
     def _load_index(self):
-        """Load existing index"""
+        """Load existing index and the filter bitmaps"""
         self.index_manager.load()
+        index_dir = self.index_manager.loaded_dir
+        if MetadataBitmaps.exists(index_dir):
+            self.bitmaps = MetadataBitmaps.load(index_dir)
+        else:
+            self.bitmaps = MetadataBitmaps.build(self.index_manager.bundle.metadatas)
         
     def retrieve(
         self, 
@@ -441,8 +930,9 @@ class PolicyRetriever:
         query_embedding = self.embedder.embed_text(query)
         query_vector = np.array([query_embedding], dtype=np.float32)
         
-        # Search index
-        indices, scores = self.index_manager.search(query_vector, k=k * 3)  # Over-fetch for filtering
+        # Filters are applied inside the FAISS search - no over-fetching
+        id_bitmap = self.bitmaps.mask({'plan': plan_filter, 'section': section_filter})
+        indices, scores = self.index_manager.search(query_vector, k=k, id_bitmap=id_bitmap)
         
         # Build results
         results = []
@@ -450,26 +940,12 @@ class PolicyRetriever:
             if idx == -1:  # FAISS returns -1 for empty slots
                 continue
                 
-            chunk_data = self.index_manager.chunk_mapping.get(idx)
+            chunk_data = self.index_manager.chunk(idx)
             if not chunk_data:
                 continue
             
-            # Apply filters
             metadata = chunk_data['metadata']
             
-            if plan_filter:
-                applicable_plans = (
-                    metadata.get('plans', []) + 
-                    metadata.get('inbuilt_for', []) +
-                    metadata.get('optional_for', [])
-                )
-                if plan_filter not in applicable_plans:
-                    continue
-            
-            if section_filter:
-                if not metadata.get('section', '').startswith(section_filter):
-                    continue
-            
             results.append({
                 'chunk_id': chunk_data['chunk_id'],
                 'content': chunk_data['content'],
@@ -477,9 +953,6 @@ class PolicyRetriever:
                 'score': float(score),
                 'faiss_id': idx
             })
-            
-            if len(results) >= k:
-                break
         
         return results
     
@@ -525,7 +998,6 @@ def main():
         openai_api_key=os.getenv("OPENAI_API_KEY"),
         embedding_model="text-embedding-3-large",
         embedding_dimensions=1024,
-        embedding_batch_size=50  # Conservative for rate limits
     )
     
     # Verify API key
@@ -548,15 +1020,7 @@ def main():
     
     retriever = PolicyRetriever(config)
     
-    test_queries = [
-        "What is Pre-Existing Disease waiting period?",
-        "How much room rent is covered in Optima Lite?",
-        "Is obesity surgery covered?",
-        "What are the conditions for Plus Benefit?",
-        "Tell me about Global Health Cover"
-    ]
-    
-    for query in test_queries:
+    for query in INGESTION_TEST_QUERIES:
         print(f"\n{'='*60}")
         print(f"Query: {query}")
         print(f"{'='*60}")
@@ -0,0 +1,179 @@
+"""
+Metadata Filter Bitmaps
+
+Per-value FAISS-id bitmaps for the structured retrieval filters (plan,
+section, type, has_contact_info, content_format), built once at ingestion
+and memory-mapped at runtime.
+
+Bitmaps are packed little-endian (bit i of byte i >> 3 is FAISS id i),
+which is the layout faiss.IDSelectorBitmap expects, so a filter is
+applied inside the FAISS search instead of by over-fetching and
+filtering in Python. The same mask restricts BM25.
+"""
+
+import json
+import logging
+from pathlib import Path
+from typing import Dict, Iterable, List, Mapping, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+FILTER_BITMAPS_FILENAME = "filter_bitmaps.npy"
+FILTER_VALUES_FILENAME = "filter_values.json"
+FILTER_FILENAMES = [FILTER_BITMAPS_FILENAME, FILTER_VALUES_FILENAME]
+
+FILTER_FIELDS = ("plan", "section", "type", "has_contact_info", "content_format")
+
+# Fields matched by clause prefix ("C" matches C, C.1, C.2.3, ... but "B.2.1" does not match B.2.10)
+PREFIX_FIELDS = ("section",)
+
+# Metadata keys that list the plans a chunk applies to
+PLAN_KEYS = ("plan_name", "plans", "inbuilt_for", "optional_for")
+
+
+def _normalize_value(value) -> str:
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return str(value).strip().lower()
+
+
+def _in_clause(value: str, prefix: str) -> bool:
+    """True for the clause itself and its sub-clauses (whole dot-separated components only)."""
+    prefix = prefix.rstrip('.')
+    return value == prefix or value.startswith(prefix + '.')
+
+
+def chunk_filter_values(metadata: Mapping) -> Dict[str, List[str]]:
+    """Filter values of one chunk, per filter field."""
+    plans = []
+    for key in PLAN_KEYS:
+        value = metadata.get(key)
+        if isinstance(value, str):
+            plans.append(value)
+        elif isinstance(value, (list, tuple)):
+            plans.extend(value)
+
+    values = {
+        'plan': [_normalize_value(plan) for plan in plans],
+        # Only chunks with contact details carry the flag; absence means False
+        'has_contact_info': [_normalize_value(bool(metadata.get('has_contact_info', False)))],
+    }
+    for field in ('section', 'type', 'content_format'):
+        if metadata.get(field) not in (None, ""):
+            values[field] = [_normalize_value(metadata[field])]
+    # A chunk merged from near-duplicates (chunk_dedup.py) answers for every member's section
+    for section in metadata.get('sections') or ():
+        values.setdefault('section', [])
+        if _normalize_value(section) not in values['section']:
+            values['section'].append(_normalize_value(section))
+    return values
+
+
+class MetadataBitmaps:
+    """Packed per-value id bitmaps for each filter field"""
+
+    def __init__(self, values: Dict[str, Dict[str, int]], bitmaps: np.ndarray, n_docs: int):
+        self.values = values  # field -> value -> bitmap row
+        self.bitmaps = bitmaps  # (n_rows, ceil(n_docs / 8)) uint8, little bit order
+        self.n_docs = n_docs
+
+    @classmethod
+    def build(cls, metadatas: Iterable[Mapping]) -> "MetadataBitmaps":
+        """
+        Build bitmaps from chunk metadata in FAISS id order.
+
+        Args:
+            metadatas: Chunk metadata dicts indexed by FAISS id
+
+        Returns:
+            MetadataBitmaps
+        """
+        n_docs = 0  # Single pass: metadatas may be a lazily decoded bundle column
+        members: Dict[str, Dict[str, List[int]]] = {field: {} for field in FILTER_FIELDS}
+        for faiss_id, metadata in enumerate(metadatas):
+            n_docs += 1
+            for field, field_values in chunk_filter_values(metadata or {}).items():
+                for value in field_values:
+                    members[field].setdefault(value, []).append(faiss_id)
+
+        values: Dict[str, Dict[str, int]] = {field: {} for field in FILTER_FIELDS}
+        rows = []
+        for field in FILTER_FIELDS:
+            for value in sorted(members[field]):
+                dense = np.zeros(n_docs, dtype=bool)
+                dense[members[field][value]] = True
+                values[field][value] = len(rows)
+                rows.append(np.packbits(dense, bitorder='little'))
+
+        n_bytes = (n_docs + 7) // 8
+        bitmaps = np.vstack(rows) if rows else np.zeros((0, n_bytes), dtype=np.uint8)
+        return cls(values, bitmaps, n_docs)
+
+    def save(self, index_dir: str) -> List[str]:
+        """
+        Save bitmaps next to the FAISS index.
+
+        Returns:
+            File names written (relative to index_dir)
+        """
+        np.save(Path(index_dir) / FILTER_BITMAPS_FILENAME, self.bitmaps)
+        with open(Path(index_dir) / FILTER_VALUES_FILENAME, 'w', encoding='utf-8') as f:
+            json.dump({'n_docs': self.n_docs, 'values': self.values}, f, indent=2)
+        return list(FILTER_FILENAMES)
+
+    @staticmethod
+    def exists(index_dir: str) -> bool:
+        return all((Path(index_dir) / name).exists() for name in FILTER_FILENAMES)
+
+    @classmethod
+    def load(cls, index_dir: str, mmap: bool = True) -> "MetadataBitmaps":
+        """Load saved bitmaps; the bitmap matrix is memory-mapped read-only when mmap=True."""
+        with open(Path(index_dir) / FILTER_VALUES_FILENAME, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        bitmaps = np.load(Path(index_dir) / FILTER_BITMAPS_FILENAME, mmap_mode='r' if mmap else None)
+        return cls(data['values'], bitmaps, data['n_docs'])
+
+    def field_values(self, field: str) -> List[str]:
+        """Known values of a filter field."""
+        return list(self.values.get(field, {}))
+
+    def mask(self, filters: Optional[Mapping[str, object]]) -> Optional[np.ndarray]:
+        """
+        Combine bitmaps for a filter spec: OR within a field (a list of
+        values, or every value matching a prefix field), AND across fields.
+
+        Args:
+            filters: field -> value or list of values; None values are ignored
+
+        Returns:
+            Packed uint8 bitmap, or None when no filter is set
+
+        Raises:
+            ValueError: On an unknown filter field
+        """
+        combined = None
+        for field, wanted in (filters or {}).items():
+            if wanted is None:
+                continue
+            if field not in FILTER_FIELDS:
+                raise ValueError(f"Unknown filter field '{field}'. Supported: {', '.join(FILTER_FIELDS)}")
+            wanted = wanted if isinstance(wanted, (list, tuple, set)) else [wanted]
+            wanted = [_normalize_value(value) for value in wanted]
+
+            known = self.values.get(field, {})
+            if field in PREFIX_FIELDS:
+                rows = [row for value, row in known.items() if any(_in_clause(value, w) for w in wanted)]
+            else:
+                rows = [known[value] for value in wanted if value in known]
+
+            field_mask = np.zeros(self.bitmaps.shape[1], dtype=np.uint8)
+            for row in rows:
+                field_mask |= self.bitmaps[row]
+            combined = field_mask if combined is None else combined & field_mask
+        return combined
+
+    def unpack(self, packed: np.ndarray) -> np.ndarray:
+        """Packed bitmap -> boolean mask over FAISS ids."""
+        return np.unpackbits(packed, count=self.n_docs, bitorder='little').astype(bool)
@@ -0,0 +1,208 @@
+"""
+Speculative Retrieval Prefetch
+
+Starts retrieval on the user's own words while they are still speaking.
+Every `user_input_transcribed` event (interim or final) reschedules a
+speculative retrieval of the transcript: interim transcripts only after
+they have been stable for a short debounce, final ones immediately. Work
+for a transcript that has since changed is cancelled.
+
+Results are kept in a small per-session cache. When the LLM's
+RAG_RETRIEVER call arrives, its query is compared with the prefetched
+transcripts by content-term overlap; on a match the tool answers from the
+cache (or awaits the retrieval already in flight) instead of starting
+from scratch, hiding most of the retrieval latency behind the speech.
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, FrozenSet, Optional
+
+from voice_agent_orchestraction.rag.bm25_index import tokenize
+
+logger = logging.getLogger(__name__)
+
+# Terms that carry no topic: filler words and the product boilerplate the
+# LLM adds to every tool query ("HDFC ERGO my:Optima Secure ... policy wording")
+PREFETCH_IGNORED_TERMS = frozenset({
+    "a", "an", "the", "is", "are", "was", "be", "do", "does", "did", "can", "could", "will", "would",
+    "what", "which", "how", "when", "where", "who", "why", "me", "my", "i", "you", "your", "we", "our",
+    "it", "this", "that", "there", "of", "in", "on", "for", "to", "from", "with", "and", "or", "about",
+    "please", "tell", "know", "want", "any", "some", "hai", "kya", "ka", "ki", "ke", "mein", "hain",
+    "hdfc", "ergo", "optima", "secure", "policy", "wording", "plan", "insurance",
+})
+
+
+def content_terms(text: str) -> FrozenSet[str]:
+    """Topic-bearing terms of a transcript or query."""
+    return frozenset(term for term in tokenize(text) if term not in PREFETCH_IGNORED_TERMS)
+
+
+@dataclass
+class PrefetchEntry:
+    """One speculative retrieval (in flight or done) for a transcript"""
+    transcript: str
+    terms: FrozenSet[str]
+    task: "asyncio.Future[str]"
+    created: float
+    waiting: bool = True  # Still in the debounce delay (no retrieval started yet)
+
+
+class SpeculativePrefetcher:
+    """Per-session speculative retrieval on STT transcripts"""
+
+    def __init__(
+        self,
+        retrieve: Callable[[str], Awaitable[str]],
+        debounce: float = 0.3,
+        min_words: int = 3,
+        min_overlap: float = 0.6,
+        ttl: float = 20.0,
+        max_entries: int = 8,
+    ):
+        """
+        Args:
+            retrieve: Retrieval coroutine for a query (returns context text)
+            debounce: Seconds an interim transcript must stay unchanged before it is retrieved
+            min_words: Shorter transcripts are not prefetched (greetings, fillers)
+            min_overlap: Fraction of the tool query's content terms that must occur in the transcript
+            ttl: Seconds a prefetched result may be served
+            max_entries: Prefetched transcripts kept per session
+        """
+        self.retrieve = retrieve
+        self.debounce = debounce
+        self.min_words = min_words
+        self.min_overlap = min_overlap
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: Dict[str, PrefetchEntry] = {}  # Transcript -> entry, oldest first
+        self._latest: Optional[str] = None  # Transcript of the speculative work that is still current
+        self.started = 0
+        self.cancelled = 0
+        self.hits = 0
+        self.misses = 0
+
+    def attach(self, session) -> "SpeculativePrefetcher":
+        """Subscribe to a LiveKit AgentSession's transcripts; cancels pending work when it closes."""
+        session.on("user_input_transcribed", lambda event: self.on_transcript(event.transcript, event.is_final))
+        session.on("close", lambda _event: self.close())
+        return self
+
+    def on_transcript(self, transcript: str, is_final: bool = False):
+        """Schedule speculative retrieval for the latest transcript, cancelling stale work."""
+        transcript = " ".join((transcript or "").split())
+        if len(transcript.split()) < self.min_words or not content_terms(transcript):
+            return
+        self._cancel_stale(keep=transcript)
+        self._latest = transcript
+        entry = self._entries.get(transcript)
+        if entry is not None and not entry.task.cancelled():
+            if not (is_final and entry.waiting):
+                return  # Already retrieved or retrieving this transcript
+            entry.task.cancel()  # Final transcript: skip the rest of the debounce
+
+        delay = 0.0 if is_final else self.debounce
+        task = asyncio.ensure_future(self._run(transcript, delay))
+        self._entries.pop(transcript, None)
+        self._entries[transcript] = PrefetchEntry(transcript, content_terms(transcript), task, time.monotonic())
+        self._evict()
+
+    async def _run(self, transcript: str, delay: float) -> str:
+        if delay:
+            await asyncio.sleep(delay)
+        entry = self._entries.get(transcript)
+        if entry is not None:
+            entry.waiting = False
+        self.started += 1
+        start = time.perf_counter()
+        try:
+            context = await self.retrieve(transcript)
+        except Exception as exc:
+            logger.warning(f"⚠️ Speculative retrieval failed: {exc}")
+            return ""
+        logger.info(
+            f"🔮 Prefetched retrieval in {(time.perf_counter() - start) * 1000:.1f}ms: "
+            f"'{transcript[:50]}{'...' if len(transcript) > 50 else ''}'"
+        )
+        return context
+
+    def _cancel_stale(self, keep: str):
+        """Cancel the unfinished speculative work of a transcript the user has since changed."""
+        if self._latest is None or self._latest == keep:
+            return
+        entry = self._entries.get(self._latest)
+        if entry is not None and not entry.task.done():
+            entry.task.cancel()
+            del self._entries[self._latest]
+            self.cancelled += 1
+
+    def _evict(self):
+        now = time.monotonic()
+        for transcript, entry in list(self._entries.items()):
+            expired = now - entry.created > self.ttl
+            if (expired or len(self._entries) > self.max_entries) and transcript != self._latest:
+                if not entry.task.done():
+                    entry.task.cancel()
+                del self._entries[transcript]
+
+    def _match(self, query: str) -> Optional[PrefetchEntry]:
+        """Best live entry for a tool query (most overlapping, then most recent)."""
+        query_terms = content_terms(query)
+        if not query_terms:
+            return None
+        self._evict()
+        best, best_overlap = None, 0.0
+        for entry in self._entries.values():
+            if entry.task.cancelled():
+                continue
+            overlap = len(query_terms & entry.terms) / len(query_terms)
+            if overlap >= self.min_overlap and overlap >= best_overlap:
+                best, best_overlap = entry, overlap
+        return best
+
+    async def lookup(self, query: str) -> Optional[str]:
+        """
+        Prefetched context for a tool query, awaiting a retrieval still in flight.
+
+        Returns:
+            Context text, or None when no prefetched transcript overlaps the query
+            (or its retrieval failed / found nothing)
+        """
+        entry = self._match(query)
+        if entry is None:
+            self.misses += 1
+            return None
+        try:
+            # Shield: the tool call being cancelled must not cancel the shared retrieval
+            context = await asyncio.shield(entry.task)
+        except asyncio.CancelledError:
+            if not entry.task.cancelled():
+                raise
+            context = None
+        if not context or not context.strip():
+            self.misses += 1
+            return None
+        self.hits += 1
+        logger.info(f"🔮 Prefetch hit for '{query[:50]}' (transcript: '{entry.transcript[:50]}')")
+        return context
+
+    def close(self):
+        """Cancel all unfinished speculative work."""
+        for entry in self._entries.values():
+            if not entry.task.done():
+                entry.task.cancel()
+        self._entries.clear()
+        self._latest = None
+
+    def stats(self) -> Dict:
+        total = self.hits + self.misses
+        return {
+            'started': self.started,
+            'cancelled': self.cancelled,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0.0,
+            'cached': len(self._entries),
+        }
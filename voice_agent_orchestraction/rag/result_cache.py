@@ -0,0 +1,160 @@
+"""
+Semantic Retrieval-Result Cache
+
+Maps query embeddings to the final fused chunk id list of a past
+retrieval. A new query whose embedding is within a cosine-similarity
+threshold of a cached query reuses that result, skipping FAISS, BM25 and
+fusion entirely - so the same intent asked in Hindi, English or Hinglish
+only pays for retrieval once.
+
+Past queries live in a small dedicated FAISS index (IndexIDMap2 over
+IndexFlatIP) so entries can be evicted by id. Entries are evicted LRU and
+belong to one named index build (see index_registry.py): each entry
+records the manifest fingerprint its ids were produced on, an index's
+entries are dropped when its fingerprint changes, and a result computed on
+a build that has since been swapped out is never stored.
+"""
+
+import logging
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+import faiss
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _CachedResult:
+    chunk_ids: np.ndarray  # Fused FAISS ids, best first
+    scope: str  # Retrieval mode/filters the result was produced under
+    index: str = ""  # Named index the ids refer to
+    fingerprint: str = ""  # Manifest fingerprint of the index build the ids refer to
+    complete: bool = False  # Whole result (adaptive cutoff): served even when shorter than the k asked for
+
+
+class SemanticResultCache:
+    """Result cache looked up by nearest past query embedding"""
+
+    # Neighbours inspected per lookup, so an entry from another scope does not mask a match
+    SEARCH_DEPTH = 4
+
+    def __init__(self, dimensions: int, threshold: float = 0.95, maxsize: int = 512):
+        """
+        Args:
+            dimensions: Query embedding dimensions
+            threshold: Minimum cosine similarity for a hit
+            maxsize: Maximum cached queries (LRU eviction)
+        """
+        self.dimensions = dimensions
+        self.threshold = threshold
+        self.maxsize = maxsize
+        self.fingerprints: Dict[str, str] = {}  # Index name -> manifest fingerprint of its cached entries
+        self._index = faiss.IndexIDMap2(faiss.IndexFlatIP(dimensions))
+        self._entries: "OrderedDict[int, _CachedResult]" = OrderedDict()
+        self._next_id = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _normalized(self, embedding: np.ndarray) -> np.ndarray:
+        query = np.array(embedding, dtype=np.float32, copy=True, ndmin=2)
+        faiss.normalize_L2(query)
+        return query
+
+    def ensure_fingerprint(self, fingerprint: str, index: str = ""):
+        """Drop an index's entries if it changed since they were cached."""
+        with self._lock:
+            previous = self.fingerprints.get(index)
+            self.fingerprints[index] = fingerprint
+            if previous is None or previous == fingerprint:
+                return
+            stale = [entry_id for entry_id, entry in self._entries.items() if entry.index == index]
+            if stale:
+                logger.info(f"🔄 Index '{index}' changed - invalidating {len(stale)} cached retrieval results")
+                self._index.remove_ids(np.array(stale, dtype=np.int64))
+                for entry_id in stale:
+                    del self._entries[entry_id]
+
+    def lookup(
+        self,
+        embedding: np.ndarray,
+        k: int,
+        scope: str = "",
+        index: str = "",
+        fingerprint: str = "",
+    ) -> Optional[np.ndarray]:
+        """
+        Find a cached result for a semantically equivalent query.
+
+        Args:
+            embedding: Query embedding
+            k: Number of chunk ids needed
+            scope: Retrieval mode/filters; only entries with the same scope match
+            index: Named index; only entries of the same index match
+            fingerprint: Manifest fingerprint of the caller's index build; only entries of that build match
+
+        Returns:
+            Top-k cached chunk ids, or None on a miss
+        """
+        query = self._normalized(embedding)
+        with self._lock:
+            if self._index.ntotal:
+                scores, ids = self._index.search(query, min(self.SEARCH_DEPTH, self._index.ntotal))
+                for score, entry_id in zip(scores[0], ids[0]):
+                    if entry_id == -1 or score < self.threshold:
+                        break
+                    entry = self._entries.get(int(entry_id))
+                    if (
+                        entry is not None and entry.scope == scope and entry.index == index
+                        and entry.fingerprint == fingerprint
+                        and (entry.complete or len(entry.chunk_ids) >= k)
+                    ):
+                        self._entries.move_to_end(int(entry_id))
+                        self.hits += 1
+                        return entry.chunk_ids[:k]
+            self.misses += 1
+        return None
+
+    def store(
+        self,
+        embedding: np.ndarray,
+        chunk_ids: np.ndarray,
+        scope: str = "",
+        index: str = "",
+        complete: bool = False,
+        fingerprint: str = "",
+    ):
+        """
+        Cache the fused chunk ids of a retrieval, evicting the least recently used entry when full.
+
+        Results of a build that was swapped out while they were computed (fingerprint
+        no longer current for the index) are dropped: their ids refer to the old chunks.
+        """
+        query = self._normalized(embedding)
+        with self._lock:
+            current = self.fingerprints.get(index)
+            if current is not None and current != fingerprint:
+                return
+            while len(self._entries) >= self.maxsize:
+                evicted_id, _ = self._entries.popitem(last=False)
+                self._index.remove_ids(np.array([evicted_id], dtype=np.int64))
+            entry_id = self._next_id
+            self._next_id += 1
+            self._index.add_with_ids(query, np.array([entry_id], dtype=np.int64))
+            self._entries[entry_id] = _CachedResult(
+                np.array(chunk_ids, dtype=np.int64), scope, index, fingerprint, complete
+            )
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+            }
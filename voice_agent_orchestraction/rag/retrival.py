@@ -1,25 +1,48 @@
 import asyncio
 import logging
 import os
-import pickle
-import json
-import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, replace
 from pathlib import Path
-from typing import List, Tuple
+from typing import Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
 
-import faiss
-from langchain_openai import OpenAIEmbeddings
-from langchain_community.vectorstores import FAISS
-from langchain_core.documents import Document
+import numpy as np
+from openai import AsyncOpenAI
 from livekit.agents.llm import function_tool
 from dotenv import load_dotenv
 
-try:
-    from rank_bm25 import BM25Okapi
-    BM25_AVAILABLE = True
-except ImportError:
-    BM25_AVAILABLE = False
-    logging.warning("rank_bm25 not available. Install with: pip install rank-bm25")
+from voice_agent_orchestraction.rag.bm25_index import SparseBM25Index
+from voice_agent_orchestraction.rag.cutoff import CutoffDecision, CutoffPolicy, CutoffStats, adaptive_cutoff
+from voice_agent_orchestraction.rag.context_packer import DEFAULT_TOKEN_ENCODING, PackResult, get_token_counter, pack_context
+from voice_agent_orchestraction.rag.embedding_cache import EMBEDDING_CACHE_FILENAME, EmbeddingCache
+from voice_agent_orchestraction.rag.hedging import HedgedRequester
+from voice_agent_orchestraction.rag.fusion import (
+    DEFAULT_RRF_K,
+    FUSION_FAISS_CANDIDATES,
+    FUSION_MODES,
+    FUSION_RRF,
+    FUSION_WEIGHTED,
+    fuse_candidates,
+    fuse_rrf,
+    fuse_weighted,
+)
+from voice_agent_orchestraction.rag.index_factory import DEFAULT_EF_SEARCH, DEFAULT_NPROBE
+from voice_agent_orchestraction.rag.index_registry import IndexRegistry, IndexSpec, load_registry_config
+from voice_agent_orchestraction.rag.index_manifest import (
+    load_manifest,
+    manifest_fingerprint,
+    validate_index,
+    verify_checksums,
+)
+from voice_agent_orchestraction.rag.metadata_filters import MetadataBitmaps
+from voice_agent_orchestraction.rag.prefetch import SpeculativePrefetcher
+from voice_agent_orchestraction.rag.result_cache import SemanticResultCache
+from voice_agent_orchestraction.rag.seed_queries import QUERY_FORMAT_EXAMPLES
+from voice_agent_orchestraction.rag.turn_classifier import needs_retrieval
+from voice_agent_orchestraction.rag.snapshots import SnapshotWatcher, read_current_version, resolve_snapshot_dir
+from voice_agent_orchestraction.rag.vector_store import FaissVectorStore
 
 
 logger = logging.getLogger(__name__)
@@ -33,540 +56,1456 @@ load_dotenv(dotenv_path=script_dir / ".env", override=True)
 
 USE_RAG = os.getenv("USE_RAG", "true").lower() == "true"
 
-# FAISS Index Directory (single index location)
+# tool:   the LLM calls RAG_RETRIEVER before answering (two completions per answer)
+# inject: retrieve on the final user transcript and add the context before the single completion
+RAG_MODE_TOOL = "tool"
+RAG_MODE_INJECT = "inject"
+RAG_MODE = os.getenv("RAG_MODE", RAG_MODE_TOOL).lower()
+RAG_INJECT_TIMEOUT_MS = float(os.getenv("RAG_INJECT_TIMEOUT_MS", "1500"))  # Answer without context if retrieval is slower
+if RAG_MODE not in (RAG_MODE_TOOL, RAG_MODE_INJECT):
+    logger.warning(f"⚠️ Unknown RAG_MODE '{RAG_MODE}', using '{RAG_MODE_TOOL}'")
+    RAG_MODE = RAG_MODE_TOOL
+
+# Default FAISS index directory (the only index unless RAG_INDEX_REGISTRY lists more)
 FAISS_INDEX_DIR = os.getenv("FAISS_INDEX_DIR", os.path.join(script_dir, "faiss_index"))
 
 # OpenAI Embedding Model Configuration
 EMBEDDING_DIMENSIONS = int(os.getenv("EMBEDDING_DIMENSIONS", "1024"))  # text-embedding-3-large configured to output 1024 dimensions
+EMBEDDING_MODEL = "text-embedding-3-large"
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 FAISS_INDEX_NAME = os.getenv("FAISS_INDEX_NAME", "hdfc_ergo_policy")  # Index file name without extension
+RAG_MMAP_INDEX = os.getenv("RAG_MMAP_INDEX", "true").lower() == "true"  # Share index pages across job processes
+RAG_VERIFY_CHECKSUMS = os.getenv("RAG_VERIFY_CHECKSUMS", "true").lower() == "true"  # Check index files against manifest.json
+FAISS_NPROBE = int(os.getenv("FAISS_NPROBE", str(DEFAULT_NPROBE)))  # IVF lists probed per query (recall vs latency)
+FAISS_EF_SEARCH = int(os.getenv("FAISS_EF_SEARCH", str(DEFAULT_EF_SEARCH)))  # HNSW search beam width
+
+# Index registry: several named corpora (per product / language) served by one worker
+RAG_INDEX_REGISTRY = os.getenv("RAG_INDEX_REGISTRY", str(script_dir / "indexes.json"))  # Optional; absent = FAISS_INDEX_DIR only
+RAG_DEFAULT_INDEX = os.getenv("RAG_DEFAULT_INDEX", "")  # Overrides the registry file's default
+RAG_INDEX_MEMORY_BUDGET_MB = float(os.getenv("RAG_INDEX_MEMORY_BUDGET_MB", "0"))  # Loaded-index footprint before LRU eviction; 0 = unlimited
+RAG_SNAPSHOT_POLL_SECONDS = float(os.getenv("RAG_SNAPSHOT_POLL_SECONDS", "10"))  # Hot-reload check interval; 0 = never reload
 
 # ---------------------------------------------------------------------------
 # Caching for Performance Optimization
 # ---------------------------------------------------------------------------
 
-# Cache embeddings and FAISS indexes to avoid reloading on every retrieval
-_cached_embeddings = None
-_cached_faiss_db = None  # Cache for FAISS database
-_embedding_dimension = None
-_dimension_verified = False
-_faiss_load_count = 0  # Track FAISS index loads
-_faiss_first_load_time = None
-
-# BM25 caching
-_cached_bm25 = None
-_cached_documents = None
+# Named indexes (FAISS store + BM25 + filter bitmaps each), loaded once and
+# reused across retrievals; cold indexes are evicted under the memory budget
+_cached_index_registry = None  # IndexRegistry of RagAssets
+_snapshot_watcher = None  # Swaps in newly published index snapshots
+_failed_snapshot_versions = {}  # Index name -> snapshot version that failed to load (not retried)
+
+# Hybrid search
 _use_hybrid_search = os.getenv("USE_HYBRID_SEARCH", "true").lower() == "true"
 _hybrid_search_weight = float(os.getenv("HYBRID_SEARCH_WEIGHT", "0.5"))  # 0.5 = equal weight, 0.0 = only FAISS, 1.0 = only BM25
+_hybrid_fusion_mode = os.getenv("HYBRID_FUSION_MODE", FUSION_WEIGHTED).lower()  # weighted | rrf | faiss_candidates
+_hybrid_rrf_k = int(os.getenv("HYBRID_RRF_K", str(DEFAULT_RRF_K)))
+if _hybrid_fusion_mode not in FUSION_MODES:
+    logger.warning(f"⚠️ Unknown HYBRID_FUSION_MODE '{_hybrid_fusion_mode}', using '{FUSION_WEIGHTED}'")
+    _hybrid_fusion_mode = FUSION_WEIGHTED
+
+# Async retrieval: FAISS/BM25 work runs on a dedicated bounded thread pool so the
+# LiveKit job event loop (audio frames, VAD, TTS streaming) is never blocked
+RAG_EXECUTOR_WORKERS = int(os.getenv("RAG_EXECUTOR_WORKERS", "4"))
+_cached_async_embeddings = None
+_retrieval_executor = None
+_load_lock = threading.Lock()  # Guards first-time registry creation from executor threads
+_last_retrieval_timings = None
+
+# Query embedding cache (LRU + TTL in memory, optional SQLite tier seeded at ingestion)
+RAG_EMBEDDING_CACHE_SIZE = int(os.getenv("RAG_EMBEDDING_CACHE_SIZE", "1024"))
+RAG_EMBEDDING_CACHE_TTL = float(os.getenv("RAG_EMBEDDING_CACHE_TTL", "86400"))  # Seconds; 0 = no expiry
+RAG_EMBEDDING_CACHE_PERSIST = os.getenv("RAG_EMBEDDING_CACHE_PERSIST", "true").lower() == "true"
+RAG_EMBEDDING_CACHE_PATH = os.getenv(
+    "RAG_EMBEDDING_CACHE_PATH", os.path.join(FAISS_INDEX_DIR, EMBEDDING_CACHE_FILENAME)
+)
+_cached_embedding_cache = None
+
+# Semantic result cache: reuse the fused chunk ids of a near-identical past query
+RAG_RESULT_CACHE_ENABLED = os.getenv("RAG_RESULT_CACHE_ENABLED", "true").lower() == "true"
+RAG_RESULT_CACHE_THRESHOLD = float(os.getenv("RAG_RESULT_CACHE_THRESHOLD", "0.95"))  # Cosine similarity
+RAG_RESULT_CACHE_SIZE = int(os.getenv("RAG_RESULT_CACHE_SIZE", "512"))
+_cached_result_cache = None
+
+# Batch retrieval (RAG_RETRIEVER_BATCH): several sub-queries in one embedding request and one search pass
+RAG_BATCH_MAX_QUERIES = int(os.getenv("RAG_BATCH_MAX_QUERIES", "6"))
+
+# Speculative prefetch: retrieve on the user's interim/final transcripts before the LLM calls the tool
+RAG_PREFETCH_ENABLED = os.getenv("RAG_PREFETCH_ENABLED", "true").lower() == "true"
+RAG_PREFETCH_DEBOUNCE_MS = float(os.getenv("RAG_PREFETCH_DEBOUNCE_MS", "300"))  # Interim transcript stability
+RAG_PREFETCH_MIN_WORDS = int(os.getenv("RAG_PREFETCH_MIN_WORDS", "3"))
+RAG_PREFETCH_MIN_OVERLAP = float(os.getenv("RAG_PREFETCH_MIN_OVERLAP", "0.6"))  # Tool query terms found in the transcript
+RAG_PREFETCH_TTL = float(os.getenv("RAG_PREFETCH_TTL", "20"))  # Seconds a prefetched result is served
+
+# Context packing: near-duplicate chunks dropped and the rest trimmed to a token budget
+RAG_CONTEXT_PACKING = os.getenv("RAG_CONTEXT_PACKING", "true").lower() == "true"
+RAG_CONTEXT_TOKEN_BUDGET = int(os.getenv("RAG_CONTEXT_TOKEN_BUDGET", "1000"))  # Per retrieval; 0 = only drop duplicates
+RAG_CONTEXT_MIN_TOKENS = int(os.getenv("RAG_CONTEXT_MIN_TOKENS", "200"))  # Floor per sub-query of a batch
+RAG_CONTEXT_TOKEN_ENCODING = os.getenv("RAG_CONTEXT_TOKEN_ENCODING", DEFAULT_TOKEN_ENCODING)  # tiktoken encoding of the LLM
+RAG_CONTEXT_DUPLICATE_THRESHOLD = float(os.getenv("RAG_CONTEXT_DUPLICATE_THRESHOLD", "0.8"))  # Shingle Jaccard similarity
+_context_packing_stats = {
+    'calls': 0, 'tokens_before': 0, 'tokens_after': 0, 'duplicates_dropped': 0, 'chunks_dropped': 0,
+}
+
+# Adaptive result cutoff: chunks per query chosen from the fused score distribution (k = upper bound)
+RAG_ADAPTIVE_K = os.getenv("RAG_ADAPTIVE_K", "true").lower() == "true"
+RAG_MAX_K = int(os.getenv("RAG_MAX_K", "6"))  # Chunks per query at most (fixed k when adaptive cutoff is off: 4)
+RAG_MIN_K = int(os.getenv("RAG_MIN_K", "1"))
+RAG_CUTOFF_MIN_SCORE = float(os.getenv("RAG_CUTOFF_MIN_SCORE", "0"))  # Absolute fused-score floor; 0 = off
+RAG_CUTOFF_MIN_RELATIVE = float(os.getenv("RAG_CUTOFF_MIN_RELATIVE", "0.3"))  # Fraction of the top score; 0 = off
+RAG_CUTOFF_MAX_GAP = float(os.getenv("RAG_CUTOFF_MAX_GAP", "0.25"))  # Score drop (fraction of top score) that ends the result
+RAG_TOP_K = RAG_MAX_K if RAG_ADAPTIVE_K else 4  # k requested by the tools, prefetch and injection
+_cutoff_policy = CutoffPolicy(
+    max_k=RAG_MAX_K,
+    min_k=RAG_MIN_K,
+    min_score=RAG_CUTOFF_MIN_SCORE,
+    min_relative=RAG_CUTOFF_MIN_RELATIVE,
+    max_gap=RAG_CUTOFF_MAX_GAP,
+)
+_cutoff_stats = CutoffStats()
+
+# Embedding deadline: past it, hybrid retrieval answers from BM25 alone (tagged as degraded) while the
+# late embedding still lands in the cache; slow embedding requests are hedged after the tracked percentile
+RAG_EMBED_DEADLINE_MS = float(os.getenv("RAG_EMBED_DEADLINE_MS", "700"))  # 0 = always wait for the embedding
+RAG_EMBED_HEDGE = os.getenv("RAG_EMBED_HEDGE", "true").lower() == "true"
+RAG_EMBED_HEDGE_PERCENTILE = float(os.getenv("RAG_EMBED_HEDGE_PERCENTILE", "95"))
+RAG_EMBED_HEDGE_MIN_SAMPLES = int(os.getenv("RAG_EMBED_HEDGE_MIN_SAMPLES", "20"))  # Requests observed before hedging
+DEGRADED_RESULT_TAG = "[Keyword search only - semantic search timed out; results may be less precise]"
+_cached_embedding_hedger = None
+_degraded_retrievals = 0
 
 # ---------------------------------------------------------------------------
 # FAISS Retrieval Functions
 # ---------------------------------------------------------------------------
 
 
-def build_local_embeddings():
+def build_async_embeddings_client() -> AsyncOpenAI:
     """
-    Build OpenAI embeddings.
-    Ensures embedding and retrieval dimensions are consistent.
+    Build the async OpenAI client used for query embeddings on the hot path.
+    The request is awaited on the event loop instead of blocking it.
     Cached after first call.
     """
-    global _cached_embeddings
-    
-    if _cached_embeddings is None:
-        try:
-            logger.info("Initializing OpenAI embeddings")
-            logger.info(f"Expected dimensions: {EMBEDDING_DIMENSIONS}")
-            
-            if not OPENAI_API_KEY:
-                raise ValueError("OPENAI_API_KEY environment variable is not set")
-            
-            # Initialize OpenAI embeddings with specified dimensions
-            _cached_embeddings = OpenAIEmbeddings(
-                openai_api_key=OPENAI_API_KEY,
-                model="text-embedding-3-large",
-                dimensions=EMBEDDING_DIMENSIONS  # Set to 1024 to match ingestion
-            )
-            logger.info("✅ OpenAI embeddings model loaded and cached")
-        except Exception as exc:
-            logger.error(f"Failed to initialize OpenAI embedding model: {exc}")
-            raise ValueError(f"Failed to initialize OpenAI embeddings: {exc}")
-    
-    return _cached_embeddings
+    global _cached_async_embeddings
+
+    if _cached_async_embeddings is None:
+        if not OPENAI_API_KEY:
+            raise ValueError("OPENAI_API_KEY environment variable is not set")
+        _cached_async_embeddings = AsyncOpenAI(api_key=OPENAI_API_KEY)
+        logger.info("✅ Async OpenAI embeddings client created and cached")
+
+    return _cached_async_embeddings
 
 
-def get_embedding_dimensions(embeddings) -> int:
+def get_embedding_cache() -> EmbeddingCache:
     """
-    Get the embedding dimensions from the embeddings model.
-    This ensures consistency between embedding and retrieval.
+    Get the query embedding cache. The persistent tier is shared with
+    ingestion, which pre-seeds it with known frequent queries.
     Cached after first call.
     """
-    global _embedding_dimension
-    
-    if _embedding_dimension is None:
-        try:
-            test_vec = embeddings.embed_query("test")
-            _embedding_dimension = len(test_vec)
-            logger.info(f"Embedding dimension verified: {_embedding_dimension}")
-        except Exception as exc:
-            logger.error(f"Failed to get embedding dimensions: {exc}")
-            raise
-    
-    return _embedding_dimension
+    global _cached_embedding_cache
+
+    if _cached_embedding_cache is None:
+        _cached_embedding_cache = EmbeddingCache(
+            model=EMBEDDING_MODEL,
+            dimensions=EMBEDDING_DIMENSIONS,
+            maxsize=RAG_EMBEDDING_CACHE_SIZE,
+            ttl=RAG_EMBEDDING_CACHE_TTL or None,
+            persist_path=RAG_EMBEDDING_CACHE_PATH if RAG_EMBEDDING_CACHE_PERSIST else None,
+        )
+        logger.info(
+            f"✅ Query embedding cache ready (size={RAG_EMBEDDING_CACHE_SIZE}, ttl={RAG_EMBEDDING_CACHE_TTL:.0f}s, "
+            f"persistent={'yes' if _cached_embedding_cache.persistent else 'no'})"
+        )
+
+    return _cached_embedding_cache
+
+
+def get_embedding_cache_stats() -> dict:
+    """Hit/miss counters and hit rate of the query embedding cache."""
+    return get_embedding_cache().stats()
+
+
+def get_embedding_hedger() -> HedgedRequester:
+    """
+    Get the hedged requester for OpenAI embedding calls (tracks their latency
+    in this process). Cached after first call.
+    """
+    global _cached_embedding_hedger
+
+    if _cached_embedding_hedger is None:
+        _cached_embedding_hedger = HedgedRequester(
+            percentile=RAG_EMBED_HEDGE_PERCENTILE,
+            min_samples=RAG_EMBED_HEDGE_MIN_SAMPLES,
+            enabled=RAG_EMBED_HEDGE,
+        )
+    return _cached_embedding_hedger
+
+
+async def _create_embeddings(inputs):
+    """One OpenAI embeddings request (str or list input), hedged when it is unusually slow."""
+    client = build_async_embeddings_client()
+    return await get_embedding_hedger().call(
+        lambda: client.embeddings.create(model=EMBEDDING_MODEL, input=inputs, dimensions=EMBEDDING_DIMENSIONS)
+    )
+
+
+async def embed_query_async(query: str) -> np.ndarray:
+    """
+    Embed a query without blocking the event loop.
+    Served from the embedding cache when possible (memory, then SQLite off-loop).
+
+    Args:
+        query: Search query
+
+    Returns:
+        Query embedding (EMBEDDING_DIMENSIONS floats)
+    """
+    cache = get_embedding_cache()
+    vector = cache.get(query)
+    if vector is None and cache.persistent:
+        vector = await run_in_retrieval_executor(cache.get_persistent, query)
+    if vector is not None:
+        return vector
+
+    response = await _create_embeddings(query)
+    vector = np.asarray(response.data[0].embedding, dtype=np.float32)
+    cache.put(query, vector)
+    if cache.persistent:
+        # Persist off-loop without delaying the search
+        get_retrieval_executor().submit(cache.put_persistent, [query], [vector])
+    return vector
+
+
+async def embed_queries_async(queries: Sequence[str]) -> np.ndarray:
+    """
+    Embed several queries with at most one OpenAI request (cache misses only).
+
+    Args:
+        queries: Search queries
+
+    Returns:
+        Query embeddings, shape (len(queries), EMBEDDING_DIMENSIONS)
+    """
+    cache = get_embedding_cache()
+    vectors = {query: cache.get(query) for query in queries}
+    missing = [query for query, vector in vectors.items() if vector is None]
+    if missing and cache.persistent:
+        found = await run_in_retrieval_executor(lambda: [cache.get_persistent(query) for query in missing])
+        vectors.update((query, vector) for query, vector in zip(missing, found) if vector is not None)
+        missing = [query for query in missing if vectors[query] is None]
+
+    if missing:
+        response = await _create_embeddings(missing)
+        embedded = [np.asarray(item.embedding, dtype=np.float32) for item in sorted(response.data, key=lambda item: item.index)]
+        for query, vector in zip(missing, embedded):
+            vectors[query] = vector
+            cache.put(query, vector)
+        if cache.persistent:
+            get_retrieval_executor().submit(cache.put_persistent, missing, embedded)
+    return np.vstack([vectors[query] for query in queries])
+
+
+def get_retrieval_executor() -> ThreadPoolExecutor:
+    """
+    Get the dedicated, bounded thread pool for FAISS and BM25 work.
+    FAISS releases the GIL during search, so the pool also lets the
+    semantic and keyword legs of a hybrid query overlap.
+    """
+    global _retrieval_executor
+
+    if _retrieval_executor is None:
+        _retrieval_executor = ThreadPoolExecutor(
+            max_workers=RAG_EXECUTOR_WORKERS,
+            thread_name_prefix="rag-retrieval",
+        )
+        logger.info(f"✅ Retrieval executor started with {RAG_EXECUTOR_WORKERS} workers")
+
+    return _retrieval_executor
+
+
+async def run_in_retrieval_executor(fn: Callable, *args):
+    """Run a blocking retrieval function on the retrieval executor and await it."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_retrieval_executor(), fn, *args)
+
+
+@dataclass
+class RetrievalTimings:
+    """
+    Per-stage timings (seconds) for a single retrieval.
+
+    `on_loop` is the time spent executing on the event loop itself
+    (fusion and formatting); everything else is awaited off-loop.
+    """
+    embedding: float = 0.0
+    faiss: float = 0.0
+    bm25: float = 0.0
+    fusion: float = 0.0
+    formatting: float = 0.0
+    total: float = 0.0
+    on_loop: float = 0.0
+    result_cache: float = 0.0
+
+    def as_dict(self) -> dict:
+        """Timings in milliseconds, for logging/metrics export."""
+        return {name: round(value * 1000, 2) for name, value in self.__dict__.items()}
+
+
+def get_last_retrieval_timings() -> Optional[RetrievalTimings]:
+    """Return the stage timings of the most recent retrieval in this process."""
+    return _last_retrieval_timings
+
+
+def get_result_cache() -> Optional[SemanticResultCache]:
+    """
+    Get the semantic result cache shared by all indexes. Entries are tagged
+    with their index and dropped when that index's manifest fingerprint
+    changes. None when disabled.
+    """
+    global _cached_result_cache
+
+    if not RAG_RESULT_CACHE_ENABLED:
+        return None
+    if _cached_result_cache is None:
+        _cached_result_cache = SemanticResultCache(
+            dimensions=EMBEDDING_DIMENSIONS,
+            threshold=RAG_RESULT_CACHE_THRESHOLD,
+            maxsize=RAG_RESULT_CACHE_SIZE,
+        )
+        logger.info(
+            f"✅ Semantic result cache ready (threshold={RAG_RESULT_CACHE_THRESHOLD}, size={RAG_RESULT_CACHE_SIZE})"
+        )
+    return _cached_result_cache
+
+
+@dataclass
+class RagAssets:
+    """
+    Static RAG assets of one index, loaded once per worker process (LiveKit
+    prewarm or first use) and held by the index registry.
+    """
+    store: FaissVectorStore
+    bm25: Optional[SparseBM25Index]
+    manifest: Optional[dict]
+    bitmaps: Optional[MetadataBitmaps] = None
+    name: str = ""  # Registry name of the index
+    version: Optional[str] = None  # Snapshot name (None for a legacy flat index directory)
+    index_dir: str = ""  # Directory the files were read from
+
+    @property
+    def fingerprint(self) -> str:
+        """Identifies this index build; indexes without a manifest are identified by the loaded store object."""
+        return manifest_fingerprint(self.manifest) or f"unversioned-{id(self.store)}"
+
+
+def load_bm25_index(index_dir: str, documents: Sequence[str]) -> Optional[SparseBM25Index]:
+    """
+    Load the BM25 index saved by ingestion (memory-mapped); only indexes
+    that predate it are tokenized and built in-process.
+    """
+    try:
+        if SparseBM25Index.exists(index_dir):
+            bm25 = SparseBM25Index.load(index_dir, mmap=RAG_MMAP_INDEX)
+            logger.info(f"✅ BM25 index loaded from DISK with {bm25.n_docs} documents")
+        else:
+            logger.warning("⚠️ No saved BM25 index - building in-process (re-run ingestion to persist it)")
+            bm25 = SparseBM25Index.build(documents)
+            logger.info(f"✅ BM25 index built with {bm25.n_docs} documents")
+        if bm25.n_docs != len(documents):
+            logger.warning(
+                f"⚠️ BM25 document count ({bm25.n_docs}) doesn't match chunk count ({len(documents)})"
+            )
+        return bm25
+    except Exception as exc:
+        logger.error(f"Failed to load BM25 index: {exc}")
+        return None
+
+
+def load_metadata_bitmaps(index_dir: str, store: FaissVectorStore) -> Optional[MetadataBitmaps]:
+    """
+    Load the per-value FAISS-id bitmaps backing structured filters
+    (memory-mapped); indexes that predate them are built in-process from
+    chunk metadata.
+    """
+    try:
+        if MetadataBitmaps.exists(index_dir):
+            bitmaps = MetadataBitmaps.load(index_dir, mmap=RAG_MMAP_INDEX)
+            logger.info(f"✅ Filter bitmaps loaded from DISK ({len(bitmaps.bitmaps)} values)")
+        else:
+            logger.warning("⚠️ No saved filter bitmaps - building in-process (re-run ingestion to persist them)")
+            bitmaps = MetadataBitmaps.build(store.metadatas)
+        return bitmaps
+    except Exception as exc:
+        logger.error(f"Failed to load filter bitmaps: {exc}")
+        return None
 
 
-def get_faiss_db():
+def load_index_assets(spec: IndexSpec) -> RagAssets:
     """
-    Get or load the FAISS database.
-    Cached after first load to avoid reloading on every retrieval.
+    Load one index directory from disk: validated FAISS store, BM25 index
+    and filter bitmaps. Blocking - the registry calls it off the event loop.
+    
+    Args:
+        spec: Registry entry of the index
     
     Returns:
-        FAISS database
+        RagAssets (raw FAISS index + chunk texts indexed by FAISS id, BM25, bitmaps)
     """
-    global _cached_faiss_db, _dimension_verified, _faiss_load_count, _faiss_first_load_time
+    load_start = time.time()
+    # Published snapshots live under versions/<name>; legacy indexes are flat directories
+    index_dir, version = resolve_snapshot_dir(spec.index_dir)
+    logger.info(f"🔄 Loading index '{spec.name}' from DISK...")
+    logger.info(f"   Index directory: {index_dir}" + (f" (snapshot {version})" if version else ""))
     
-    if _cached_faiss_db is None:
-        # Loading from disk for the first time
-        import time
-        load_start = time.time()
-        logger.info(f"🔄 Loading FAISS index from DISK (first load)...")
-        logger.info(f"   Index directory: {FAISS_INDEX_DIR}")
-        
-        embeddings = build_local_embeddings()
-        
-        # Load raw FAISS index from disk
-        try:
-            index_path = Path(FAISS_INDEX_DIR) / f"{FAISS_INDEX_NAME}.index"
-            metadata_path = Path(FAISS_INDEX_DIR) / "metadata.pkl"
-            chunk_mapping_path = Path(FAISS_INDEX_DIR) / "chunk_mapping.json"
-            
-            if not index_path.exists():
-                raise FileNotFoundError(f"FAISS index file not found: {index_path}")
-            
-            # Load raw FAISS index
-            faiss_index = faiss.read_index(str(index_path))
-            logger.info(f"✅ Loaded raw FAISS index with {faiss_index.ntotal} vectors")
-            
-            # Load chunk mapping
-            if chunk_mapping_path.exists():
-                with open(chunk_mapping_path, 'r', encoding='utf-8') as f:
-                    chunk_mapping = json.load(f)
-                logger.info(f"✅ Loaded chunk mapping with {len(chunk_mapping)} chunks")
-            else:
-                logger.warning("⚠️ chunk_mapping.json not found, creating empty mapping")
-                chunk_mapping = {}
-            
-            # Create LangChain Documents from chunk mapping
-            documents = []
-            for chunk_id, chunk_data in chunk_mapping.items():
-                content = chunk_data.get('content', '')
-                metadata = chunk_data.get('metadata', {})
-                documents.append(Document(page_content=content, metadata=metadata))
-            
-            # Ensure documents match index size
-            if len(documents) != faiss_index.ntotal:
-                logger.warning(
-                    f"⚠️ Document count ({len(documents)}) doesn't match index size ({faiss_index.ntotal}). "
-                    f"Padding or truncating documents."
-                )
-                if len(documents) < faiss_index.ntotal:
-                    # Pad with empty documents
-                    documents.extend([Document(page_content="")] * (faiss_index.ntotal - len(documents)))
-                else:
-                    # Truncate
-                    documents = documents[:faiss_index.ntotal]
-            
-            # Create FAISS vectorstore from raw index and documents
-            # Create minimal vectorstore first, then replace components
-            _cached_faiss_db = FAISS.from_documents(
-                [Document(page_content="dummy")],
-                embeddings
+    try:
+        # Validate against manifest.json offline - no embedding round trip at startup
+        manifest = load_manifest(index_dir)
+        if manifest is not None and RAG_VERIFY_CHECKSUMS:
+            verify_checksums(index_dir, manifest)
+        store = FaissVectorStore.load(
+            index_dir,
+            spec.index_name,
+            mmap=RAG_MMAP_INDEX,
+            nprobe=FAISS_NPROBE,
+            ef_search=FAISS_EF_SEARCH,
+        )
+        validate_index(
+            manifest,
+            index_dimensions=store.dimension,
+            vector_count=store.ntotal,
+            chunk_count=store.chunk_count,
+            expected_model=EMBEDDING_MODEL,
+            expected_dimensions=EMBEDDING_DIMENSIONS,
+        )
+    except Exception as exc:
+        logger.error(f"Failed to load FAISS index from {index_dir}: {exc}")
+        raise ValueError(
+            f"Failed to load FAISS index from {index_dir}: {exc}"
+        )
+    
+    logger.info(
+        f"✅ Index validated offline: {store.dimension} dimensions, model {EMBEDDING_MODEL}"
+        + (f", type {manifest.get('index_type')}, built {manifest.get('created_at')}" if manifest else " (no manifest)")
+    )
+    
+    # Chunk texts double as the BM25 corpus
+    bm25 = load_bm25_index(index_dir, store.texts) if _use_hybrid_search else None
+    bitmaps = load_metadata_bitmaps(index_dir, store)
+    
+    logger.info(f"✅ Index '{spec.name}' loaded from DISK in {time.time() - load_start:.3f}s ({store.ntotal} vectors)")
+    return RagAssets(
+        store=store,
+        bm25=bm25,
+        manifest=manifest,
+        bitmaps=bitmaps,
+        name=spec.name,
+        version=version,
+        index_dir=index_dir,
+    )
+
+
+def get_index_registry() -> IndexRegistry:
+    """
+    Get the registry of named indexes. Indexes come from the RAG_INDEX_REGISTRY
+    file when it exists, otherwise the single FAISS_INDEX_DIR index.
+    Cached after first call.
+    """
+    global _cached_index_registry
+    
+    if _cached_index_registry is None:
+        with _load_lock:
+            if _cached_index_registry is not None:
+                return _cached_index_registry
+            specs, default = {}, None
+            if Path(RAG_INDEX_REGISTRY).exists():
+                specs, default = load_registry_config(RAG_INDEX_REGISTRY)
+            if not specs:
+                specs = {FAISS_INDEX_NAME: IndexSpec(name=FAISS_INDEX_NAME, index_dir=FAISS_INDEX_DIR, index_name=FAISS_INDEX_NAME)}
+            default = RAG_DEFAULT_INDEX or default or next(iter(specs))
+            _cached_index_registry = IndexRegistry(
+                specs,
+                default=default,
+                loader=load_index_assets,
+                memory_budget_bytes=int(RAG_INDEX_MEMORY_BUDGET_MB * 1024 * 1024),
             )
-            # Replace with loaded index
-            _cached_faiss_db.index = faiss_index
-            # Update docstore with all documents
-            from langchain_community.docstore.in_memory import InMemoryDocstore
-            _cached_faiss_db.docstore = InMemoryDocstore()
-            _cached_faiss_db.index_to_docstore_id = {}
-            for i, doc in enumerate(documents):
-                _cached_faiss_db.docstore.add({i: doc})
-                _cached_faiss_db.index_to_docstore_id[i] = i
-            
-            logger.info(f"✅ Created FAISS vectorstore with {len(documents)} documents")
-            
-            # Cache documents for BM25
-            global _cached_documents
-            _cached_documents = documents
-            
-        except Exception as exc:
-            logger.error(f"Failed to load FAISS index from {FAISS_INDEX_DIR}: {exc}")
-            raise ValueError(
-                f"Failed to load FAISS index. "
-                f"Please ensure the index exists at {FAISS_INDEX_DIR}."
+            logger.info(
+                f"✅ Index registry ready: {', '.join(specs)} (default '{default}', "
+                f"budget {'unlimited' if not RAG_INDEX_MEMORY_BUDGET_MB else f'{RAG_INDEX_MEMORY_BUDGET_MB:.0f}MB'})"
             )
-        
-        load_time = time.time() - load_start
-        _faiss_load_count += 1
-        _faiss_first_load_time = time.time()
-        
-        logger.info(
-            f"✅ FAISS index loaded from DISK in {load_time:.3f}s "
-            f"(load count: {_faiss_load_count})"
-        )
-        
-        # Verify dimensions only once during first load
-        if not _dimension_verified:
-            embedding_dim = get_embedding_dimensions(embeddings)
-            index_dim = _cached_faiss_db.index.d if hasattr(_cached_faiss_db.index, 'd') else None
-            
-            if index_dim:
-                if index_dim != embedding_dim:
-                    logger.error(
-                        f"Dimension mismatch! Index has {index_dim} dimensions, "
-                        f"but embeddings have {embedding_dim} dimensions."
-                    )
-                    # Clear the cached database
-                    _cached_faiss_db = None
-                    raise ValueError(
-                        f"Embedding dimension mismatch. "
-                        f"Index expects {index_dim} dimensions, but current model produces {embedding_dim} dimensions. "
-                        f"Please rebuild the FAISS index."
-                    )
-                else:
-                    logger.info(
-                        f"✅ Dimension match confirmed: Index ({index_dim}) and embeddings ({embedding_dim}) both use {embedding_dim} dimensions"
-                    )
-                    _dimension_verified = True
-            else:
-                logger.warning("Could not determine index dimensions")
-                _dimension_verified = True
-        
-        logger.info(f"✅ FAISS index cached in MEMORY - future retrievals will use cached version")
-    else:
-        # Using cached version from memory
-        logger.debug(f"💾 Using FAISS index from MEMORY cache (no disk access)")
     
-    return _cached_faiss_db
+    return _cached_index_registry
 
 
-def tokenize(text: str) -> List[str]:
+async def get_index_assets(index_name: Optional[str] = None) -> RagAssets:
     """
-    Tokenize text for BM25 - handles Hindi, English, and Hinglish.
-    Simple tokenization that works for multilingual content.
+    Get the assets of a named index (None = default) without blocking the
+    event loop: served from memory, or loaded on the retrieval executor on first use.
     """
-    # Convert to lowercase and split on whitespace and punctuation
-    text = text.lower()
-    # Split on whitespace and common punctuation, but keep alphanumeric sequences
-    tokens = re.findall(r'\b\w+\b', text)
-    # Filter out very short tokens (less than 2 chars) except for common words
-    tokens = [t for t in tokens if len(t) >= 2 or t in ['a', 'i', 'o']]
-    return tokens
+    registry = get_index_registry()
+    assets = registry.loaded(index_name)
+    if assets is None:
+        assets = await run_in_retrieval_executor(registry.get, index_name)
+    return assets
 
 
-def build_bm25_index(documents: List[Document]) -> BM25Okapi:
+def get_faiss_db(index_name: Optional[str] = None) -> FaissVectorStore:
     """
-    Build BM25 index from documents for keyword-based search.
-    Cached after first build.
+    Get or load the native FAISS vector store of a named index (None = default).
+    Blocking on first load; cached in the index registry afterwards.
+    
+    Returns:
+        FaissVectorStore (raw FAISS index + chunk texts indexed by FAISS id)
     """
-    global _cached_bm25
+    return get_index_registry().get(index_name).store
+
+
+def refresh_index_snapshots() -> List[str]:
+    """
+    Swap in newly published snapshots of loaded indexes (blocking; run by the
+    snapshot watcher thread). Each new snapshot is fully loaded and validated
+    before the registry entry is replaced, and retrievals already running keep
+    the assets they started with - no query sees a half-loaded index.
     
-    if _cached_bm25 is None:
-        if not BM25_AVAILABLE:
-            logger.warning("BM25 not available - skipping keyword search. Install rank-bm25 for hybrid search.")
-            return None
-        
+    Returns:
+        Names of swapped indexes
+    """
+    registry = get_index_registry()
+    swapped = []
+    for name, assets in registry.loaded_items():
+        version = read_current_version(registry.spec(name).index_dir)
+        if version is None or version == assets.version or _failed_snapshot_versions.get(name) == version:
+            continue
+        logger.info(f"🔄 New snapshot {version} published for index '{name}' (serving {assets.version or 'legacy'})")
         try:
-            logger.info("Building BM25 index for keyword search...")
-            # Tokenize all documents
-            tokenized_docs = [tokenize(doc.page_content) for doc in documents]
-            
-            # Build BM25 index
-            _cached_bm25 = BM25Okapi(tokenized_docs)
-            logger.info(f"✅ BM25 index built with {len(tokenized_docs)} documents")
+            new_assets = load_index_assets(registry.spec(name))
         except Exception as exc:
-            logger.error(f"Failed to build BM25 index: {exc}")
-            return None
+            # Keep serving the old snapshot; a later publish is picked up as usual
+            _failed_snapshot_versions[name] = version
+            logger.error(f"Failed to load snapshot {version} of index '{name}', keeping {assets.version}: {exc}")
+            continue
+        if registry.swap(name, assets, new_assets):
+            swapped.append(name)
+            logger.info(f"✅ Index '{name}' hot-swapped to snapshot {new_assets.version}")
+    return swapped
+
+
+def start_snapshot_watcher() -> Optional[SnapshotWatcher]:
+    """Start the per-process snapshot watcher (once). None when hot reload is disabled."""
+    global _snapshot_watcher
     
-    return _cached_bm25
+    if RAG_SNAPSHOT_POLL_SECONDS <= 0:
+        return None
+    with _load_lock:
+        if _snapshot_watcher is None:
+            _snapshot_watcher = SnapshotWatcher(refresh_index_snapshots, RAG_SNAPSHOT_POLL_SECONDS).start()
+            logger.info(f"✅ Snapshot watcher started (every {RAG_SNAPSHOT_POLL_SECONDS:.0f}s)")
+    return _snapshot_watcher
 
 
-def retrieve_from_bm25(query: str, documents: List[Document], k: int = 4) -> List[Tuple[Document, float]]:
+def route_index(job_metadata) -> str:
+    """Index name for a job, from its dispatch metadata (see IndexRegistry.route)."""
+    return get_index_registry().route(job_metadata)
+
+
+@dataclass
+class ResolvedFilter:
+    """Structured filters resolved to id bitmaps for one retrieval."""
+    id_bitmap: np.ndarray  # Packed bitmap for faiss.IDSelectorBitmap
+    mask: np.ndarray  # Boolean mask over FAISS ids, for BM25
+    key: str  # Canonical filter spec (part of the result-cache scope)
+    matches: int
+
+
+def resolve_filters(
+    filters: Optional[Dict[str, object]],
+    bitmaps: Optional[MetadataBitmaps],
+) -> Optional[ResolvedFilter]:
+    """
+    Turn {field: value} filters into id bitmaps.
+    
+    Args:
+        filters: field -> value filters
+        bitmaps: Filter bitmaps of the index being searched
+    
+    Returns:
+        ResolvedFilter, or None when no filter is set, bitmaps are unavailable,
+        or nothing matches (the search then runs unfiltered rather than returning nothing)
+    """
+    filters = {field: value for field, value in (filters or {}).items() if value not in (None, "", [])}
+    if not filters:
+        return None
+    if bitmaps is None:
+        logger.warning(f"⚠️ Filter bitmaps unavailable - ignoring filters {filters}")
+        return None
+    id_bitmap = bitmaps.mask(filters)
+    mask = bitmaps.unpack(id_bitmap)
+    matches = int(mask.sum())
+    if not matches:
+        logger.warning(f"⚠️ No chunks match filters {filters} - searching without filters")
+        return None
+    key = ",".join(f"{field}={filters[field]}" for field in sorted(filters))
+    return ResolvedFilter(id_bitmap=id_bitmap, mask=mask, key=key, matches=matches)
+
+
+_EMPTY_HITS = (np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32))
+
+
+def retrieve_from_bm25(
+    query: str,
+    bm25: Optional[SparseBM25Index],
+    k: int = 4,
+    mask: Optional[np.ndarray] = None,
+) -> Tuple[np.ndarray, np.ndarray]:
     """
     Retrieve documents using BM25 keyword matching.
     
     Args:
         query: Search query
-        documents: List of documents to search
+        bm25: BM25 index of the index being searched
         k: Number of results to return
+        mask: Optional boolean mask of allowed FAISS ids (structured filters)
     
     Returns:
-        List of (document, score) tuples sorted by score
+        (faiss_ids, scores) arrays sorted by descending score
     """
-    if not BM25_AVAILABLE or not _use_hybrid_search:
-        return []
+    if not _use_hybrid_search:
+        return _EMPTY_HITS
     
     try:
-        bm25 = build_bm25_index(documents)
         if bm25 is None:
-            return []
+            return _EMPTY_HITS
         
-        # Tokenize query
-        tokenized_query = tokenize(query)
-        if not tokenized_query:
-            return []
-        
-        # Get BM25 scores
-        scores = bm25.get_scores(tokenized_query)
-        
-        # Get top k documents with scores
-        doc_scores = list(zip(documents, scores))
-        doc_scores.sort(key=lambda x: x[1], reverse=True)
-        
-        # Return top k
-        return doc_scores[:k]
+        # Vectorised scoring + argpartition top-k
+        return bm25.top_k(query, k, mask)
     except Exception as exc:
         logger.error(f"BM25 retrieval failed: {exc}")
-        return []
+        return _EMPTY_HITS
+
+
+def score_bm25_candidates(
+    query: str,
+    bm25: Optional[SparseBM25Index],
+    candidate_ids: np.ndarray,
+) -> Optional[np.ndarray]:
+    """
+    BM25 scores for FAISS candidates only (faiss_candidates fusion mode).
+    
+    Returns:
+        Scores aligned with candidate_ids, or None if BM25 is unavailable
+    """
+    try:
+        if bm25 is None:
+            return None
+        return bm25.score_candidates(query, candidate_ids)
+    except Exception as exc:
+        logger.error(f"BM25 candidate scoring failed: {exc}")
+        return None
 
 
-def hybrid_retrieve(query: str, k: int = 4) -> str:
+def retrieve_from_bm25_batch(
+    queries: Sequence[str],
+    bm25: Optional[SparseBM25Index],
+    k: int = 4,
+    mask: Optional[np.ndarray] = None,
+) -> List[Tuple[np.ndarray, np.ndarray]]:
+    """
+    BM25 top-k for several queries in one vectorised pass.
+    
+    Returns:
+        (faiss_ids, scores) per query, sorted by descending score
+    """
+    if not _use_hybrid_search or bm25 is None:
+        return [_EMPTY_HITS for _ in queries]
+    try:
+        return bm25.top_k_batch(queries, k, mask)
+    except Exception as exc:
+        logger.error(f"BM25 batch retrieval failed: {exc}")
+        return [_EMPTY_HITS for _ in queries]
+
+
+def _fuse_hits(
+    query: str,
+    bm25: Optional[SparseBM25Index],
+    faiss_ids: np.ndarray,
+    faiss_scores: np.ndarray,
+    bm25_hits: Optional[Tuple[np.ndarray, np.ndarray]],
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Fused (ids, scores) of one query per HYBRID_FUSION_MODE. bm25_hits None
+    means faiss_candidates mode (BM25 scores the FAISS hits only).
+    """
+    if not _use_hybrid_search or bm25 is None:
+        return faiss_ids, faiss_scores
+    if bm25_hits is None:
+        candidate_bm25 = score_bm25_candidates(query, bm25, faiss_ids)
+        if candidate_bm25 is None:
+            return faiss_ids, faiss_scores
+        return fuse_candidates(faiss_ids, faiss_scores, candidate_bm25, _hybrid_search_weight)
+    bm25_ids, bm25_scores = bm25_hits
+    # BM25 top-k is padded with documents sharing no query term (score 0)
+    matched = bm25_scores > 0
+    if not matched.any():
+        logger.info("Using FAISS-only search (no BM25 matches)")
+        return faiss_ids, faiss_scores
+    if _hybrid_fusion_mode == FUSION_RRF:
+        # Ranks carry no score, so unmatched documents would otherwise earn RRF credit
+        return fuse_rrf(faiss_ids, bm25_ids[matched], _hybrid_rrf_k)
+    # Unmatched documents normalise to 0 here
+    return fuse_weighted(faiss_ids, faiss_scores, bm25_ids, bm25_scores, _hybrid_search_weight)
+
+
+def _apply_cutoff(ids: np.ndarray, scores: np.ndarray, k: int) -> Tuple[np.ndarray, Optional[CutoffDecision]]:
+    """
+    Leading ids to return: adaptive cutoff with k as the upper bound, or the
+    fixed top k when RAG_ADAPTIVE_K is off.
+    """
+    if not RAG_ADAPTIVE_K:
+        return ids[:k], None
+    decision = adaptive_cutoff(scores, replace(_cutoff_policy, max_k=k))
+    _cutoff_stats.record(decision)
+    return ids[:decision.keep], decision
+
+
+def get_cutoff_stats() -> Dict:
+    """Cumulative adaptive cutoff statistics (chunks kept per query, cutoff reasons)."""
+    return _cutoff_stats.stats()
+
+
+def _format_cutoff(decisions: Sequence[Optional[CutoffDecision]]) -> str:
+    """Log line for the cutoff decisions of one retrieval call ('' when none were made)."""
+    decisions = [decision for decision in decisions if decision is not None]
+    if not decisions:
+        return ""
+    parts = []
+    for decision in decisions:
+        part = f"{decision.keep}/{decision.candidates} ({decision.reason}, top {decision.top_score:.3f}"
+        if decision.cut_score is not None:
+            part += f", first cut {decision.cut_score:.3f}"
+        parts.append(part + ")")
+    totals = _cutoff_stats.stats()
+    return (
+        f"\n   • Cutoff: kept {', '.join(parts)} | "
+        f"mean kept {totals['mean_kept']:.2f} over {totals['queries']} queries"
+    )
+
+
+async def _embed_leg(query: str, timings: RetrievalTimings) -> np.ndarray:
+    """Embed the query (awaited, cached)."""
+    embed_start = time.perf_counter()
+    embedding = await embed_query_async(query)
+    timings.embedding = time.perf_counter() - embed_start
+    return embedding
+
+
+def _late_embedding_callback(label: str, start: float):
+    """Done-callback for an embedding that missed the deadline (its result is cached by the embedding call)."""
+    def done(task: "asyncio.Future"):
+        if task.cancelled():
+            return
+        exc = task.exception()
+        if exc is not None:
+            logger.warning(f"⚠️ Late query embedding failed for '{label[:50]}': {exc}")
+        else:
+            logger.info(f"🐢 Late query embedding cached after {(time.perf_counter() - start) * 1000:.0f}ms: '{label[:50]}'")
+    return done
+
+
+async def _embed_with_deadline(
+    embed: Awaitable,
+    label: str,
+    timings: RetrievalTimings,
+) -> Tuple[Optional[np.ndarray], "asyncio.Future"]:
+    """
+    Await an embedding coroutine for at most RAG_EMBED_DEADLINE_MS.
+    
+    Returns:
+        (embedding, task) - embedding is None when the deadline passed or the
+        request failed; the task keeps running and caches a late embedding
+    """
+    embed_start = time.perf_counter()
+    task = asyncio.ensure_future(embed)
+    try:
+        if RAG_EMBED_DEADLINE_MS <= 0:
+            return await asyncio.shield(task), task
+        # Shield: the deadline (or a cancelled caller) must not cancel the request
+        return await asyncio.wait_for(asyncio.shield(task), RAG_EMBED_DEADLINE_MS / 1000), task
+    except asyncio.TimeoutError:
+        task.add_done_callback(_late_embedding_callback(label, embed_start))
+        logger.warning(f"⏰ Query embedding missed the {RAG_EMBED_DEADLINE_MS:.0f}ms deadline - degrading to BM25")
+        return None, task
+    except Exception as exc:
+        logger.warning(f"⚠️ Query embedding failed ({exc}) - degrading to BM25")
+        return None, task
+    finally:
+        timings.embedding = time.perf_counter() - embed_start
+
+
+def _lookup_result_cache(
+    embedding: np.ndarray,
+    k: int,
+    scope: str,
+    assets: RagAssets,
+    timings: RetrievalTimings,
+) -> Optional[np.ndarray]:
+    """Chunk ids of a semantically equivalent past query on the same index build, or None."""
+    cache = get_result_cache()
+    if cache is None:
+        return None
+    lookup_start = time.perf_counter()
+    cache.ensure_fingerprint(assets.fingerprint, assets.name)
+    chunk_ids = cache.lookup(embedding, k, scope, assets.name, assets.fingerprint)
+    timings.result_cache = time.perf_counter() - lookup_start
+    return chunk_ids
+
+
+def _store_result_cache(
+    embedding: np.ndarray,
+    chunk_ids: np.ndarray,
+    scope: str,
+    assets: RagAssets,
+    timings: RetrievalTimings,
+):
+    cache = get_result_cache()
+    if cache is None or not len(chunk_ids):
+        return
+    store_start = time.perf_counter()
+    cache.store(embedding, chunk_ids, scope, assets.name, complete=RAG_ADAPTIVE_K, fingerprint=assets.fingerprint)
+    timings.result_cache += time.perf_counter() - store_start
+
+
+async def _semantic_leg(
+    query: str,
+    k: int,
+    timings: RetrievalTimings,
+    store: FaissVectorStore,
+    embedding: Optional[np.ndarray] = None,
+    id_filter: Optional[ResolvedFilter] = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Embed the query (awaited) unless given, then run the FAISS search on the
+    retrieval executor - restricted to the filter's ids inside FAISS when set.
+    """
+    if embedding is None:
+        embedding = await _embed_leg(query, timings)
+
+    search_start = time.perf_counter()
+    id_bitmap = id_filter.id_bitmap if id_filter is not None else None
+    scores, ids = await run_in_retrieval_executor(
+        store.search, np.asarray(embedding, dtype=np.float32), k, id_bitmap
+    )
+    timings.faiss = time.perf_counter() - search_start
+    found = ids[0] != -1
+    return ids[0][found], scores[0][found]
+
+
+async def _keyword_leg(
+    query: str,
+    k: int,
+    timings: RetrievalTimings,
+    bm25: Optional[SparseBM25Index],
+    id_filter: Optional[ResolvedFilter] = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Run BM25 tokenisation and scoring on the retrieval executor."""
+    bm25_start = time.perf_counter()
+    mask = id_filter.mask if id_filter is not None else None
+    results = await run_in_retrieval_executor(retrieve_from_bm25, query, bm25, k, mask)
+    timings.bm25 = time.perf_counter() - bm25_start
+    return results
+
+
+def _format_cache_stats() -> str:
+    stats = get_embedding_cache_stats()
+    return (
+        f"{stats['hits']} memory hits, {stats['persistent_hits']} disk hits, "
+        f"{stats['misses']} misses (hit rate {stats['hit_rate']:.0%})"
+    )
+
+
+def _format_result_cache_stats() -> str:
+    cache = get_result_cache()
+    if cache is None:
+        return "disabled"
+    stats = cache.stats()
+    return f"{stats['hits']} hits, {stats['misses']} misses (hit rate {stats['hit_rate']:.0%}, size {stats['size']})"
+
+
+def _format_registry_stats() -> str:
+    stats = get_index_registry().stats()
+    return (
+        f"{len(stats['loaded'])}/{stats['registered']} loaded ({stats['footprint_bytes'] / 1e6:.1f}MB), "
+        f"{stats['loads']} loads, {stats['evictions']} evictions"
+    )
+
+
+def _format_context(
+    query: str,
+    faiss_ids: Sequence[int],
+    texts: Sequence[str],
+    token_budget: Optional[int] = None,
+) -> Tuple[str, Optional[PackResult]]:
+    """
+    Join retrieved chunks into the context text, packed into the token budget
+    when RAG_CONTEXT_PACKING is on.
+    
+    Returns:
+        (context text, PackResult or None when packing is off / nothing was retrieved)
+    """
+    chunks = [texts[int(faiss_id)] for faiss_id in faiss_ids]
+    if not RAG_CONTEXT_PACKING or not chunks:
+        return "\n\n".join(chunks), None
+    packed = pack_context(
+        query,
+        chunks,
+        RAG_CONTEXT_TOKEN_BUDGET if token_budget is None else token_budget,
+        count_tokens=get_token_counter(RAG_CONTEXT_TOKEN_ENCODING),
+        duplicate_threshold=RAG_CONTEXT_DUPLICATE_THRESHOLD,
+    )
+    _context_packing_stats['calls'] += 1
+    _context_packing_stats['tokens_before'] += packed.tokens_before
+    _context_packing_stats['tokens_after'] += packed.tokens_after
+    _context_packing_stats['duplicates_dropped'] += packed.duplicates_dropped
+    _context_packing_stats['chunks_dropped'] += packed.chunks_dropped
+    return packed.text, packed
+
+
+def get_context_packing_stats() -> Dict:
+    """Cumulative context packing statistics for this process."""
+    stats = dict(_context_packing_stats)
+    stats['tokens_saved'] = stats['tokens_before'] - stats['tokens_after']
+    stats['saved_ratio'] = stats['tokens_saved'] / stats['tokens_before'] if stats['tokens_before'] else 0.0
+    return stats
+
+
+def _format_packing(packed: Sequence[Optional[PackResult]]) -> str:
+    """Log line for the packing of one retrieval call ('' when packing is off)."""
+    packed = [result for result in packed if result is not None]
+    if not packed:
+        return ""
+    before = sum(result.tokens_before for result in packed)
+    after = sum(result.tokens_after for result in packed)
+    saved = before - after
+    totals = get_context_packing_stats()
+    return (
+        f"\n   • Context: {before} → {after} tokens (saved {saved}, {saved / before if before else 0:.0%}); "
+        f"{sum(result.duplicates_dropped for result in packed)} near-duplicates dropped, "
+        f"{sum(result.chunks_trimmed for result in packed)} chunks trimmed, "
+        f"{sum(result.chunks_dropped for result in packed)} dropped over budget | "
+        f"session total saved {totals['tokens_saved']} ({totals['saved_ratio']:.0%})"
+    )
+
+
+def _log_timings(label: str, query: str, k: int, timings: RetrievalTimings, extra: str = ""):
+    """Log per-stage timings in the same format for every retrieval path."""
+    logger.info(
+        f"⚡ {label} Retrieval Performance Metrics:\n"
+        f"   • Query embedding (async): {timings.embedding:.3f}s\n"
+        f"   • Embedding cache: {_format_cache_stats()}\n"
+        f"   • FAISS search (executor): {timings.faiss:.3f}s\n"
+        f"   • BM25 search (executor): {timings.bm25:.3f}s\n"
+        f"   • Hybrid fusion: {timings.fusion:.3f}s\n"
+        f"   • Result cache: {timings.result_cache*1000:.2f}ms - {_format_result_cache_stats()}\n"
+        f"   • Result formatting: {timings.formatting:.3f}s\n"
+        f"   • Event loop busy: {timings.on_loop*1000:.2f}ms\n"
+        f"   • TOTAL RETRIEVAL TIME: {timings.total:.3f}s ({timings.total*1000:.1f}ms)\n"
+        f"   • Query: '{query[:50]}{'...' if len(query) > 50 else ''}' | k={k}"
+        + (f"\n{extra}" if extra else "")
+    )
+
+
+async def _keyword_only_result(
+    query: str,
+    k: int,
+    timings: RetrievalTimings,
+    assets: RagAssets,
+    keyword_task: "asyncio.Future",
+    total_start: float,
+) -> Optional[str]:
+    """
+    Degraded hybrid result from the BM25 leg alone, tagged with DEGRADED_RESULT_TAG.
+    Not stored in the result cache (there is no query embedding to key it by).
+    
+    Returns:
+        Tagged context text, or None when BM25 matched nothing
+    """
+    global _last_retrieval_timings, _degraded_retrievals
+    bm25_ids, bm25_scores = await keyword_task
+    matched = bm25_scores > 0
+    bm25_ids, bm25_scores = bm25_ids[matched], bm25_scores[matched]
+    if not len(bm25_ids):
+        return None
+    _degraded_retrievals += 1
+    bm25_ids, cutoff = _apply_cutoff(bm25_ids, bm25_scores, k)
+    format_start = time.perf_counter()
+    result_text, packed = _format_context(query, bm25_ids[:k], assets.store.texts)
+    timings.formatting = time.perf_counter() - format_start
+    timings.total = time.perf_counter() - total_start
+    timings.on_loop = timings.formatting
+    _last_retrieval_timings = timings
+    _log_timings(
+        "Degraded (BM25-only)", query, k, timings,
+        extra=(
+            f"   • Index: {assets.name} | degraded retrievals: {_degraded_retrievals}\n"
+            f"   • Embedding hedging: {get_embedding_hedger().stats()}"
+            + _format_cutoff([cutoff])
+            + _format_packing([packed])
+        ),
+    )
+    return f"{DEGRADED_RESULT_TAG}\n\n{result_text}"
+
+
+async def hybrid_retrieve(
+    query: str,
+    k: int = 4,
+    filters: Optional[Dict[str, object]] = None,
+    index_name: Optional[str] = None,
+) -> str:
     """
     Hybrid retrieval combining FAISS (semantic) and BM25 (keyword) search.
     
+    The semantic leg (async embedding + FAISS search) and the keyword leg
+    (BM25) run concurrently; blocking work is done on the retrieval executor.
+    Results are fused on FAISS-id arrays according to HYBRID_FUSION_MODE
+    (weighted, rrf, or faiss_candidates - BM25 over the FAISS hits only).
+    If the query embedding is close enough to a cached past query, that
+    query's fused result is reused and FAISS, BM25 and fusion are skipped.
+    
     Args:
         query: Search query
         k: Number of results to return
+        filters: Optional structured filters (plan, section, type,
+            has_contact_info, content_format) applied inside FAISS and BM25
+        index_name: Registered index to search (None = default index)
     
     Returns:
         Retrieved documents as formatted text
     """
-    import time
-    total_start = time.time()
+    global _last_retrieval_timings
+    timings = RetrievalTimings()
+    total_start = time.perf_counter()
     
     try:
-        # Get FAISS results (semantic search)
-        faiss_start = time.time()
-        db = get_faiss_db()
-        faiss_results = db.similarity_search_with_score(query, k=k*2)  # Get more for reranking
-        faiss_time = time.time() - faiss_start
+        # First use of an index in a process loads it off-loop; cached afterwards
+        assets = await get_index_assets(index_name)
         
-        # Get documents for BM25
-        if _cached_documents is None:
-            logger.warning("Documents not cached - cannot perform BM25 search")
+        if assets.bm25 is None:
+            logger.warning("BM25 index not loaded - cannot perform BM25 search")
             # Fallback to FAISS only
-            results = [doc for doc, score in faiss_results[:k]]
-            result_text = "\n\n".join([doc.page_content for doc in results])
-            return result_text
+            return await retrieve_from_faiss(query, k, filters, index_name)
         
-        # Get BM25 results (keyword search)
-        bm25_start = time.time()
-        bm25_results = retrieve_from_bm25(query, _cached_documents, k=k*2)
-        bm25_time = time.time() - bm25_start
+        id_filter = resolve_filters(filters, assets.bitmaps)
+        scope = f"hybrid:{_hybrid_fusion_mode}"
+        if id_filter is not None:
+            scope += f"|{id_filter.key}"
+        keyword_task = None
+        if _hybrid_fusion_mode != FUSION_FAISS_CANDIDATES:
+            # Start BM25 right away so it overlaps the embedding call (get more for reranking)
+            keyword_task = asyncio.ensure_future(_keyword_leg(query, k * 2, timings, assets.bm25, id_filter))
+        embedding, embed_task = await _embed_with_deadline(embed_query_async(query), query, timings)
+        if embedding is None:
+            # Embedding too slow or failing: answer from the keyword leg rather than keep the caller waiting
+            if keyword_task is None:
+                keyword_task = asyncio.ensure_future(_keyword_leg(query, k * 2, timings, assets.bm25, id_filter))
+            degraded = await _keyword_only_result(query, k, timings, assets, keyword_task, total_start)
+            if degraded is not None:
+                return degraded
+            # No keyword match (e.g. a Hindi-script query): the semantic leg is the only option
+            embedding = await embed_task
         
-        if not bm25_results or not _use_hybrid_search:
-            # Fallback to FAISS only
-            logger.info("Using FAISS-only search (BM25 not available or disabled)")
-            results = [doc for doc, score in faiss_results[:k]]
-            result_text = "\n\n".join([doc.page_content for doc in results])
-            return result_text
-        
-        # Combine results using hybrid scoring
-        # Normalize scores to 0-1 range for both methods
-        doc_scores = {}
-        
-        # Process FAISS results (lower score = better similarity in FAISS)
-        if faiss_results:
-            max_faiss_score = max(score for _, score in faiss_results) if faiss_results else 1.0
-            min_faiss_score = min(score for _, score in faiss_results) if faiss_results else 0.0
-            faiss_range = max_faiss_score - min_faiss_score if max_faiss_score != min_faiss_score else 1.0
-            
-            for doc, score in faiss_results:
-                # Normalize: convert distance to similarity (lower distance = higher similarity)
-                normalized_score = 1.0 - ((score - min_faiss_score) / faiss_range) if faiss_range > 0 else 0.5
-                doc_id = id(doc)  # Use document id as key
-                if doc_id not in doc_scores:
-                    doc_scores[doc_id] = {'doc': doc, 'faiss': 0.0, 'bm25': 0.0}
-                doc_scores[doc_id]['faiss'] = normalized_score
-        
-        # Process BM25 results
-        if bm25_results:
-            max_bm25_score = max(score for _, score in bm25_results) if bm25_results else 1.0
-            min_bm25_score = min(score for _, score in bm25_results) if bm25_results else 0.0
-            bm25_range = max_bm25_score - min_bm25_score if max_bm25_score != min_bm25_score else 1.0
+        # A semantically equivalent past query skips FAISS, BM25 and fusion
+        hybrid_ids = _lookup_result_cache(embedding, k, scope, assets, timings)
+        if hybrid_ids is not None:
+            if keyword_task is not None:
+                keyword_task.cancel()
+            faiss_ids = bm25_ids = _EMPTY_HITS[0]
+            cutoff = None
+        else:
+            faiss_ids, faiss_scores = await _semantic_leg(query, k * 2, timings, assets.store, embedding, id_filter)
+            # None = faiss_candidates mode: BM25 scores only the FAISS candidates, inside the fusion step
+            bm25_hits = await keyword_task if keyword_task is not None else None
+            bm25_ids = bm25_hits[0][bm25_hits[1] > 0] if bm25_hits is not None else faiss_ids
             
-            for doc, score in bm25_results:
-                # Normalize BM25 score
-                normalized_score = (score - min_bm25_score) / bm25_range if bm25_range > 0 else 0.5
-                doc_id = id(doc)
-                if doc_id not in doc_scores:
-                    doc_scores[doc_id] = {'doc': doc, 'faiss': 0.0, 'bm25': 0.0}
-                doc_scores[doc_id]['bm25'] = normalized_score
-        
-        # Calculate hybrid scores
-        hybrid_results = []
-        for doc_id, scores in doc_scores.items():
-            # Weighted combination: (1-weight)*faiss + weight*bm25
-            hybrid_score = (1 - _hybrid_search_weight) * scores['faiss'] + _hybrid_search_weight * scores['bm25']
-            hybrid_results.append((scores['doc'], hybrid_score))
+            # Same fusion as batch_retrieve, including the FAISS-only fallback
+            fusion_start = time.perf_counter()
+            hybrid_ids, hybrid_scores = _fuse_hits(query, assets.bm25, faiss_ids, faiss_scores, bm25_hits)
+            hybrid_ids, cutoff = _apply_cutoff(hybrid_ids, hybrid_scores, k)
+            timings.fusion = time.perf_counter() - fusion_start
+            _store_result_cache(embedding, hybrid_ids, scope, assets, timings)
         
-        # Sort by hybrid score and get top k
-        hybrid_results.sort(key=lambda x: x[1], reverse=True)
-        top_results = [doc for doc, score in hybrid_results[:k]]
+        # Format top k results
+        format_start = time.perf_counter()
+        result_text, packed = _format_context(query, hybrid_ids[:k], assets.store.texts)
+        timings.formatting = time.perf_counter() - format_start
         
-        # Format results
-        result_text = "\n\n".join([doc.page_content for doc in top_results])
-        
-        total_time = time.time() - total_start
+        timings.total = time.perf_counter() - total_start
+        timings.on_loop = timings.fusion + timings.formatting + timings.result_cache
+        _last_retrieval_timings = timings
         
         # Log performance metrics
-        logger.info(
-            f"⚡ Hybrid Retrieval Performance Metrics:\n"
-            f"   • FAISS search: {faiss_time:.3f}s\n"
-            f"   • BM25 search: {bm25_time:.3f}s\n"
-            f"   • Hybrid combination: {total_time - faiss_time - bm25_time:.3f}s\n"
-            f"   • TOTAL RETRIEVAL TIME: {total_time:.3f}s ({total_time*1000:.1f}ms)\n"
-            f"   • Query: '{query[:50]}{'...' if len(query) > 50 else ''}' | k={k}\n"
-            f"   • Hybrid weight: {_hybrid_search_weight} (FAISS: {1-_hybrid_search_weight:.2f}, BM25: {_hybrid_search_weight:.2f})\n"
-            f"   • FAISS results: {len(faiss_results)}, BM25 results: {len(bm25_results)}, Combined: {len(hybrid_results)}"
+        _log_timings(
+            "Hybrid", query, k, timings,
+            extra=(
+                f"   • Index: {assets.name}\n"
+                f"   • Fusion mode: {_hybrid_fusion_mode}"
+                + (f" (k={_hybrid_rrf_k})" if _hybrid_fusion_mode == FUSION_RRF else
+                   f" (weight {_hybrid_search_weight}: FAISS {1-_hybrid_search_weight:.2f}, BM25 {_hybrid_search_weight:.2f})")
+                + f"\n   • FAISS results: {len(faiss_ids)}, BM25 results: {len(bm25_ids)}, Combined: {len(hybrid_ids)}"
+                + (f"\n   • Filters: {id_filter.key} ({id_filter.matches} chunks)" if id_filter is not None else "")
+                + _format_cutoff([cutoff])
+                + _format_packing([packed])
+            ),
         )
         
         return result_text
     except Exception as exc:
-        total_time = time.time() - total_start
+        total_time = time.perf_counter() - total_start
         logger.error(f"Hybrid retrieval failed after {total_time:.3f}s: {exc}")
         # Fallback to FAISS only
-        return retrieve_from_faiss(query, k)
+        return await retrieve_from_faiss(query, k, filters, index_name)
 
 
-def retrieve_from_faiss(query: str, k: int = 4) -> str:
+async def retrieve_from_faiss(
+    query: str,
+    k: int = 4,
+    filters: Optional[Dict[str, object]] = None,
+    index_name: Optional[str] = None,
+) -> str:
     """
     Retrieve documents from FAISS index using similarity search.
     
     Args:
         query: Search query
         k: Number of results to return (default: 4)
+        filters: Optional structured filters applied inside the FAISS search
+        index_name: Registered index to search (None = default index)
     
     Returns:
         Retrieved documents as formatted text
     """
-    import time
-    total_start = time.time()
+    global _last_retrieval_timings
+    timings = RetrievalTimings()
+    total_start = time.perf_counter()
     try:
-        # Get cached FAISS database (no reload needed after first load)
-        load_start = time.time()
-        db = get_faiss_db()
-        load_time = time.time() - load_start
-        
-        # Determine if this was from cache or disk
-        load_source = "MEMORY (cached)" if _cached_faiss_db is not None and _faiss_load_count == 1 else "DISK"
-        if load_time < 0.001:  # Very fast = likely from cache
-            load_source = "MEMORY (cached)"
+        # Get cached index assets (loaded off-loop on first use)
+        assets = await get_index_assets(index_name)
         
-        # Time: Similarity search
-        search_start = time.time()
-        results = db.similarity_search(query, k=k)
-        search_time = time.time() - search_start
+        id_filter = resolve_filters(filters, assets.bitmaps)
+        scope = "faiss" if id_filter is None else f"faiss|{id_filter.key}"
+        embedding = await _embed_leg(query, timings)
+        faiss_ids = _lookup_result_cache(embedding, k, scope, assets, timings)
+        cutoff = None
+        if faiss_ids is None:
+            faiss_ids, faiss_scores = await _semantic_leg(query, k, timings, assets.store, embedding, id_filter)
+            faiss_ids, cutoff = _apply_cutoff(faiss_ids, faiss_scores, k)
+            _store_result_cache(embedding, faiss_ids, scope, assets, timings)
         
         # Time: Format results
-        format_start = time.time()
-        result_text = "\n\n".join([doc.page_content for doc in results])
-        format_time = time.time() - format_start
+        format_start = time.perf_counter()
+        result_text, packed = _format_context(query, faiss_ids, assets.store.texts)
+        timings.formatting = time.perf_counter() - format_start
         
-        total_time = time.time() - total_start
+        timings.total = time.perf_counter() - total_start
+        timings.on_loop = timings.formatting + timings.result_cache
+        _last_retrieval_timings = timings
         
-        # Log performance metrics with load source
-        logger.info(
-            f"⚡ FAISS Retrieval Performance Metrics:\n"
-            f"   • Index load ({load_source}): {load_time:.3f}s\n"
-            f"   • Similarity search: {search_time:.3f}s\n"
-            f"   • Result formatting: {format_time:.3f}s\n"
-            f"   • TOTAL RETRIEVAL TIME: {total_time:.3f}s ({total_time*1000:.1f}ms)\n"
-            f"   • Query: '{query[:50]}{'...' if len(query) > 50 else ''}' | k={k}\n"
-            f"   • Cache status: Load count={_faiss_load_count}, "
-            f"Cached={'Yes' if _cached_faiss_db is not None else 'No'}"
+        # Log performance metrics with cache status
+        _log_timings(
+            "FAISS", query, k, timings,
+            extra=(
+                f"   • Index: {assets.name} | Registry: {_format_registry_stats()}"
+                + _format_cutoff([cutoff])
+                + _format_packing([packed])
+            ),
         )
         
         return result_text
     except Exception as exc:
-        total_time = time.time() - total_start
+        total_time = time.perf_counter() - total_start
         logger.error(
             f"FAISS retrieval failed after {total_time:.3f}s: {exc}"
         )
         return f"Error retrieving documents: {exc}"
 
 
+async def batch_retrieve(
+    queries: Sequence[str],
+    k: int = 4,
+    filters: Optional[Dict[str, object]] = None,
+    index_name: Optional[str] = None,
+) -> List[str]:
+    """
+    Retrieve context for several sub-queries of one compound question.
+    
+    All cache-missing queries are embedded in one OpenAI request; FAISS runs
+    one matrix search and BM25 one vectorised pass over every query that is
+    not served by the result cache. A chunk is returned only once, under the
+    first sub-query that retrieves it.
+    
+    Args:
+        queries: Sub-queries (blank ones are skipped)
+        k: Number of results per sub-query
+        filters: Optional structured filters applied to every sub-query
+        index_name: Registered index to search (None = default index)
+    
+    Returns:
+        Context text per query, aligned with `queries` (empty when nothing new
+        was found, and for repeats of an earlier query)
+    """
+    global _last_retrieval_timings, _degraded_retrievals
+    timings = RetrievalTimings()
+    total_start = time.perf_counter()
+    
+    assets = await get_index_assets(index_name)
+    stripped = [query.strip() for query in queries]
+    unique = list(dict.fromkeys(query for query in stripped if query))
+    if not unique:
+        return ["" for _ in queries]
+    
+    id_filter = resolve_filters(filters, assets.bitmaps)
+    hybrid = _use_hybrid_search and assets.bm25 is not None
+    scope = f"hybrid:{_hybrid_fusion_mode}" if hybrid else "faiss"
+    if id_filter is not None:
+        scope += f"|{id_filter.key}"
+    mask = id_filter.mask if id_filter is not None else None
+    
+    # BM25 for every query overlaps the embedding request, as in hybrid_retrieve
+    keyword_task = None
+    if hybrid and _hybrid_fusion_mode != FUSION_FAISS_CANDIDATES:
+        keyword_task = asyncio.ensure_future(
+            run_in_retrieval_executor(retrieve_from_bm25_batch, unique, assets.bm25, k * 2, mask)
+        )
+    fused: Dict[str, np.ndarray] = {}
+    cutoffs: Dict[str, Optional[CutoffDecision]] = {}
+    degraded = False
+    if hybrid:
+        embeddings, embed_task = await _embed_with_deadline(embed_queries_async(unique), " | ".join(unique), timings)
+        if embeddings is None:
+            # Same BM25-only degradation as hybrid_retrieve
+            if keyword_task is None:
+                keyword_task = asyncio.ensure_future(
+                    run_in_retrieval_executor(retrieve_from_bm25_batch, unique, assets.bm25, k * 2, mask)
+                )
+            keyword_hits = [(ids[scores > 0], scores[scores > 0]) for ids, scores in await keyword_task]
+            if any(len(ids) for ids, _ in keyword_hits):
+                degraded = True
+                for query, (ids, scores) in zip(unique, keyword_hits):
+                    fused[query], cutoffs[query] = _apply_cutoff(ids, scores, k)
+            else:
+                embeddings = await embed_task
+    else:
+        embed_start = time.perf_counter()
+        embeddings = await embed_queries_async(unique)
+        timings.embedding = time.perf_counter() - embed_start
+    
+    if not degraded:
+        for query, embedding in zip(unique, embeddings):
+            cached_ids = _lookup_result_cache(embedding, k, scope, assets, timings)
+            if cached_ids is not None:
+                fused[query] = cached_ids
+    pending = [i for i, query in enumerate(unique) if query not in fused]
+    
+    if pending:
+        search_start = time.perf_counter()
+        id_bitmap = id_filter.id_bitmap if id_filter is not None else None
+        all_scores, all_ids = await run_in_retrieval_executor(
+            assets.store.search, embeddings[pending], k * 2 if hybrid else k, id_bitmap
+        )
+        timings.faiss = time.perf_counter() - search_start
+        bm25_start = time.perf_counter()
+        bm25_hits = await keyword_task if keyword_task is not None else None
+        timings.bm25 = time.perf_counter() - bm25_start
+        
+        fusion_start = time.perf_counter()
+        for row, i in enumerate(pending):
+            found = all_ids[row] != -1
+            faiss_ids, faiss_scores = all_ids[row][found], all_scores[row][found]
+            if hybrid:
+                ids, scores = _fuse_hits(
+                    unique[i], assets.bm25, faiss_ids, faiss_scores, bm25_hits[i] if bm25_hits else None
+                )
+            else:
+                ids, scores = faiss_ids, faiss_scores
+            fused[unique[i]], cutoffs[unique[i]] = _apply_cutoff(ids, scores, k)
+            _store_result_cache(embeddings[i], fused[unique[i]], scope, assets, timings)
+        timings.fusion = time.perf_counter() - fusion_start
+    elif keyword_task is not None:
+        keyword_task.cancel()
+    
+    # Format: each chunk once, under the first sub-query that retrieved it;
+    # the token budget is shared between the sub-queries
+    format_start = time.perf_counter()
+    texts = assets.store.texts
+    token_budget = max(RAG_CONTEXT_TOKEN_BUDGET // len(unique), RAG_CONTEXT_MIN_TOKENS) if RAG_CONTEXT_TOKEN_BUDGET > 0 else 0
+    seen = set()
+    contexts = {}
+    packed = []
+    for query in unique:
+        fresh = [int(faiss_id) for faiss_id in fused[query][:k] if int(faiss_id) not in seen]
+        seen.update(fresh)
+        contexts[query], query_packed = _format_context(query, fresh, texts, token_budget)
+        packed.append(query_packed)
+        if degraded and contexts[query]:
+            contexts[query] = f"{DEGRADED_RESULT_TAG}\n\n{contexts[query]}"
+    timings.formatting = time.perf_counter() - format_start
+    
+    timings.total = time.perf_counter() - total_start
+    timings.on_loop = timings.fusion + timings.formatting + timings.result_cache
+    _last_retrieval_timings = timings
+    if degraded:
+        _degraded_retrievals += 1
+    _log_timings(
+        "Batch (degraded: BM25-only)" if degraded else "Batch", " | ".join(unique), k, timings,
+        extra=(
+            f"   • Index: {assets.name}\n"
+            f"   • Sub-queries: {len(unique)} "
+            + ("(BM25 only), " if degraded else f"({len(unique) - len(pending)} from result cache), ")
+            + f"distinct chunks: {len(seen)}"
+            + _format_cutoff(list(cutoffs.values()))
+            + _format_packing(packed)
+        ),
+    )
+    # A repeated query's chunks were already returned under its first occurrence
+    return [contexts.pop(query, "") for query in stripped]
+
+
 # ---------------------------------------------------------------------------
 # Tool Implementations
 # ---------------------------------------------------------------------------
 
 
-@function_tool(
-    name="RAG_RETRIEVER",
-    description=(
-        "**⚠️ RAG-FIRST POLICY FOR ALL HDFC ERGO INFORMATION**\n\n"
-        "**ALWAYS call this tool for:**\n"
-        "- **Contact Information:** Office addresses, branch locations, customer service addresses, regional office addresses, headquarters address\n"
-        "- **Contact Details:** Phone numbers, email addresses, customer care numbers, helpline numbers, support contact information\n"
-        "- **Office Locations:** Branch addresses, service center locations, claim settlement office addresses, regional offices\n"
-        "- Specific policy terms: Waiting periods (pre-existing diseases, specified diseases, 30-day waiting period), exact coverage limits, room rent limits, ICU limits\n"
-        "- Coverage details: Secure Benefit, Plus Benefit, Protect Benefit, Automatic Restore Benefit, Cumulative Bonus, Aggregate Deductible, AYUSH Treatment, Organ Donor Expenses\n"
-        "- Claim procedures: Cashless claim process, reimbursement claim process, documentation required, time limits for claim submission, pre-authorization requirements\n"
-        "- Network hospitals: Cashless network hospital information, network provider details\n"
-        "- Exclusions: Standard exclusions (Section C.2), specific exclusions (Section C.3), waiting period exclusions (Section C.1)\n"
-        "- Optional covers: Global Health Cover (Emergency & Planned), Overseas Travel Secure, E-Opinion for Critical Illness, Preventive Health Check-up\n"
-        "- Policy definitions: Hospital, Day Care Centre, AYUSH Hospital, Medical Practitioner, Pre-Existing Disease, Sum Insured, Policy Year, etc.\n"
-        "- Policy terms & conditions: Renewal terms, portability, migration, grace period, free look period, moratorium period, fraud provisions\n"
-        "- Geography coverage: India coverage, global coverage details, overseas treatment conditions\n"
-        "- **ANY factual information about HDFC ERGO that requires verification from the knowledge base**\n"
-        "- **ALL technical policy queries requiring exact HDFC ERGO my:Optima Secure policy wording**\n\n"
-        "**DON'T call this tool for:**\n"
-        "- Simple greetings, acknowledgments: \"Okay\", \"Haan\", \"Boliye\", \"Yes go ahead\"\n"
-        "- Initial greeting and discovery questions\n"
-        "- General benefits explanation during sales pitch (use training knowledge from agent_instruction.txt)\n"
-        "- Common objections handling (respond naturally first using training knowledge)\n"
-        "- Market insights (medical inflation, coverage gaps)\n"
-        "- When asking discovery questions\n"
-        "- Closing attempts\n\n"
-        "**CRITICAL RULE: If the question asks for ANY specific factual information about HDFC ERGO (addresses, contact info, policy details, procedures, requirements), you MUST call this tool. Do NOT rely on training data.**\n\n"
-        "**Query Format Examples:**\n"
-        "- Address: \"HDFC ERGO office address headquarters contact information\"\n"
-        "- Contact: \"HDFC ERGO customer service phone number email address\"\n"
-        "- Office Location: \"HDFC ERGO branch address service center location\"\n"
-        "- Waiting period: \"HDFC ERGO my:Optima Secure pre-existing disease waiting period Section C.1\"\n"
-        "- Coverage: \"HDFC ERGO my:Optima Secure Secure Benefit Plus Benefit coverage details\"\n"
-        "- Claims: \"HDFC ERGO my:Optima Secure claim procedure documentation required\"\n"
-        "- Exclusions: \"HDFC ERGO my:Optima Secure standard exclusions Section C.2\"\n"
-        "- Optional covers: \"HDFC ERGO my:Optima Secure Global Health Cover overseas treatment\"\n"
-        "- Network: \"HDFC ERGO cashless network hospital list\"\n"
-        "- Protect Benefit: \"HDFC ERGO my:Optima Secure Protect Benefit non-medical expenses covered\"\n\n"
-        "**Response Protocol:**\n"
-        "(1) Detect ANY question requiring factual HDFC ERGO information → (2) Call RAG_RETRIEVER with clear query → (3) Synthesize retrieved information naturally → "
-        "(4) Paraphrase in conversational language (NEVER copy-paste verbatim) → (5) If RAG returns no results, admit limitation and offer escalation"
-    ),
+RAG_RETRIEVER_DESCRIPTION = (
+    "**⚠️ RAG-FIRST POLICY FOR ALL HDFC ERGO INFORMATION**\n\n"
+    "**ALWAYS call this tool for:**\n"
+    "- **Contact Information:** Office addresses, branch locations, customer service addresses, regional office addresses, headquarters address\n"
+    "- **Contact Details:** Phone numbers, email addresses, customer care numbers, helpline numbers, support contact information\n"
+    "- **Office Locations:** Branch addresses, service center locations, claim settlement office addresses, regional offices\n"
+    "- Specific policy terms: Waiting periods (pre-existing diseases, specified diseases, 30-day waiting period), exact coverage limits, room rent limits, ICU limits\n"
+    "- Coverage details: Secure Benefit, Plus Benefit, Protect Benefit, Automatic Restore Benefit, Cumulative Bonus, Aggregate Deductible, AYUSH Treatment, Organ Donor Expenses\n"
+    "- Claim procedures: Cashless claim process, reimbursement claim process, documentation required, time limits for claim submission, pre-authorization requirements\n"
+    "- Network hospitals: Cashless network hospital information, network provider details\n"
+    "- Exclusions: Standard exclusions (Section C.2), specific exclusions (Section C.3), waiting period exclusions (Section C.1)\n"
+    "- Optional covers: Global Health Cover (Emergency & Planned), Overseas Travel Secure, E-Opinion for Critical Illness, Preventive Health Check-up\n"
+    "- Policy definitions: Hospital, Day Care Centre, AYUSH Hospital, Medical Practitioner, Pre-Existing Disease, Sum Insured, Policy Year, etc.\n"
+    "- Policy terms & conditions: Renewal terms, portability, migration, grace period, free look period, moratorium period, fraud provisions\n"
+    "- Geography coverage: India coverage, global coverage details, overseas treatment conditions\n"
+    "- **ANY factual information about HDFC ERGO that requires verification from the knowledge base**\n"
+    "- **ALL technical policy queries requiring exact HDFC ERGO my:Optima Secure policy wording**\n\n"
+    "**DON'T call this tool for:**\n"
+    "- Simple greetings, acknowledgments: \"Okay\", \"Haan\", \"Boliye\", \"Yes go ahead\"\n"
+    "- Initial greeting and discovery questions\n"
+    "- General benefits explanation during sales pitch (use training knowledge from agent_instruction.txt)\n"
+    "- Common objections handling (respond naturally first using training knowledge)\n"
+    "- Market insights (medical inflation, coverage gaps)\n"
+    "- When asking discovery questions\n"
+    "- Closing attempts\n\n"
+    "**CRITICAL RULE: If the question asks for ANY specific factual information about HDFC ERGO (addresses, contact info, policy details, procedures, requirements), you MUST call this tool. Do NOT rely on training data.**\n\n"
+    "**Query Format Examples:**\n"
+    + "".join(f"- {label}: \"{example}\"\n" for label, example in QUERY_FORMAT_EXAMPLES)
+    + "\n"
+    + "**Optional Filters** (only when the question clearly targets one area; leave unset otherwise):\n"
+    "- section: policy section prefix, e.g. \"C.1\" (waiting periods), \"C.2\" (standard exclusions), \"B.1\"\n"
+    "- chunk_type: e.g. \"waiting_period\", \"base_coverage\", \"optional_coverage\", \"definitions\"\n"
+    "- has_contact_info: true for addresses, phone numbers and emails\n"
+    "- content_format: \"markdown_table\" for plan comparisons and contact lists, \"text\" otherwise\n"
+    "- plan: plan name, for indexes covering several products\n\n"
+    "**Compound questions:** when the user asks several things in one turn, make ONE RAG_RETRIEVER_BATCH call "
+    "with one query per sub-question instead of several RAG_RETRIEVER calls.\n\n"
+    "**Response Protocol:**\n"
+    "(1) Detect ANY question requiring factual HDFC ERGO information → (2) Call RAG_RETRIEVER with clear query → (3) Synthesize retrieved information naturally → "
+    "(4) Paraphrase in conversational language (NEVER copy-paste verbatim) → (5) If RAG returns no results, admit limitation and offer escalation"
 )
-async def rag_retriever_tool(query: str) -> str:
+
+
+RAG_RETRIEVER_BATCH_DESCRIPTION = (
+    "Retrieve HDFC ERGO knowledge base information for SEVERAL questions at once.\n\n"
+    "**Use this instead of multiple RAG_RETRIEVER calls** when the user asks a compound question, e.g. "
+    "\"What's the PED waiting period, is obesity surgery covered and what's the room rent limit?\" -> "
+    "queries: [\"pre-existing disease waiting period\", \"bariatric obesity surgery coverage\", \"room rent limit\"].\n"
+    "- One short, specific query per sub-question (same query style as RAG_RETRIEVER)\n"
+    f"- At most {RAG_BATCH_MAX_QUERIES} queries per call\n"
+    "- For a single question, use RAG_RETRIEVER\n\n"
+    "Results come back grouped per query; answer every sub-question in one natural spoken response."
+)
+
+
+async def retrieve_context(
+    query: str,
+    k: int = 4,
+    filters: Optional[Dict[str, object]] = None,
+    index_name: Optional[str] = None,
+) -> str:
+    """Context text for a query: hybrid retrieval if enabled, otherwise FAISS only."""
+    if _use_hybrid_search:
+        return await hybrid_retrieve(query, k=k, filters=filters, index_name=index_name)
+    return await retrieve_from_faiss(query, k=k, filters=filters, index_name=index_name)
+
+
+def build_prefetcher(session, index_name: Optional[str] = None) -> SpeculativePrefetcher:
+    """Speculative prefetcher for one session's transcripts, retrieving from one registered index."""
+    async def retrieve(transcript: str) -> str:
+        return await retrieve_context(transcript, k=RAG_TOP_K, index_name=index_name)
+
+    return SpeculativePrefetcher(
+        retrieve,
+        debounce=RAG_PREFETCH_DEBOUNCE_MS / 1000,
+        min_words=RAG_PREFETCH_MIN_WORDS,
+        min_overlap=RAG_PREFETCH_MIN_OVERLAP,
+        ttl=RAG_PREFETCH_TTL,
+    ).attach(session)
+
+
+async def run_rag_retriever(
+    query: str,
+    section: Optional[str] = None,
+    chunk_type: Optional[str] = None,
+    has_contact_info: Optional[bool] = None,
+    content_format: Optional[str] = None,
+    plan: Optional[str] = None,
+    index_name: Optional[str] = None,
+    prefetcher: Optional[SpeculativePrefetcher] = None,
+) -> str:
     """
     Retrieve information from FAISS knowledge base.
     
     Args:
         query: Search query
+        section: Optional policy section prefix filter (e.g. "C.1")
+        chunk_type: Optional chunk type filter (metadata "type")
+        has_contact_info: Optional filter for chunks with contact details
+        content_format: Optional format filter ("text" or "markdown_table")
+        plan: Optional plan name filter
+        index_name: Registered index to search (None = default index)
+        prefetcher: Session prefetcher; unfiltered queries overlapping a recent
+            transcript are answered from its speculative retrieval
     
     Returns:
         Retrieved context with instructions for the agent
     """
-    import time
     tool_start = time.time()
     
     try:
         if not query or not query.strip():
             return "Please provide a search query to retrieve information."
         
-        logger.info(f"🔍 RAG Query: {query.strip()}")
+        filters = {
+            'section': section,
+            'type': chunk_type,
+            'has_contact_info': has_contact_info,
+            'content_format': content_format,
+            'plan': plan,
+        }
+        logger.info(
+            f"🔍 RAG Query: {query.strip()}"
+            + (f" | index={index_name}" if index_name is not None else "")
+            + "".join(f" | {field}={value}" for field, value in filters.items() if value is not None)
+        )
 
-        # Use hybrid search if enabled, otherwise use FAISS only
-        if _use_hybrid_search and BM25_AVAILABLE:
-            context = hybrid_retrieve(query.strip(), k=4)
-        else:
-            context = retrieve_from_faiss(query.strip(), k=4)
+        context = None
+        if prefetcher is not None and all(value is None for value in filters.values()):
+            # Usually already retrieved (or in flight) from the user's own words
+            context = await prefetcher.lookup(query.strip())
+        if context is None:
+            # Use hybrid search if enabled, otherwise use FAISS only
+            context = await retrieve_context(query.strip(), k=RAG_TOP_K, filters=filters, index_name=index_name)
         if not context or not context.strip():
             tool_time = time.time() - tool_start
             logger.info(f"⏱️ RAG Time: {tool_time:.3f}s ({tool_time*1000:.1f}ms)")
@@ -596,6 +1535,131 @@ async def rag_retriever_tool(query: str) -> str:
         )
 
 
+async def run_rag_batch_retriever(queries: List[str], index_name: Optional[str] = None) -> str:
+    """
+    Retrieve information for several sub-queries in one round trip.
+    
+    Args:
+        queries: Sub-queries of a compound question
+        index_name: Registered index to search (None = default index)
+    
+    Returns:
+        Retrieved context per sub-query with instructions for the agent
+    """
+    tool_start = time.time()
+    
+    try:
+        queries = list(dict.fromkeys(query.strip() for query in queries or [] if query and query.strip()))
+        if not queries:
+            return "Please provide at least one search query to retrieve information."
+        if len(queries) > RAG_BATCH_MAX_QUERIES:
+            logger.warning(f"⚠️ {len(queries)} batch queries - only the first {RAG_BATCH_MAX_QUERIES} are searched")
+            queries = queries[:RAG_BATCH_MAX_QUERIES]
+        logger.info(
+            f"🔍 RAG Batch Query ({len(queries)}): " + " | ".join(queries)
+            + (f" | index={index_name}" if index_name is not None else "")
+        )
+        
+        contexts = await batch_retrieve(queries, k=RAG_TOP_K, index_name=index_name)
+        sections = []
+        for i, (query, context) in enumerate(zip(queries, contexts), 1):
+            if context.strip():
+                sections.append(f"### {i}. {query}\n\n{context}")
+            else:
+                sections.append(f"### {i}. {query}\n\n(No additional information beyond the results above.)")
+        
+        tool_time = time.time() - tool_start
+        logger.info(f"⏱️ RAG Batch Time: {tool_time:.3f}s ({tool_time*1000:.1f}ms)")
+        if not any(context.strip() for context in contexts):
+            return (
+                f"I couldn't find relevant information in the knowledge base for these questions. "
+                "[INSTRUCTION: You MUST now immediately respond to the user explaining you couldn't find "
+                "the information. Do not wait. Respond now in the detected language.]"
+            )
+        return (
+            "Here's what I found in the knowledge base, per question:\n\n" + "\n\n".join(sections) + "\n\n"
+            "[INSTRUCTION: You MUST now immediately synthesize this information and answer every "
+            "question in one natural spoken response. Do not wait. Respond now in the detected language.]"
+        )
+    except Exception as exc:
+        tool_time = time.time() - tool_start
+        logger.error(
+            f"⏱️ RAG Batch Time (error): {tool_time:.3f}s - Error: {exc}", exc_info=True
+        )
+        return (
+            f"Error retrieving information: {exc} "
+            f"[INSTRUCTION: You MUST now immediately respond to the user explaining there was an error. "
+            f"Do not wait. Respond now in the detected language.]"
+        )
+
+
+def build_rag_retriever_tool(
+    index_name: Optional[str] = None,
+    prefetcher: Optional[SpeculativePrefetcher] = None,
+):
+    """
+    Build the RAG_RETRIEVER tool bound to one registered index, so each job
+    searches the corpus its metadata routed it to.
+    
+    Args:
+        index_name: Registered index to search (None = default index)
+        prefetcher: Session prefetcher consulted before retrieving
+    
+    Returns:
+        LiveKit function tool
+    """
+    async def rag_retriever(
+        query: str,
+        section: Optional[str] = None,
+        chunk_type: Optional[str] = None,
+        has_contact_info: Optional[bool] = None,
+        content_format: Optional[str] = None,
+        plan: Optional[str] = None,
+    ) -> str:
+        """
+        Retrieve information from FAISS knowledge base.
+        
+        Args:
+            query: Search query
+            section: Optional policy section prefix filter (e.g. "C.1")
+            chunk_type: Optional chunk type filter (metadata "type")
+            has_contact_info: Optional filter for chunks with contact details
+            content_format: Optional format filter ("text" or "markdown_table")
+            plan: Optional plan name filter
+        """
+        return await run_rag_retriever(
+            query, section, chunk_type, has_contact_info, content_format, plan,
+            index_name=index_name, prefetcher=prefetcher,
+        )
+
+    return function_tool(rag_retriever, name="RAG_RETRIEVER", description=RAG_RETRIEVER_DESCRIPTION)
+
+
+def build_rag_batch_retriever_tool(index_name: Optional[str] = None):
+    """
+    Build the RAG_RETRIEVER_BATCH tool bound to one registered index.
+    
+    Args:
+        index_name: Registered index to search (None = default index)
+    
+    Returns:
+        LiveKit function tool
+    """
+    async def rag_retriever_batch(queries: List[str]) -> str:
+        """
+        Retrieve information for several questions from FAISS knowledge base in one call.
+        
+        Args:
+            queries: One short search query per sub-question
+        """
+        return await run_rag_batch_retriever(queries, index_name=index_name)
+
+    return function_tool(rag_retriever_batch, name="RAG_RETRIEVER_BATCH", description=RAG_RETRIEVER_BATCH_DESCRIPTION)
+
+
+# Tools over the default index
+rag_retriever_tool = build_rag_retriever_tool()
+rag_retriever_batch_tool = build_rag_batch_retriever_tool()
 
 
 # ---------------------------------------------------------------------------
@@ -612,93 +1676,208 @@ def get_prompt_file_path() -> str:
 
 
 def get_additional_instructions() -> str:
-    return ""
+    """Agent instructions for the configured RAG_MODE ("" in tool mode, where main.py adds the tool policy)."""
+    if RAG_MODE != RAG_MODE_INJECT:
+        return ""
+    return (
+        "\n\nKNOWLEDGE BASE CONTEXT: For questions about HDFC ERGO, the relevant policy wording is added "
+        "to the conversation just before the user's message, marked \"Knowledge base context\". "
+        "Answer from it, paraphrased naturally - never copy it verbatim and never mention it to the customer. "
+        "Do NOT rely on your training data for policy facts, addresses or contact details. "
+        "Only if no such context is present or it does not cover the question, call RAG_RETRIEVER first."
+    )
+
+
+async def inject_rag_context(turn_ctx, new_message, session_ref=None) -> bool:
+    """
+    RAG_MODE=inject: retrieve on the final user transcript and add the top
+    chunks to the chat context before the LLM generates, so answering needs
+    no tool call. Call from Agent.on_user_turn_completed.
+    
+    Greetings and acknowledgements are skipped by a local classifier. The
+    session's speculative prefetch is reused when it already covers the
+    transcript; retrieval slower than RAG_INJECT_TIMEOUT_MS is abandoned
+    (the LLM can still call RAG_RETRIEVER).
+    
+    Args:
+        turn_ctx: Chat context of the turn (llm.ChatContext)
+        new_message: The user's completed message (llm.ChatMessage)
+        session_ref: AgentSession whose tools were built by get_tools (for index and prefetcher)
+    
+    Returns:
+        Whether context was injected
+    """
+    if not USE_RAG or RAG_MODE != RAG_MODE_INJECT:
+        return False
+    transcript = (new_message.text_content or "").strip()
+    if not needs_retrieval(transcript):
+        logger.info(f"💬 No retrieval for small talk: '{transcript[:50]}'")
+        return False
+    
+    inject_start = time.perf_counter()
+    prefetcher = getattr(session_ref, "_rag_prefetcher", None)
+    index_name = getattr(session_ref, "_rag_index", None)
+    
+    async def retrieve() -> Optional[str]:
+        context = await prefetcher.lookup(transcript) if prefetcher is not None else None
+        if context is None:
+            context = await retrieve_context(transcript, k=RAG_TOP_K, index_name=index_name)
+        return context
+    
+    try:
+        context = await asyncio.wait_for(retrieve(), timeout=RAG_INJECT_TIMEOUT_MS / 1000)
+    except asyncio.TimeoutError:
+        logger.warning(f"⚠️ Context retrieval exceeded {RAG_INJECT_TIMEOUT_MS:.0f}ms - answering without injected context")
+        return False
+    except Exception as exc:
+        logger.error(f"Context retrieval failed: {exc}")
+        return False
+    if not context or not context.strip():
+        return False
+    
+    turn_ctx.add_message(
+        role="assistant",
+        content=f"Knowledge base context for the user's next message (HDFC ERGO policy wording):\n\n{context}",
+    )
+    inject_time = time.perf_counter() - inject_start
+    logger.info(f"💉 Injected knowledge base context in {inject_time:.3f}s ({inject_time*1000:.1f}ms)")
+    return True
 
 
-def get_tools(session_ref=None, ctx_ref=None):
+def get_tools(session_ref=None, ctx_ref=None, index_name: Optional[str] = None):
     """
     Get list of tools available to the agent.
     
     Args:
-        session_ref: Reference to the AgentSession (optional, not used currently)
-        ctx_ref: Reference to the JobContext (optional, not used currently)
+        session_ref: Reference to the AgentSession; its transcripts drive speculative
+            retrieval prefetch (RAG_PREFETCH_ENABLED)
+        ctx_ref: Reference to the JobContext; its job metadata routes the call to an index
+        index_name: Registered index to search; overrides routing
     
     Returns:
         List of tool functions
     """
-    tools = [rag_retriever_tool]
-    logger.info("✅ RAG retriever tool added")
+    if index_name is None and ctx_ref is not None:
+        index_name = route_index(ctx_ref.job.metadata)
+    registry = get_index_registry()
+    index_name = registry.resolve_name(index_name)
+    prefetcher = None
+    if session_ref is not None and RAG_PREFETCH_ENABLED:
+        prefetcher = build_prefetcher(session_ref, index_name)
+        logger.info("✅ Speculative retrieval prefetch enabled for this session")
+    if session_ref is not None:
+        # Read by inject_rag_context (RAG_MODE=inject)
+        session_ref._rag_prefetcher = prefetcher
+        session_ref._rag_index = index_name
+
+    if index_name == registry.default:
+        retriever_tool = rag_retriever_tool if prefetcher is None else build_rag_retriever_tool(prefetcher=prefetcher)
+        tools = [retriever_tool, rag_retriever_batch_tool]
+    else:
+        tools = [build_rag_retriever_tool(index_name, prefetcher), build_rag_batch_retriever_tool(index_name)]
+        if registry.loaded(index_name) is None:
+            # Load in the background so the first question doesn't pay for it
+            get_retrieval_executor().submit(registry.get, index_name)
+    logger.info(f"✅ RAG retriever tools added (index '{index_name}')")
     return tools
 
 
-async def initialize():
-    """Initialize Findoc use case module"""
-    logger.info("Findoc use case module initialized")
+def load_token_counter():
+    """
+    Load the context-packing tokenizer ahead of the first retrieval.
+
+    tiktoken reads its encoding from TIKTOKEN_CACHE_DIR or downloads it on
+    first use, which must not happen on the event loop during a call.
+    """
+    if RAG_CONTEXT_PACKING:
+        get_token_counter(RAG_CONTEXT_TOKEN_ENCODING)
+
+
+def load_rag_assets(index_name: Optional[str] = None) -> Optional[RagAssets]:
+    """
+    Load an index's FAISS store (memory-mapped) and BM25 index synchronously
+    into the index registry, and the context-packing tokenizer. Intended for
+    the worker prewarm stage; blocks while reading from disk. Other
+    registered indexes load on first use.
+    
+    Args:
+        index_name: Registered index to load (None = default index)
     
+    Returns:
+        RagAssets, or None if RAG is disabled or the index is missing
+    """
     if not USE_RAG:
         logger.info("USE_RAG is disabled for Findoc use case")
-        return
+        return None
 
     logger.info("\n" + "="*60)
-    logger.info("Initializing RAG System")
+    logger.info("Loading RAG assets")
     logger.info("="*60)
 
-    # Pre-load and verify embeddings during initialization
-    # This ensures everything is cached and ready for fast retrieval
-    try:
-        emb = build_local_embeddings()
-        embedding_dim = get_embedding_dimensions(emb)
-        logger.info(
-            f"Using OpenAI embeddings with {embedding_dim} dimensions "
-            f"(configured: {EMBEDDING_DIMENSIONS})"
-        )
-        
-        # Ensure configured dimensions match actual dimensions
-        if embedding_dim != EMBEDDING_DIMENSIONS:
-            logger.warning(
-                f"Dimension mismatch: configured {EMBEDDING_DIMENSIONS}, "
-                f"actual {embedding_dim}. Using actual dimension."
-            )
-    except Exception as exc:
-        logger.warning(f"Could not determine embedding dimension: {exc}")
-
     # Check and pre-load FAISS index
-    logger.info(f"\n🔵 Checking FAISS index at {FAISS_INDEX_DIR}...")
-    faiss_dir = Path(FAISS_INDEX_DIR)
+    spec = get_index_registry().spec(index_name)
+    logger.info(f"\n🔵 Checking FAISS index '{spec.name}' at {spec.index_dir}...")
+    faiss_dir = Path(spec.index_dir)
     if not faiss_dir.exists() or not any(faiss_dir.iterdir()):
         logger.warning(
-            f"⚠️ FAISS index missing at {FAISS_INDEX_DIR}. "
+            f"⚠️ FAISS index missing at {spec.index_dir}. "
             f"Please ensure the index exists at this location."
         )
         logger.warning("RAG retrieval will not work until index is available.")
-    else:
-        logger.info("FAISS index found - pre-loading and verifying...")
-        try:
-            # Pre-load the FAISS index during initialization to cache it
-            db = get_faiss_db()
-            index_dim = db.index.d if hasattr(db.index, 'd') else None
-            embedding_dim = get_embedding_dimensions(build_local_embeddings())
-            if index_dim:
-                logger.info(
-                    f"✅ FAISS index pre-loaded from DISK and cached in MEMORY: "
-                    f"{index_dim} dimensions match embeddings ({embedding_dim})\n"
-                    f"   Future retrievals will use the cached version (no disk access)"
-                )
-            else:
-                logger.info("✅ FAISS index pre-loaded from DISK and cached in MEMORY (dimension verification skipped)")
-            
-            # Pre-build BM25 index if hybrid search is enabled
-            if _use_hybrid_search:
-                if BM25_AVAILABLE:
-                    if _cached_documents:
-                        build_bm25_index(_cached_documents)
-                        logger.info("✅ BM25 index pre-built and cached in MEMORY")
-                    else:
-                        logger.warning("⚠️ Documents not cached - BM25 index will be built on first retrieval")
-                else:
-                    logger.warning("⚠️ rank-bm25 not installed - hybrid search disabled. Install with: pip install rank-bm25")
-        except Exception as exc:
-            logger.warning(f"Could not pre-load FAISS index: {exc}")
+        return None
+
+    load_token_counter()
+
+    logger.info("FAISS index found - pre-loading and verifying...")
+    try:
+        # Pre-load the FAISS index, BM25 and filter bitmaps into the registry
+        assets = get_index_registry().get(spec.name)
+        logger.info(
+            f"✅ FAISS index pre-loaded from DISK and cached in MEMORY: "
+            f"{assets.store.ntotal} vectors, {assets.store.dimension} dimensions (configured: {EMBEDDING_DIMENSIONS})\n"
+            f"   Future retrievals will use the cached version (no disk access)"
+        )
+        return assets
+    except Exception as exc:
+        logger.warning(f"Could not pre-load FAISS index: {exc}")
+        return None
+
+
+def use_rag_assets(assets: RagAssets):
+    """Install prewarmed assets in this process's index registry."""
+    registry = get_index_registry()
+    name = assets.name or registry.default
+    # Prewarm normally loads through the registry already; never replace a newer swapped-in snapshot
+    if registry.loaded(name) is None:
+        registry.put(name, assets)
+
+
+async def initialize(assets: Optional[RagAssets] = None):
+    """
+    Initialize Findoc use case module.
+    
+    Args:
+        assets: RagAssets from the worker prewarm stage; loaded off-loop if not given
+    """
+    logger.info("Findoc use case module initialized")
+    
+    if not USE_RAG:
+        logger.info("USE_RAG is disabled for Findoc use case")
+        return
+
+    # Re-ingested indexes are picked up without restarting the worker
+    start_snapshot_watcher()
+
+    if assets is not None:
+        use_rag_assets(assets)
+        # No-op when prewarm ran in this process; otherwise load the tokenizer off-loop now
+        await run_in_retrieval_executor(load_token_counter)
+        logger.info(
+            f"✅ Using prewarmed RAG assets ({assets.store.ntotal} vectors) - no index load on call pickup"
+        )
+        return
+
+    await run_in_retrieval_executor(load_rag_assets)
     
     logger.info("\n" + "="*60)
     logger.info("RAG System Initialization Complete")
@@ -707,10 +1886,28 @@ async def initialize():
 
 __all__ = [
     "initialize",
+    "load_rag_assets",
+    "RagAssets",
     "get_tools",
     "get_prompt_file_path",
     "get_additional_instructions",
+    "inject_rag_context",
+    "RAG_MODE",
+    "RAG_MODE_TOOL",
     "rag_retriever_tool",
+    "rag_retriever_batch_tool",
+    "build_rag_retriever_tool",
+    "build_rag_batch_retriever_tool",
+    "route_index",
+    "get_index_registry",
+    "hybrid_retrieve",
+    "batch_retrieve",
+    "retrieve_from_faiss",
+    "get_last_retrieval_timings",
+    "get_context_packing_stats",
+    "get_cutoff_stats",
+    "get_embedding_hedger",
+    "RetrievalTimings",
 ]
 
 
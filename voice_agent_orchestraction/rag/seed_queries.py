@@ -0,0 +1,86 @@
+"""
+Known Frequent RAG Queries
+
+Canonical queries the agent is steered towards (the RAG_RETRIEVER tool's
+"Query Format Examples"), the ingestion smoke-test queries, and user
+prompts mined from the fine-tuning dataset. Ingestion embeds these once
+to pre-seed the query embedding cache.
+"""
+
+import json
+import logging
+from collections import Counter
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# (label, query) pairs rendered into the RAG_RETRIEVER tool description
+QUERY_FORMAT_EXAMPLES: List[Tuple[str, str]] = [
+    ("Address", "HDFC ERGO office address headquarters contact information"),
+    ("Contact", "HDFC ERGO customer service phone number email address"),
+    ("Office Location", "HDFC ERGO branch address service center location"),
+    ("Waiting period", "HDFC ERGO my:Optima Secure pre-existing disease waiting period Section C.1"),
+    ("Coverage", "HDFC ERGO my:Optima Secure Secure Benefit Plus Benefit coverage details"),
+    ("Claims", "HDFC ERGO my:Optima Secure claim procedure documentation required"),
+    ("Exclusions", "HDFC ERGO my:Optima Secure standard exclusions Section C.2"),
+    ("Optional covers", "HDFC ERGO my:Optima Secure Global Health Cover overseas treatment"),
+    ("Network", "HDFC ERGO cashless network hospital list"),
+    ("Protect Benefit", "HDFC ERGO my:Optima Secure Protect Benefit non-medical expenses covered"),
+]
+
+# Smoke-test queries run by ingestion.main after building the index
+INGESTION_TEST_QUERIES: List[str] = [
+    "What is Pre-Existing Disease waiting period?",
+    "How much room rent is covered in Optima Lite?",
+    "Is obesity surgery covered?",
+    "What are the conditions for Plus Benefit?",
+    "Tell me about Global Health Cover",
+]
+
+FINE_TUNING_DATA_PATH = (
+    Path(__file__).resolve().parents[2] / "fine tuning" / "data" / "insurance_sales_data_expanded.jsonl"
+)
+
+
+def mine_dialogue_queries(path: Path = FINE_TUNING_DATA_PATH, limit: Optional[int] = 200) -> List[str]:
+    """
+    Extract user turns from a {"dialogue": "User: ...\\nAgent: ..."} jsonl file,
+    most frequent first.
+
+    Args:
+        path: Fine-tuning dataset
+        limit: Maximum number of queries to return (None = all)
+
+    Returns:
+        Distinct user utterances
+    """
+    if not Path(path).exists():
+        logger.warning(f"⚠️ Fine-tuning dataset not found at {path}; no dialogue queries mined")
+        return []
+
+    counts = Counter()
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                dialogue = json.loads(line).get('dialogue', '')
+            except json.JSONDecodeError:
+                continue
+            for turn in dialogue.splitlines():
+                if turn.startswith("User:"):
+                    utterance = turn[len("User:"):].strip()
+                    if utterance:
+                        counts[utterance] += 1
+    return [utterance for utterance, _ in counts.most_common(limit)]
+
+
+def collect_seed_queries(dialogue_limit: Optional[int] = 200) -> List[str]:
+    """All known frequent queries: tool examples, test queries, then mined prompts."""
+    return (
+        [query for _, query in QUERY_FORMAT_EXAMPLES]
+        + INGESTION_TEST_QUERIES
+        + mine_dialogue_queries(limit=dialogue_limit)
+    )
@@ -0,0 +1,183 @@
+"""
+Versioned Index Snapshots
+
+Ingestion publishes every build as an immutable snapshot directory and
+switches a small pointer file to it atomically:
+
+    faiss_index/
+    ├── CURRENT                      # Name of the live snapshot
+    └── versions/
+        ├── 20261017T093000-3fa2c1/  # Older snapshot, kept for in-flight queries
+        └── 20261017T120000-b71e09/  # Live snapshot (full index directory)
+
+A snapshot is written to a staging directory, fsynced, renamed into
+versions/, and only then published by replacing CURRENT (write temp file,
+fsync, os.replace). A reader therefore sees either the old or the new
+snapshot, never a partial one.
+
+Workers poll CURRENT with SnapshotWatcher and swap in the new snapshot
+while queries already running finish on the old one (read-copy-update).
+An index directory without CURRENT is a legacy flat directory and is
+used as-is.
+"""
+
+import logging
+import os
+import secrets
+import shutil
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+CURRENT_POINTER_FILENAME = "CURRENT"
+VERSIONS_DIRNAME = "versions"
+STAGING_PREFIX = ".staging-"
+
+
+def new_snapshot_version() -> str:
+    """Sortable, unique snapshot name: local timestamp plus a random suffix."""
+    return f"{datetime.now().strftime('%Y%m%dT%H%M%S')}-{secrets.token_hex(3)}"
+
+
+def read_current_version(index_root: str) -> Optional[str]:
+    """Live snapshot name from the CURRENT pointer, or None for a legacy flat directory."""
+    try:
+        version = (Path(index_root) / CURRENT_POINTER_FILENAME).read_text(encoding='utf-8').strip()
+    except FileNotFoundError:
+        return None
+    return version or None
+
+
+def resolve_snapshot_dir(index_root: str) -> Tuple[str, Optional[str]]:
+    """
+    Directory holding the live index files.
+
+    Returns:
+        (directory, snapshot name); (index_root, None) for a legacy flat directory
+    """
+    version = read_current_version(index_root)
+    if version is None:
+        return str(index_root), None
+    return str(Path(index_root) / VERSIONS_DIRNAME / version), version
+
+
+def _fsync_file(path: Path):
+    with open(path, 'rb') as f:
+        os.fsync(f.fileno())
+
+
+def _fsync_dir(path: Path):
+    """Persist directory entries (renames); not supported on Windows."""
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def begin_snapshot(index_root: str, version: str) -> str:
+    """
+    Create the staging directory for a new snapshot.
+
+    Returns:
+        Staging directory to write the index files into
+    """
+    staging_dir = Path(index_root) / VERSIONS_DIRNAME / f"{STAGING_PREFIX}{version}"
+    staging_dir.mkdir(parents=True, exist_ok=False)
+    return str(staging_dir)
+
+
+def publish_snapshot(index_root: str, staging_dir: str, version: str) -> str:
+    """
+    Make a fully written staging directory the live snapshot.
+
+    fsyncs every file, renames the directory into versions/<version>, then
+    atomically replaces the CURRENT pointer.
+
+    Returns:
+        Published snapshot directory
+    """
+    index_root = Path(index_root)
+    staging_dir = Path(staging_dir)
+    versions_dir = index_root / VERSIONS_DIRNAME
+
+    for path in staging_dir.iterdir():
+        if path.is_file():
+            _fsync_file(path)
+    _fsync_dir(staging_dir)
+
+    snapshot_dir = versions_dir / version
+    os.replace(staging_dir, snapshot_dir)
+    _fsync_dir(versions_dir)
+
+    pointer_tmp = index_root / f"{CURRENT_POINTER_FILENAME}.tmp"
+    with open(pointer_tmp, 'w', encoding='utf-8') as f:
+        f.write(version)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(pointer_tmp, index_root / CURRENT_POINTER_FILENAME)
+    _fsync_dir(index_root)
+    return str(snapshot_dir)
+
+
+def prune_snapshots(index_root: str, keep: int = 3) -> List[str]:
+    """
+    Delete old snapshots, keeping the live one and the `keep` newest.
+
+    Workers still mapping a deleted snapshot keep reading it on POSIX
+    (unlinked files stay valid while mapped); on Windows the delete fails
+    and is retried at the next publish.
+
+    Returns:
+        Names of deleted snapshots
+    """
+    versions_dir = Path(index_root) / VERSIONS_DIRNAME
+    if not versions_dir.exists():
+        return []
+    current = read_current_version(index_root)
+    published = sorted(
+        path.name for path in versions_dir.iterdir()
+        if path.is_dir() and not path.name.startswith(STAGING_PREFIX)
+    )
+    deleted = []
+    for version in published[:-keep] if keep > 0 else published:
+        if version == current:
+            continue
+        try:
+            shutil.rmtree(versions_dir / version)
+            deleted.append(version)
+        except OSError as exc:
+            logger.warning(f"⚠️ Could not delete old snapshot {version}: {exc}")
+    return deleted
+
+
+class SnapshotWatcher:
+    """Calls `check` every `interval` seconds on a daemon thread until stopped"""
+
+    def __init__(self, check: Callable[[], None], interval: float = 10.0):
+        self.check = check
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="rag-snapshot-watcher", daemon=True)
+
+    def start(self) -> "SnapshotWatcher":
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.check()
+            except Exception as exc:
+                logger.error(f"Snapshot check failed: {exc}")
@@ -0,0 +1,485 @@
+"""
+Streaming Ingestion Pipeline
+PDF directory -> chunks -> embeddings -> FAISS index in one pass, with bounded memory
+
+    chunker --(queue)--> embedder --(queue)--> index writer
+
+- chunker:  PolicyDocumentChunker.iter_page_chunks, one PDF page at a time
+            (page ranges extracted by `stream_pdf_workers` processes)
+- embedder: collects `stream_window_chunks` chunks, merges near-duplicates
+            within the window (chunk_dedup.py), takes cached vectors from
+            the chunk embedding cache and embeds the rest as token-packed
+            concurrent requests (OpenAIEmbedder.embed_chunks_batched)
+- writer:   adds each window's normalized vectors to the FAISS index and
+            appends the chunks to a ChunkBundleWriter (which spills to
+            temporary files)
+
+The queues hold at most `stream_queue_size` pages / windows, so a slow stage
+back-pressures the stages before it and the chunks in flight are bounded
+however many documents are ingested. What still grows with the corpus is
+the index itself and the BM25 / filter structures, which are built after
+the stream from the memory-mapped bundle. IVF/PQ/SQ indexes are trained on
+the first `stream_train_size` vectors.
+
+Usage:
+    python -m voice_agent_orchestraction.rag.streaming_ingestion <pdf_dir>
+"""
+
+import argparse
+import os
+import queue
+import shutil
+import sys
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import faiss
+import numpy as np
+
+# Allow running as a script as well as a module
+if __package__ in (None, ""):
+    sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from voice_agent_orchestraction.rag.chunk_bundle import ChunkBundle, ChunkBundleWriter
+from voice_agent_orchestraction.rag.chunk_dedup import deduplicate_chunks
+from voice_agent_orchestraction.rag.chunk_embedding_cache import ChunkEmbeddingCache, diff_chunk_ids
+from voice_agent_orchestraction.rag.chunking import PolicyDocumentChunker
+from voice_agent_orchestraction.rag.index_factory import needs_training
+from voice_agent_orchestraction.rag.ingestion import FAISSIndexManager, IngestionConfig, PolicyIngestionPipeline
+
+_DONE = object()  # End-of-stream marker passed down the queues
+
+
+class _Cancelled(Exception):
+    """Raised inside a stage when another stage failed"""
+
+
+def _put(stage_queue: queue.Queue, item: Any, stop: threading.Event) -> float:
+    """Put an item, waiting while the queue is full. Returns seconds spent waiting."""
+    start = time.perf_counter()
+    while not stop.is_set():
+        try:
+            stage_queue.put(item, timeout=0.1)
+            return time.perf_counter() - start
+        except queue.Full:
+            continue
+    raise _Cancelled()
+
+
+def _get(stage_queue: queue.Queue, stop: threading.Event) -> Tuple[Any, float]:
+    """Get an item, waiting while the queue is empty. Returns (item, seconds spent waiting)."""
+    start = time.perf_counter()
+    while not stop.is_set():
+        try:
+            return stage_queue.get(timeout=0.1), time.perf_counter() - start
+        except queue.Empty:
+            continue
+    raise _Cancelled()
+
+
+@dataclass
+class StageMetrics:
+    """Throughput of one pipeline stage"""
+    name: str
+    chunks: int = 0
+    busy_seconds: float = 0.0  # Doing the stage's own work
+    input_wait_seconds: float = 0.0  # Starved: the stage before is slower
+    output_wait_seconds: float = 0.0  # Back-pressured: the stage after is slower
+    counters: Dict[str, int] = field(default_factory=dict)  # Stage-specific counts (pages, tokens, ...)
+
+    @property
+    def chunks_per_second(self) -> float:
+        return self.chunks / self.busy_seconds if self.busy_seconds else 0.0
+
+    def count(self, name: str, amount: int = 1):
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def summary(self) -> str:
+        counters = ", ".join(f"{value:,} {name}" for name, value in self.counters.items())
+        return (
+            f"{self.name:<9} {self.chunks} chunks, {self.busy_seconds:.1f}s busy "
+            f"({self.chunks_per_second:.1f} chunks/s) | waited {self.input_wait_seconds:.1f}s for input, "
+            f"{self.output_wait_seconds:.1f}s on a full queue" + (f" | {counters}" if counters else "")
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'chunks': self.chunks,
+            'busy_seconds': round(self.busy_seconds, 3),
+            'chunks_per_second': round(self.chunks_per_second, 2),
+            'input_wait_seconds': round(self.input_wait_seconds, 3),
+            'output_wait_seconds': round(self.output_wait_seconds, 3),
+            **self.counters,
+        }
+
+
+class StreamingIndexWriter:
+    """
+    Adds vectors to the FAISS index and chunks to the bundle as they arrive.
+    Index types that must be trained buffer vectors until train_size are
+    available (or the stream ends), train on them and then stream.
+    """
+
+    def __init__(
+        self,
+        index_manager: FAISSIndexManager,
+        bundle: ChunkBundleWriter,
+        include_vectors: bool = True,
+        train_size: int = 20_000,
+    ):
+        """
+        Args:
+            index_manager: Holds the index being built (created here)
+            bundle: Open bundle writer for the build
+            include_vectors: Store the normalized vectors in the bundle
+            train_size: Vectors to train IVF/PQ/SQ indexes on
+        """
+        self.index_manager = index_manager
+        self.bundle = bundle
+        self.include_vectors = include_vectors
+        self.train_size = train_size
+        self.chunks = 0
+        self._pending: List[Tuple[List[Dict], np.ndarray]] = []
+        self._pending_count = 0
+        index_manager.index = None
+        if not needs_training(index_manager.config.faiss_index_type):
+            index_manager.create_index()
+
+    def add(self, chunks: List[Dict], vectors: np.ndarray):
+        """Add one window of chunks with their (unnormalized) embeddings."""
+        vectors = self.index_manager.normalize_vectors(np.array(vectors, dtype=np.float32))
+        if self.index_manager.index is None:
+            self._pending.append((chunks, vectors))
+            self._pending_count += len(chunks)
+            if self._pending_count >= self.train_size:
+                self._train()
+            return
+        self._write(chunks, vectors)
+
+    def finish(self):
+        """Train on whatever was buffered if the stream ended before train_size vectors."""
+        if self.index_manager.index is None:
+            if not self._pending:
+                raise ValueError("No chunks were extracted - nothing to index")
+            self._train()
+
+    def _train(self):
+        print(f"Training {self.index_manager.config.faiss_index_type} on the first {self._pending_count} vectors")
+        self.index_manager.create_index(np.concatenate([vectors for _, vectors in self._pending]))
+        pending, self._pending, self._pending_count = self._pending, [], 0
+        for chunks, vectors in pending:
+            self._write(chunks, vectors)
+
+    def _write(self, chunks: List[Dict], vectors: np.ndarray):
+        start = time.time()
+        self.index_manager.index.add(vectors)
+        self.index_manager.build_seconds += time.time() - start
+        for chunk, vector in zip(chunks, vectors):
+            self.bundle.add(chunk['id'], chunk['content'], chunk['metadata'], vector if self.include_vectors else None)
+        self.chunks += len(chunks)
+
+
+class StreamingIngestionPipeline(PolicyIngestionPipeline):
+    """PDFs -> FAISS index through bounded queues (see module docstring)"""
+
+    def __init__(self, config: Optional[IngestionConfig] = None):
+        super().__init__(config)
+        self.embedder.executor.progress = False  # One summary line per window instead
+        self.metrics: Dict[str, StageMetrics] = {}
+
+    def _chunk_stage(self, pdf_paths: Sequence[str], out_queue: queue.Queue, stop: threading.Event):
+        metrics = self.metrics['chunk']
+        chunker = PolicyDocumentChunker()  # Shared, so chunk IDs are unique across documents
+        for pdf_path in pdf_paths:
+            print(f"Chunking: {pdf_path}")
+            pages = chunker.iter_page_chunks(pdf_path, workers=self.config.stream_pdf_workers)
+            while True:
+                start = time.perf_counter()
+                try:
+                    _, page_chunks = next(pages)
+                except StopIteration:
+                    break
+                finally:
+                    metrics.busy_seconds += time.perf_counter() - start
+                metrics.count('pages')
+                metrics.chunks += len(page_chunks)
+                if page_chunks:
+                    metrics.output_wait_seconds += _put(out_queue, [c.to_dict() for c in page_chunks], stop)
+            metrics.count('documents')
+        _put(out_queue, _DONE, stop)
+
+    def _embed_stage(
+        self,
+        in_queue: queue.Queue,
+        out_queue: queue.Queue,
+        use_enriched_text: bool,
+        stop: threading.Event,
+    ):
+        metrics = self.metrics['embed']
+        # SQLite connections belong to the thread that opened them
+        cache = None
+        if self.config.use_chunk_embedding_cache:
+            cache = ChunkEmbeddingCache(
+                self.config.chunk_embedding_cache_path,
+                self.config.embedding_model,
+                self.config.embedding_dimensions,
+            )
+        try:
+            window: List[Dict] = []
+            while True:
+                item, waited = _get(in_queue, stop)
+                metrics.input_wait_seconds += waited
+                if item is not _DONE:
+                    window.extend(item)
+                if window and (item is _DONE or len(window) >= self.config.stream_window_chunks):
+                    start = time.perf_counter()
+                    if self.config.deduplicate_chunks:
+                        window, report = deduplicate_chunks(
+                            window, threshold=self.config.dedup_threshold, num_perm=self.config.dedup_num_perm
+                        )
+                        metrics.count('duplicates_merged', report.removed)
+                    vectors = self._embed_window(window, cache, use_enriched_text)
+                    metrics.busy_seconds += time.perf_counter() - start
+                    metrics.chunks += len(window)
+                    metrics.output_wait_seconds += _put(out_queue, (window, vectors), stop)
+                    window = []
+                if item is _DONE:
+                    break
+            if cache is not None and self.config.chunk_embedding_cache_max_age_days > 0:
+                metrics.count('stale_cache_entries_pruned', cache.prune(self.config.chunk_embedding_cache_max_age_days))
+            _put(out_queue, _DONE, stop)
+        finally:
+            if cache is not None:
+                cache.close()
+
+    def _embed_window(
+        self,
+        chunks: List[Dict],
+        cache: Optional[ChunkEmbeddingCache],
+        use_enriched_text: bool,
+    ) -> np.ndarray:
+        """Embeddings of one window: cached vectors plus one round of concurrent requests for the rest."""
+        metrics = self.metrics['embed']
+        texts = [self.create_enriched_text(c) if use_enriched_text else c['content'] for c in chunks]
+        vectors = cache.get_many(texts) if cache is not None else [None] * len(texts)
+        missing = [i for i, vector in enumerate(vectors) if vector is None]
+        if missing:
+            embedded = self.embedder.embed_chunks_batched(
+                [chunks[i] for i in missing], texts=[texts[i] for i in missing]
+            )
+            if cache is not None:
+                cache.put_many([texts[i] for i in missing], embedded)
+            for i, vector in zip(missing, embedded):
+                vectors[i] = vector
+            metrics.count('tokens', self.embedder.executor.report.tokens)
+            metrics.count('retries', self.embedder.executor.report.retries)
+            metrics.count('truncated', len(self.embedder.truncations))
+        metrics.count('embedded', len(missing))
+        metrics.count('cached', len(chunks) - len(missing))
+        return np.vstack(vectors).astype(np.float32)
+
+    def _write_stage(
+        self,
+        in_queue: queue.Queue,
+        writer: StreamingIndexWriter,
+        stop: threading.Event,
+    ):
+        metrics = self.metrics['write']
+        while True:
+            item, waited = _get(in_queue, stop)
+            metrics.input_wait_seconds += waited
+            if item is _DONE:
+                break
+            chunks, vectors = item
+            start = time.perf_counter()
+            writer.add(chunks, vectors)
+            metrics.busy_seconds += time.perf_counter() - start
+            metrics.chunks += len(chunks)
+            print(f"  Indexed {writer.chunks} chunks")
+        start = time.perf_counter()
+        writer.finish()
+        metrics.busy_seconds += time.perf_counter() - start
+
+    def _run_stages(
+        self,
+        pdf_paths: Sequence[str],
+        writer: StreamingIndexWriter,
+        use_enriched_text: bool,
+    ):
+        """Run chunker and embedder in threads and the writer here; re-raise the first stage failure."""
+        stop = threading.Event()
+        errors: List[BaseException] = []
+        chunk_queue = queue.Queue(maxsize=self.config.stream_queue_size)
+        vector_queue = queue.Queue(maxsize=self.config.stream_queue_size)
+
+        def guarded(name, target, *args) -> threading.Thread:
+            def run():
+                try:
+                    target(*args)
+                except _Cancelled:
+                    pass
+                except BaseException as exc:
+                    errors.append(exc)
+                    stop.set()
+            return threading.Thread(target=run, name=f"ingest-{name}", daemon=True)
+
+        threads = [
+            guarded('chunk', self._chunk_stage, pdf_paths, chunk_queue, stop),
+            guarded('embed', self._embed_stage, chunk_queue, vector_queue, use_enriched_text, stop),
+        ]
+        for thread in threads:
+            thread.start()
+        try:
+            self._write_stage(vector_queue, writer, stop)
+        except _Cancelled:
+            pass
+        except BaseException as exc:
+            errors.append(exc)
+        finally:
+            stop.set()
+            for thread in threads:
+                thread.join()
+        if errors:
+            raise errors[0]
+
+    def run_pdfs(
+        self,
+        pdf_paths: Sequence[str],
+        use_enriched_text: bool = True,
+        save_intermediate: bool = True,
+    ) -> Dict[str, Any]:
+        """
+        Stream PDFs into a new index build (published as a snapshot like run()).
+
+        Args:
+            pdf_paths: PDFs to ingest, in index order
+            use_enriched_text: Whether to add context headers for better embedding
+            save_intermediate: Store the embeddings in the chunk bundle
+
+        Returns:
+            Statistics about ingestion, with per-stage metrics
+        """
+        start_time = time.time()
+        self.metrics = {name: StageMetrics(name) for name in ('chunk', 'embed', 'write')}
+        manager = self.index_manager
+        manager.embedded_text = "enriched" if use_enriched_text else "content"
+
+        print("=" * 60)
+        print(f"STREAMING INGESTION: {len(pdf_paths)} PDFs")
+        print(f"Model: {self.config.embedding_model} ({self.config.embedding_dimensions} dimensions)")
+        print("=" * 60)
+
+        index_dir, version = manager.begin_save()
+        bundle_path = manager.path_in(index_dir, self.config.chunk_bundle_path)
+        try:
+            with ChunkBundleWriter(bundle_path, dimensions=self.config.embedding_dimensions) as bundle_writer:
+                writer = StreamingIndexWriter(
+                    manager, bundle_writer,
+                    include_vectors=save_intermediate,
+                    train_size=self.config.stream_train_size,
+                )
+                self._run_stages(pdf_paths, writer, use_enriched_text)
+
+            faiss.write_index(manager.index, manager.path_in(index_dir, self.config.faiss_index_path))
+            # BM25, filter bitmaps and manifest from the memory-mapped bundle
+            bundle = ChunkBundle.open(bundle_path)
+            try:
+                manager.save_bm25_index(index_dir, texts=bundle.texts)
+                manager.save_filter_bitmaps(index_dir, metadatas=bundle.metadatas)
+                manager.write_manifest(index_dir, chunk_count=len(bundle))
+                chunk_ids = list(bundle.chunk_ids)
+            finally:
+                del bundle  # Release the mapping before the staging directory is renamed
+
+            previous, _ = self.previous_build()
+            if previous is not None:
+                print(f"Changes since the live build: {diff_chunk_ids(list(previous.chunk_ids), chunk_ids).summary()}")
+                del previous
+            index_dir = manager.finish_save(index_dir, version)
+        except BaseException:
+            if version is not None:
+                shutil.rmtree(index_dir, ignore_errors=True)  # Never leave a half-written staging snapshot
+            raise
+
+        seeded = self.seed_query_cache() if self.config.seed_query_cache else 0
+
+        elapsed = time.time() - start_time
+        stats = {
+            'documents': len(pdf_paths),
+            'total_chunks': manager.index.ntotal,
+            'embedding_dimensions': self.config.embedding_dimensions,
+            'index_size': manager.index.ntotal,
+            'elapsed_seconds': elapsed,
+            'chunks_per_second': manager.index.ntotal / elapsed if elapsed else 0.0,
+            'index_path': manager.path_in(index_dir, self.config.faiss_index_path),
+            'chunk_bundle_path': manager.path_in(index_dir, self.config.chunk_bundle_path),
+            'index_type': self.config.faiss_index_type,
+            'seeded_queries': seeded,
+            'stages': {name: metrics.to_dict() for name, metrics in self.metrics.items()},
+        }
+
+        print("\n" + "=" * 60)
+        print("STREAMING INGESTION COMPLETE")
+        print("=" * 60)
+        for metrics in self.metrics.values():
+            print(metrics.summary())
+        # The busiest stage sets the pace; the others wait on it
+        bottleneck = max(self.metrics.values(), key=lambda m: m.busy_seconds)
+        print(f"Bottleneck: {bottleneck.name} stage")
+        chunk_metrics = self.metrics['chunk']
+        if chunk_metrics.busy_seconds:
+            print(f"PDF extraction: {chunk_metrics.counters.get('pages', 0) / chunk_metrics.busy_seconds:.2f} pages/s "
+                  f"({self.config.stream_pdf_workers} workers)")
+        print(f"Total: {stats['total_chunks']} chunks from {len(pdf_paths)} PDFs in {elapsed:.2f}s "
+              f"({stats['chunks_per_second']:.2f} chunks/second)")
+        return stats
+
+    def run_directory(
+        self,
+        pdf_dir: str,
+        pattern: str = "*.pdf",
+        use_enriched_text: bool = True,
+        save_intermediate: bool = True,
+    ) -> Dict[str, Any]:
+        """
+        Stream every PDF in a directory (sorted by name, so builds are reproducible).
+
+        Raises:
+            FileNotFoundError: If the directory holds no matching PDFs
+        """
+        pdf_paths = sorted(str(path) for path in Path(pdf_dir).glob(pattern))
+        if not pdf_paths:
+            raise FileNotFoundError(f"No files matching {pattern} in {pdf_dir}")
+        return self.run_pdfs(pdf_paths, use_enriched_text=use_enriched_text, save_intermediate=save_intermediate)
+
+
+def main():
+    """Stream a directory of policy PDFs into the FAISS index"""
+    parser = argparse.ArgumentParser(description="Streaming PDF -> FAISS ingestion")
+    parser.add_argument("pdf_dir", help="Directory of policy PDFs")
+    parser.add_argument("--pattern", default="*.pdf", help="File pattern inside pdf_dir")
+    parser.add_argument("--raw-text", action="store_true", help="Embed chunk content without context headers")
+    parser.add_argument("--window", type=int, default=None, help="Chunks embedded per window")
+    parser.add_argument("--queue-size", type=int, default=None, help="Pages / windows buffered between stages")
+    parser.add_argument("--workers", type=int, default=None, help="Processes extracting PDF pages (default: 1, in the chunker thread)")
+    args = parser.parse_args()
+
+    config = IngestionConfig(openai_api_key=os.getenv("OPENAI_API_KEY"))
+    if args.window:
+        config.stream_window_chunks = args.window
+    if args.queue_size:
+        config.stream_queue_size = args.queue_size
+    if args.workers:
+        config.stream_pdf_workers = args.workers
+    if not config.openai_api_key:
+        raise ValueError("OPENAI_API_KEY environment variable not set")
+
+    pipeline = StreamingIngestionPipeline(config)
+    pipeline.run_directory(args.pdf_dir, pattern=args.pattern, use_enriched_text=not args.raw_text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Turn Classifier
+
+Lightweight local check deciding whether a final user transcript needs a
+knowledge base lookup before the LLM answers (RAG_MODE=inject). No model
+call: greetings, acknowledgements and fillers ("Haan", "Boliye", "Okay",
+"Yes go ahead") are skipped, anything naming a policy topic or asking a
+question with enough substance is retrieved.
+"""
+
+import re
+from typing import FrozenSet
+
+from voice_agent_orchestraction.rag.bm25_index import tokenize
+
+# Greetings, acknowledgements and fillers in English, Hindi and Hinglish
+SMALL_TALK_TERMS: FrozenSet[str] = frozenset({
+    "hi", "hello", "hey", "namaste", "namaskar", "good", "morning", "afternoon", "evening",
+    "ok", "okay", "okk", "fine", "sure", "alright", "right", "yes", "yeah", "yep", "no", "nope", "not",
+    "go", "ahead", "continue", "please", "thanks", "thank", "you", "welcome", "bye", "goodbye",
+    "haan", "han", "ha", "haa", "ji", "hanji", "boliye", "bolo", "batao", "bataiye", "achha", "acha",
+    "accha", "theek", "thik", "hai", "hain", "nahi", "nahin", "mat", "chaliye", "chalo", "sahi",
+    "hmm", "hm", "umm", "uh", "ah", "oh", "so", "and", "then", "now", "busy", "later", "call",
+    "main", "mai", "hoon", "hu", "speaking", "who", "is", "this", "it", "a", "i", "am", "me",
+})
+
+# Topic words that make even a short turn worth a lookup
+DOMAIN_TERMS: FrozenSet[str] = frozenset({
+    "claim", "claims", "cashless", "reimbursement", "waiting", "period", "ped", "room", "rent", "icu",
+    "cover", "covered", "coverage", "covers", "exclusion", "exclusions", "excluded", "premium", "hospital",
+    "hospitals", "network", "sum", "insured", "bonus", "restore", "deductible", "ayush", "maternity",
+    "surgery", "disease", "diseases", "diabetes", "address", "office", "phone", "number", "email",
+    "contact", "branch", "ombudsman", "renewal", "portability", "grace", "free", "look", "moratorium",
+    "organ", "donor", "opinion", "checkup", "check", "abroad", "global", "overseas", "limit", "limits",
+    "benefit", "benefits", "document", "documents", "copay", "co", "pay", "tax", "80d",
+})
+
+_QUESTION_PATTERN = re.compile(
+    r"\?|\b(what|how|when|where|which|why|kya|kaise|kab|kahan|kitna|kitni|kitne|kaun|konsa|kyun|kyon)\b",
+    re.IGNORECASE,
+)
+
+
+def needs_retrieval(transcript: str, min_content_terms: int = 2) -> bool:
+    """
+    Whether a final user turn should be answered with knowledge base context.
+
+    Args:
+        transcript: Final user transcript
+        min_content_terms: Non-small-talk words a question needs when it names no policy topic
+
+    Returns:
+        False for greetings, acknowledgements and fillers; True for policy questions
+    """
+    tokens = tokenize(transcript or "")
+    if not tokens:
+        return False
+    content = [token for token in tokens if token not in SMALL_TALK_TERMS]
+    if not content:
+        return False
+    if any(token in DOMAIN_TERMS for token in content):
+        return True
+    return bool(_QUESTION_PATTERN.search(transcript)) and len(content) >= min_content_terms
@@ -0,0 +1,265 @@
+"""
+Native FAISS Vector Store
+
+Thin retrieval engine over a raw FAISS index built by ingestion.py.
+Chunk text and metadata are read from the chunk bundle (chunk_bundle.py)
+by FAISS id, and queries go straight to faiss.Index.search (no LangChain wrapper, no
+network call at load time).
+
+The ingestion pipeline builds an inner-product index (flat, IVF, PQ, HNSW
+or SQ8 - see index_factory.py) over L2-normalised vectors, so scores
+returned here are cosine similarities: HIGHER is better.
+
+Both the FAISS index and the chunk bundle are opened memory-mapped and
+read-only, so every job process on a host shares the same physical pages.
+"""
+
+import json
+import logging
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import faiss
+import numpy as np
+
+from voice_agent_orchestraction.rag.chunk_bundle import CHUNK_BUNDLE_FILENAME, ChunkBundle
+from voice_agent_orchestraction.rag.index_factory import configure_search, search_parameters
+
+logger = logging.getLogger(__name__)
+
+# Chunk texts of indexes built before chunks.bundle (read as a fallback)
+CHUNK_TEXTS_FILENAME = "chunk_texts.bin"
+CHUNK_OFFSETS_FILENAME = "chunk_text_offsets.npy"
+
+# IO_FLAG_MMAP maps IVF inverted lists, IO_FLAG_MMAP_IFC maps flat codes (faiss >= 1.10)
+FAISS_MMAP_FLAGS = faiss.IO_FLAG_MMAP | getattr(faiss, "IO_FLAG_MMAP_IFC", 0) | faiss.IO_FLAG_READ_ONLY
+# IVF indexes reject the combined flags; their inverted lists map with IO_FLAG_MMAP alone
+FAISS_MMAP_IVF_FLAGS = faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY
+
+
+class ChunkTextStore:
+    """
+    Read-only chunk texts backed by one mmap'd UTF-8 blob plus an offsets array.
+    Text i is blob[offsets[i]:offsets[i + 1]], decoded only when accessed.
+    """
+
+    def __init__(self, blob: np.ndarray, offsets: np.ndarray):
+        self.blob = blob
+        self.offsets = offsets
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i: int) -> str:
+        start, end = self.offsets[i], self.offsets[i + 1]
+        return self.blob[start:end].tobytes().decode('utf-8')
+
+    def __iter__(self) -> Iterator[str]:
+        for i in range(len(self)):
+            yield self[i]
+
+    @classmethod
+    def open(
+        cls,
+        index_dir: str,
+        texts_filename: str = CHUNK_TEXTS_FILENAME,
+        offsets_filename: str = CHUNK_OFFSETS_FILENAME,
+    ) -> "ChunkTextStore":
+        """Memory-map the text blob and offsets written by ChunkTextStore.write."""
+        blob_path = Path(index_dir) / texts_filename
+        offsets = np.load(Path(index_dir) / offsets_filename, mmap_mode='r')
+        if blob_path.stat().st_size == 0:
+            blob = np.empty(0, dtype=np.uint8)  # np.memmap cannot map empty files
+        else:
+            blob = np.memmap(blob_path, dtype=np.uint8, mode='r')
+        return cls(blob, offsets)
+
+    @staticmethod
+    def write(
+        index_dir: str,
+        texts: Sequence[str],
+        texts_filename: str = CHUNK_TEXTS_FILENAME,
+        offsets_filename: str = CHUNK_OFFSETS_FILENAME,
+    ) -> List[str]:
+        """
+        Write texts as a contiguous UTF-8 blob plus int64 offsets.
+
+        Returns:
+            File names written (relative to index_dir)
+        """
+        offsets = np.zeros(len(texts) + 1, dtype=np.int64)
+        with open(Path(index_dir) / texts_filename, 'wb') as f:
+            for i, text in enumerate(texts):
+                encoded = text.encode('utf-8')
+                f.write(encoded)
+                offsets[i + 1] = offsets[i] + len(encoded)
+        np.save(Path(index_dir) / offsets_filename, offsets)
+        return [texts_filename, offsets_filename]
+
+
+class FaissVectorStore:
+    """FAISS index plus chunk store addressed by FAISS id"""
+
+    def __init__(
+        self,
+        index: faiss.Index,
+        texts: Sequence[str],
+        chunk_count: int,
+        index_dir: str,
+    ):
+        self.index = index
+        self.texts = texts
+        self.chunk_count = chunk_count  # Chunks actually present in the chunk store
+        self.index_dir = index_dir
+        self.bundle: Optional[ChunkBundle] = None
+        self._metadatas = None
+        self._chunk_ids = None
+
+    @property
+    def dimension(self) -> int:
+        return self.index.d
+
+    @property
+    def ntotal(self) -> int:
+        return self.index.ntotal
+
+    @property
+    def metadatas(self) -> Sequence[Dict]:
+        """Chunk metadata indexed by FAISS id (decoded lazily - not needed on the search path)."""
+        if self.bundle is not None:
+            return self.bundle.metadatas
+        if self._metadatas is None:
+            self._load_chunk_mapping()
+        return self._metadatas
+
+    @property
+    def chunk_ids(self) -> Sequence[str]:
+        """Chunk IDs indexed by FAISS id (decoded lazily)."""
+        if self.bundle is not None:
+            return self.bundle.chunk_ids
+        if self._chunk_ids is None:
+            self._load_chunk_mapping()
+        return self._chunk_ids
+
+    @classmethod
+    def load(
+        cls,
+        index_dir: str,
+        index_name: str,
+        mmap: bool = True,
+        nprobe: Optional[int] = None,
+        ef_search: Optional[int] = None,
+    ) -> "FaissVectorStore":
+        """
+        Load the FAISS index and chunk bundle written by FAISSIndexManager.save.
+
+        Args:
+            index_dir: Directory containing the index files
+            index_name: Index file name without extension
+            mmap: Memory-map the index and chunk bundle read-only (shared across processes)
+            nprobe: Inverted lists probed per query (IVF indexes only)
+            ef_search: HNSW search beam width (HNSW indexes only)
+
+        Returns:
+            Loaded FaissVectorStore
+        """
+        index_path = Path(index_dir) / f"{index_name}.index"
+
+        if not index_path.exists():
+            raise FileNotFoundError(f"FAISS index file not found: {index_path}")
+
+        if mmap:
+            try:
+                index = faiss.read_index(str(index_path), FAISS_MMAP_FLAGS)
+            except RuntimeError:
+                try:
+                    index = faiss.read_index(str(index_path), FAISS_MMAP_IVF_FLAGS)
+                except RuntimeError as exc:
+                    logger.warning(f"⚠️ Could not memory-map {index_path.name} ({exc}); reading into memory")
+                    index = faiss.read_index(str(index_path))
+        else:
+            index = faiss.read_index(str(index_path))
+        configure_search(index, nprobe=nprobe, ef_search=ef_search)
+        logger.info(f"✅ Loaded raw FAISS index with {index.ntotal} vectors (mmap={mmap})")
+
+        if ChunkBundle.exists(index_dir):
+            bundle = ChunkBundle.open(str(Path(index_dir) / CHUNK_BUNDLE_FILENAME), mmap=mmap)
+            logger.info(f"✅ Opened chunk bundle with {len(bundle)} chunks (mmap={mmap})")
+            store = cls(index, bundle.texts, len(bundle), index_dir)
+            store.bundle = bundle
+        elif mmap and (Path(index_dir) / CHUNK_TEXTS_FILENAME).exists():
+            # Index predates chunks.bundle
+            texts = ChunkTextStore.open(index_dir)
+            logger.info(f"✅ Memory-mapped chunk texts for {len(texts)} chunks")
+            store = cls(index, texts, len(texts), index_dir)
+        else:
+            # Index predates chunk_texts.bin as well: fall back to the JSON chunk mapping
+            store = cls(index, [], 0, index_dir)
+            store._load_chunk_mapping()
+
+        if store.chunk_count != index.ntotal:
+            logger.warning(
+                f"⚠️ Chunk count ({store.chunk_count}) doesn't match index size ({index.ntotal}). "
+                f"Missing FAISS ids will map to empty chunks."
+            )
+        return store
+
+    def _load_chunk_mapping(self):
+        """Parse a legacy chunk_mapping.json into flat arrays indexed by FAISS id."""
+        chunk_mapping_path = Path(self.index_dir) / "chunk_mapping.json"
+        if chunk_mapping_path.exists():
+            with open(chunk_mapping_path, 'r', encoding='utf-8') as f:
+                chunk_mapping = json.load(f)
+            logger.info(f"✅ Loaded chunk mapping with {len(chunk_mapping)} chunks")
+        else:
+            logger.warning("⚠️ chunk_mapping.json not found, creating empty mapping")
+            chunk_mapping = {}
+
+        ntotal = self.index.ntotal
+        texts = [""] * ntotal
+        metadatas: List[Dict] = [{} for _ in range(ntotal)]
+        chunk_ids = [""] * ntotal
+        for key, chunk_data in chunk_mapping.items():
+            faiss_id = int(chunk_data.get('faiss_id', key))
+            if not 0 <= faiss_id < ntotal:
+                continue
+            texts[faiss_id] = chunk_data.get('content', '')
+            metadatas[faiss_id] = chunk_data.get('metadata', {})
+            chunk_ids[faiss_id] = chunk_data.get('chunk_id', str(faiss_id))
+
+        if not self.chunk_count:
+            self.texts = texts
+            self.chunk_count = len(chunk_mapping)
+        self._metadatas = metadatas
+        self._chunk_ids = chunk_ids
+
+    def search(
+        self,
+        query_vectors: np.ndarray,
+        k: int,
+        id_bitmap: Optional[np.ndarray] = None,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Batch search with L2-normalised queries (cosine similarity).
+
+        Args:
+            query_vectors: Array of shape (d,) or (n, d)
+            k: Number of neighbours per query
+            id_bitmap: Optional packed little-endian bitmap of allowed FAISS ids,
+                applied inside the search through faiss.IDSelectorBitmap
+
+        Returns:
+            (scores, ids) arrays of shape (n, k); ids are -1 for empty slots
+        """
+        queries = np.array(query_vectors, dtype=np.float32, copy=True, ndmin=2)
+        faiss.normalize_L2(queries)
+        k = min(k, self.ntotal)
+        if k <= 0:
+            empty = np.empty((queries.shape[0], 0))
+            return empty.astype(np.float32), empty.astype(np.int64)
+        if id_bitmap is None:
+            return self.index.search(queries, k)
+        # The selector keeps a raw pointer: hold a contiguous copy for the duration of the search
+        bitmap = np.ascontiguousarray(id_bitmap, dtype=np.uint8)
+        selector = faiss.IDSelectorBitmap(self.ntotal, faiss.swig_ptr(bitmap))
+        return self.index.search(queries, k, params=search_parameters(self.index, selector))